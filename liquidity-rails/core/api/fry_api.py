@@ -10,6 +10,8 @@ Endpoints:
 - POST /wreckage/submit - Submit wreckage event for routing
 - GET /liquidity/summary - Get current liquidity state
 - POST /route/optimize - Get optimal route for wreckage
+- POST /route/pareto - Non-dominated routes (cost vs FRY minted)
+- GET /metrics/routing - Routing stage timers (Prometheus text format)
 - GET /fry/minting-rate - Current FRY minting rate
 - POST /zkml/verify - Verify zkML proof
 - POST /position/commit - Submit confidential position commitment
@@ -21,6 +23,7 @@ Usage:
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 from datetime import datetime
@@ -189,7 +192,7 @@ async def optimize_route(request: RouteRequest):
     """
     
     try:
-        route = system.liquidity_rails.route_wreckage(
+        route = system.liquidity_rails.quote_route(
             amount_usd=request.amount_usd,
             asset=request.asset,
             max_hops=request.max_hops
@@ -218,6 +221,51 @@ async def optimize_route(request: RouteRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/route/pareto")
+async def pareto_routes(request: RouteRequest):
+    """
+    Get the Pareto frontier of routes across cost and FRY minted.
+    
+    Returns every non-dominated route, cheapest first.
+    """
+    
+    try:
+        routes = system.liquidity_rails.pareto_routes(
+            amount_usd=request.amount_usd,
+            asset=request.asset,
+            max_hops=request.max_hops
+        )
+        
+        return {
+            "status": "routes_found" if routes else "no_route_found",
+            "routes": [
+                {
+                    "hops": route.hops,
+                    "total_cost_bps": route.total_cost_bps,
+                    "fry_minted": route.fry_minted,
+                    "efficiency_score": route.efficiency_score
+                }
+                for route in routes
+            ],
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+        
+    except Exception as e:
+        logger.error(f"Error computing Pareto routes: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics/routing", response_class=PlainTextResponse)
+async def routing_metrics():
+    """
+    Per-stage routing latency histograms and counters.
+    
+    Timers are off unless enabled (system.liquidity_rails.profiler.enable()).
+    """
+    
+    return system.liquidity_rails.profiler.dump()
+
+
 @app.get("/fry/minting-rate")
 async def fry_minting_rate():
     """Get current FRY minting rate"""
@@ -301,7 +349,7 @@ async def commit_position(commitment: PositionCommitment):
 async def capital_allocation():
     """Get current capital allocation across venues"""
     
-    allocation = system.optimize_capital_allocation(total_capital=10_000_000)
+    allocation = system.optimize_capital_allocation(total_capital=10_000_000, use_cache=True)
     
     return {
         "total_capital": allocation['total_capital'],
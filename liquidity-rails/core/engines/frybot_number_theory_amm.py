@@ -20,7 +20,9 @@ Usage:
 
 import numpy as np
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Dict, Tuple
+
+from number_theory_service import factor_set, prime_factorize
 
 # Terminal colors
 FRY_RED = "\033[91m"
@@ -30,20 +32,6 @@ BOLD = "\033[1m"
 DIM = "\033[2m"
 
 
-def prime_factorize(n: int) -> List[int]:
-    """Decompose notional into prime factors"""
-    factors = []
-    d = 2
-    while d * d <= n:
-        while n % d == 0:
-            factors.append(d)
-            n //= d
-        d += 1
-    if n > 1:
-        factors.append(n)
-    return factors
-
-
 def gcd(a: int, b: int) -> int:
     """Euclidean algorithm for GCD"""
     while b:
@@ -135,7 +123,7 @@ class FryBoyNumberTheoryAMM:
             
             if optimal_size > 0:
                 # Number theory bonus calculation
-                prime_alignment = len(set(primes) & set(prime_factorize(optimal_size))) / len(set(primes))
+                prime_alignment = len(set(primes) & factor_set(optimal_size)) / len(set(primes))
                 funding_sync = 1.0 - (int(abs(dex['funding'] * 1000)) % 24) / 24.0
                 nt_bonus = 1.0 + (0.4 * prime_alignment + 0.3 * funding_sync + 0.3 * dex['efficiency'])
                 
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FRY Wreckage Matching Benchmarks
+================================
+
+Micro-benchmarks for FRYWreckageMatchingEngine at pending-event counts far
+beyond the live demo stream.
+
+Benchmarks:
+- Matching book: bucketed book vs the nested first-fit scan over all
+  pending events, 1k to 1M events (balanced flow and a one-sided
+  liquidation cascade)
+- Live pending set: per-call match_wreckage latency over a 200k-event
+  one-event-per-call stream (as IntegratedLiquiditySystem calls it) vs
+  rescanning the whole lifetime pool, plus resident memory
+- Max-weight mode: runtime and FRY uplift of max_weight over first_fit
+  matching at 1k to 100k events, plus the greedy fallback's gap to the
+  exact assignment where both run
+- Partial fills: single-core events/sec of the partial-fill priority book
+  vs the whole-event book (book alone and with FRY minting + archive),
+  and the share of collected notional actually hedged by swaps
+- Event storage: bytes per event for dict-backed vs slotted WreckageEvent
+  objects, the array-backed EventTable, and the engine's pending set
+- Streaming export: time and peak memory of one indented JSON document
+  built from every settled pair vs the streaming NDJSON export (plain and
+  gzip), plus an incremental re-export after new settlements
+
+Usage:
+    python3 core/engines/matching/fry_wreckage_matching_benchmark.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from typing import List
+
+from fry_wreckage_matching_engine import (FRYWreckageMatchingEngine, WreckageEvent, DEXES, MAX_WEIGHT_EXACT_LIMIT,
+                                          EventTable, MatchingBook, PartialFillBook)
+from settlement_export import SettlementExporter
+
+# FRY color scheme
+FRY_RED = "\033[91m"
+FRY_YELLOW = "\033[93m"
+FRY_GREEN = "\033[92m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+ASSETS = ["BTC", "ETH", "SOL", "AVAX", "BNB"]
+OTHER_TYPES = ["short_liq", "adverse_fill", "funding_loss", "slippage"]
+
+
+def build_events(num_events: int, long_share: float = 0.2, seed: int = 5) -> List[WreckageEvent]:
+    """Random wreckage stream; `long_share` of events are long liquidations"""
+    random.seed(seed)  # funding exposure is drawn from the random module
+    return [
+        WreckageEvent(
+            random.choice(DEXES),
+            "long_liq" if random.random() < long_share else random.choice(OTHER_TYPES),
+            random.choice(ASSETS),
+            random.uniform(100, 5000),
+            float(i)
+        )
+        for i in range(num_events)
+    ]
+
+
+class _DictWreckageEvent:
+    """WreckageEvent laid out as before __slots__ (attributes in a __dict__)"""
+
+    def __init__(self, event: WreckageEvent):
+        for name in WreckageEvent.__slots__:
+            setattr(self, name, getattr(event, name))
+
+
+def quiet_engine(**kwargs) -> FRYWreckageMatchingEngine:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return FRYWreckageMatchingEngine(**kwargs)
+
+
+def _first_fit_match(engine: FRYWreckageMatchingEngine) -> int:
+    """
+    Pre-book match_wreckage: nested scan of every unmatched pair in the
+    lifetime pool (the engine's event table, which is never cleared here)
+    """
+    table = engine.events
+    remaining, asset, dex, funding = table.remaining_usd, table.asset, table.dex, table.funding_exposure
+    unmatched = [row for row in range(len(table)) if remaining[row] > 0]
+    matched = set()
+    rows1, rows2 = [], []
+
+    for i, row1 in enumerate(unmatched):
+        if row1 in matched:
+            continue
+        for row2 in unmatched[i + 1:]:
+            if row2 in matched:
+                continue
+            if asset[row1] == asset[row2] and dex[row1] != dex[row2] and funding[row1] * funding[row2] < 0:
+                matched.update((row1, row2))
+                rows1.append(row1)
+                rows2.append(row2)
+                break
+
+    matches_found = engine._settle_pairs(rows1, rows2)
+    for row in unmatched:
+        if remaining[row] > 0:
+            engine._mint_unmatched(row)
+
+    return matches_found
+
+
+def _time_match(events: List[WreckageEvent], legacy: bool):
+    engine = quiet_engine()
+    for event in events:
+        engine.collect_wreckage(event)
+
+    start = time.perf_counter()
+    matches = _first_fit_match(engine) if legacy else engine.match_wreckage()
+    elapsed = time.perf_counter() - start
+
+    pairs = {(record['event1']['event_id'], record['event2']['event_id'])
+             for _, record in engine.archive.records() if record['kind'] == 'pair'}
+    return elapsed, matches, pairs
+
+
+def benchmark_matching_book(sizes=(1_000, 10_000, 100_000, 1_000_000), legacy_limit: int = 10_000):
+    """One match_wreckage pass over N pending events, book vs nested scan"""
+    results = {}
+    for label, long_share in (("balanced flow", 0.2), ("liquidation cascade", 0.8)):
+        print(f"\n{BOLD}Matching Book @ {label} ({long_share:.0%} long liquidations){RESET}")
+        print("-" * 70)
+        print(f"  {'pending':>10}{'nested scan':>14}{'book':>12}{'µs/event':>10}{'matches':>10}{'speedup':>10}")
+
+        for num_events in sizes:
+            book_s, matches, pairs = _time_match(build_events(num_events, long_share), legacy=False)
+
+            legacy_s = None
+            if num_events <= legacy_limit:
+                legacy_s, legacy_matches, legacy_pairs = _time_match(
+                    build_events(num_events, long_share), legacy=True
+                )
+                if legacy_pairs != pairs:
+                    print(f"  {FRY_RED}Pair mismatch at {num_events:,} events{RESET}")
+
+            scan = f"{legacy_s * 1e3:11.1f} ms" if legacy_s is not None else f"{'—':>14}"
+            speedup = f"{FRY_RED}{legacy_s / book_s:9.1f}x{RESET}" if legacy_s is not None else f"{'—':>10}"
+            print(f"  {num_events:>10,}{scan}{FRY_GREEN}{book_s * 1e3:9.1f} ms{RESET}"
+                  f"{book_s / num_events * 1e6:10.2f}{matches:>10,}{speedup}")
+
+            results[(label, num_events)] = {
+                'book_ms': book_s * 1e3,
+                'legacy_ms': legacy_s * 1e3 if legacy_s is not None else None,
+                'matches': matches,
+            }
+
+    return results
+
+
+def _stream_latencies(num_events: int, legacy: bool, archive_path: str = None,
+                      windows: int = 5) -> List[float]:
+    """Collect + match one event per call; mean µs/call over `windows` equal slices"""
+    engine = quiet_engine(archive_path=archive_path)
+    events = build_events(num_events)
+    window = num_events // windows
+    latencies = []
+
+    start = time.perf_counter()
+    for i, event in enumerate(events, 1):
+        engine.collect_wreckage(event)
+        if legacy:
+            _first_fit_match(engine)
+        else:
+            engine.match_wreckage()
+        if i % window == 0:
+            now = time.perf_counter()
+            latencies.append((now - start) / window * 1e6)
+            start = now
+
+    engine.close()
+    return latencies
+
+
+def _resident_bytes(num_events: int, legacy: bool) -> int:
+    """Memory still held by the engine (and lifetime pool) after settling a stream"""
+    tracemalloc.start()
+    engine = quiet_engine()
+    pool = []
+    for event in build_events(num_events):
+        engine.collect_wreckage(event)
+        if legacy:
+            pool.append(event)
+        else:
+            engine.match_wreckage()
+    if legacy:
+        # Legacy pool keeps every event (and every pair) alive after settling
+        engine.matched_pairs = deque()
+        _first_fit_match(engine)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def benchmark_live_pending(num_events: int = 200_000, legacy_events: int = 20_000,
+                           memory_events: int = 100_000):
+    """Per-call cost as lifetime events grow: live pending set vs lifetime pool rescan"""
+    print(f"\n{BOLD}Live Pending Set @ {num_events:,} events, one match per event{RESET}")
+    print("-" * 70)
+
+    legacy = _stream_latencies(legacy_events, legacy=True)
+    live = _stream_latencies(num_events, legacy=False)
+    archive_path = os.path.join(tempfile.mkdtemp(), "settled.bin")
+    archived = _stream_latencies(num_events, legacy=False, archive_path=archive_path)
+    archive_bytes = os.path.getsize(archive_path)
+    os.remove(archive_path)
+
+    def fmt(values):
+        return " → ".join(f"{v:.1f}" for v in values) + " µs"
+
+    legacy_bytes = _resident_bytes(memory_events, legacy=True)
+    live_bytes = _resident_bytes(memory_events, legacy=False)
+
+    print(f"  Lifetime pool ({legacy_events // 1000}k):     {fmt(legacy)}")
+    print(f"  Live pending set:       {FRY_GREEN}{fmt(live)}{RESET}")
+    print(f"  + file archive:         {fmt(archived)}"
+          f" ({archive_bytes / num_events:.1f} bytes/event on disk)")
+    print(f"  Resident @ {memory_events // 1000}k events:   lifetime pool {legacy_bytes / 2**20:.1f} MB"
+          f" → live set {FRY_GREEN}{live_bytes / 2**20:.1f} MB{RESET}"
+          f" (recent-pair window + in-memory archive)")
+
+    return {
+        'legacy_us': legacy,
+        'live_us': live,
+        'archived_us': archived,
+        'archive_bytes_per_event': archive_bytes / num_events,
+        'legacy_resident_mb': legacy_bytes / 2**20,
+        'live_resident_mb': live_bytes / 2**20,
+    }
+
+
+def _mode_run(num_events: int, mode: str, exact_limit: int = MAX_WEIGHT_EXACT_LIMIT):
+    engine = quiet_engine(matching_mode=mode, exact_limit=exact_limit)
+    for event in build_events(num_events):
+        engine.collect_wreckage(event)
+
+    start = time.perf_counter()
+    matches = engine.match_wreckage()
+    elapsed = time.perf_counter() - start
+    return elapsed, matches, engine
+
+
+def benchmark_max_weight(sizes=(1_000, 10_000, 100_000)):
+    """One batch match per size: first_fit vs max_weight FRY and runtime"""
+    print(f"\n{BOLD}Max-Weight Matching (exact up to {MAX_WEIGHT_EXACT_LIMIT} per bucket side){RESET}")
+    print("-" * 70)
+    print(f"  {'pending':>10}{'first fit':>12}{'max weight':>13}{'first-fit FRY':>16}{'uplift':>9}{'solver':>8}")
+
+    results = {}
+    for num_events in sizes:
+        ff_s, ff_matches, first_fit = _mode_run(num_events, "first_fit")
+        mw_s, mw_matches, max_weight = _mode_run(num_events, "max_weight")
+        ff_fry, mw_fry = first_fit.total_fry_minted, max_weight.total_fry_minted
+        uplift = mw_fry / ff_fry - 1.0
+        # Buckets are ~num_events / 10 per side (5 assets, two funding signs)
+        solver = "exact" if num_events // 10 <= MAX_WEIGHT_EXACT_LIMIT else "greedy"
+
+        print(f"  {num_events:>10,}{ff_s * 1e3:9.1f} ms{FRY_GREEN}{mw_s * 1e3:10.1f} ms{RESET}"
+              f"{ff_fry:>16,.0f}{FRY_GREEN}{uplift:>+9.1%}{RESET}{solver:>8}")
+
+        results[num_events] = {
+            'first_fit_ms': ff_s * 1e3,
+            'max_weight_ms': mw_s * 1e3,
+            'first_fit_fry': ff_fry,
+            'max_weight_fry': mw_fry,
+            'uplift': uplift,
+            'matches': (ff_matches, mw_matches),
+        }
+
+    # Greedy fallback forced onto a size the exact solver also handles
+    num_events = sizes[0]
+    exact_s, _, exact = _mode_run(num_events, "max_weight")
+    greedy_s, _, greedy = _mode_run(num_events, "max_weight", exact_limit=0)
+    exact_fry, greedy_fry = exact.total_fry_minted, greedy.total_fry_minted
+    print(f"  Greedy vs exact @ {num_events:,}: {greedy_fry / exact_fry:.1%} of optimal FRY"
+          f" in {greedy_s * 1e3:.1f} ms (exact {exact_s * 1e3:.1f} ms)")
+    results['greedy_ratio'] = greedy_fry / exact_fry
+
+    return results
+
+
+def _book_rate(num_events: int, partial: bool) -> float:
+    """Events/sec through the book alone (no minting or archive)"""
+    table = EventTable()
+    for event_id, event in enumerate(build_events(num_events)):
+        table.append(event, event_id)
+    book = PartialFillBook(table) if partial else MatchingBook(table)
+    match = book.fill if partial else book.match_or_add
+
+    start = time.perf_counter()
+    for row in range(num_events):
+        match(row)
+    return num_events / (time.perf_counter() - start)
+
+
+def benchmark_partial_fill(book_events: int = 1_000_000, engine_events: int = 100_000):
+    """Partial-fill priority book vs whole-event matching: throughput and hedged notional"""
+    print(f"\n{BOLD}Partial Fills @ {book_events:,} events (book), {engine_events:,} (engine){RESET}")
+    print("-" * 70)
+    print(f"  {'mode':<14}{'book ev/s':>12}{'engine ev/s':>13}{'fills':>10}{'hedged':>9}{'FRY':>14}")
+
+    results = {}
+    for mode in ("first_fit", "partial_fill"):
+        book_rate = _book_rate(book_events, partial=mode == "partial_fill")
+        elapsed, fills, engine = _mode_run(engine_events, mode)
+        fry = engine.total_fry_minted
+        # Swapped notional on each side over all wreckage collected
+        hedged = 2 * engine.total_swap_notional / engine.total_wreckage_collected
+
+        color = FRY_GREEN if mode == "partial_fill" else ""
+        print(f"  {mode:<14}{color}{book_rate:>12,.0f}{engine_events / elapsed:>13,.0f}{RESET}"
+              f"{fills:>10,}{color}{hedged:>9.1%}{RESET}{fry:>14,.0f}")
+
+        results[mode] = {
+            'book_events_per_s': book_rate,
+            'engine_events_per_s': engine_events / elapsed,
+            'fills': fills,
+            'hedged_share': hedged,
+            'fry_minted': fry,
+        }
+
+    return results
+
+
+def _traced_bytes(build) -> int:
+    """Memory still allocated by build() once it returns (its result kept alive)"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def _event_table(num_events: int) -> EventTable:
+    table = EventTable()
+    for event_id, event in enumerate(build_events(num_events)):
+        table.append(event, event_id)
+    return table
+
+
+def benchmark_event_storage(num_events: int = 100_000):
+    """Bytes per retained event: Python objects vs the array-backed event table"""
+    print(f"\n{BOLD}Event Storage @ {num_events:,} retained events{RESET}")
+    print("-" * 70)
+
+    engine = quiet_engine()
+
+    def pending():
+        for event in build_events(num_events):
+            engine.collect_wreckage(event)
+
+    sizes = {
+        'dict_objects': _traced_bytes(lambda: [_DictWreckageEvent(w) for w in build_events(num_events)]),
+        'slotted_objects': _traced_bytes(lambda: build_events(num_events)),
+        'event_table': _traced_bytes(lambda: _event_table(num_events)),
+        'engine_pending': _traced_bytes(pending),
+    }
+    engine.match_wreckage()
+    results = {name: size / num_events for name, size in sizes.items()}
+
+    print(f"  WreckageEvent with __dict__:   {results['dict_objects']:7.1f} bytes/event")
+    print(f"  WreckageEvent with __slots__:  {results['slotted_objects']:7.1f} bytes/event")
+    print(f"  EventTable rows:               {FRY_GREEN}{results['event_table']:7.1f} bytes/event{RESET}"
+          f" ({EventTable().row_bytes} bytes of columns + array growth slack)")
+    print(f"  Engine pending set:            {FRY_GREEN}{results['engine_pending']:7.1f} bytes/event{RESET}")
+
+    return results
+
+
+def _document_export(engine: FRYWreckageMatchingEngine, filename: str) -> dict:
+    """Single JSON document export: every settled pair held in memory, then dumped"""
+    pairs = [
+        SettlementExporter._pair_line(record, pair_id)
+        for pair_id, record in enumerate(r for _, r in engine.archive.records() if r['kind'] == 'pair')
+    ]
+    with open(filename, 'w') as f:
+        json.dump({"summary": {"matched_pairs": len(pairs)}, "matched_pairs": pairs}, f, indent=2)
+    return {'files': [filename]}
+
+
+def _export_formats(engine: FRYWreckageMatchingEngine, tmp: str) -> dict:
+    document = os.path.join(tmp, "matches.json")
+    return {
+        'json document': lambda: _document_export(engine, document),
+        'ndjson': lambda: engine.export_matches(os.path.join(tmp, "plain")),
+        'ndjson.gz': lambda: engine.export_matches(os.path.join(tmp, "gz"), compress=True),
+    }
+
+
+def _settled_engine(num_events: int, tmp: str) -> FRYWreckageMatchingEngine:
+    engine = quiet_engine(archive_path=os.path.join(tmp, "archive.bin"))
+    for event in build_events(num_events):
+        engine.collect_wreckage(event)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.match_wreckage()
+    return engine
+
+
+def _peak_bytes(num_events: int) -> dict:
+    """Peak traced memory of each export format over a fresh archive"""
+    peaks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _settled_engine(num_events, tmp)
+        for label, export in _export_formats(engine, tmp).items():
+            tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                export()
+            peaks[label] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        engine.close()
+    return peaks
+
+
+def benchmark_streaming_export(sizes=(100_000, 500_000), update_events: int = 10_000,
+                               memory_events: int = 100_000):
+    """Whole-document JSON export vs streaming NDJSON export of the settlement archive"""
+    print(f"\n{BOLD}Streaming Export (settled pairs -> disk){RESET}")
+    print("-" * 70)
+    print(f"  {'events':>10}{'format':>15}{'time':>10}{'on disk':>12}{'files':>7}")
+
+    results = {}
+    for num_events in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = _settled_engine(num_events, tmp)
+            results[num_events] = {}
+            for label, export in _export_formats(engine, tmp).items():
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    files = export()['files']
+                elapsed = time.perf_counter() - start
+                on_disk = sum(os.path.getsize(path) for path in files)
+                results[num_events][label] = {'seconds': elapsed, 'bytes': on_disk, 'files': len(files)}
+                print(f"  {num_events:>10,}{label:>15}{elapsed * 1000:>8.0f}ms"
+                      f"{on_disk / 2**20:>10.1f}MB{len(files):>7}")
+
+            if num_events == sizes[-1]:
+                for event in build_events(update_events, seed=11):
+                    engine.collect_wreckage(event)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    engine.match_wreckage()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    update = engine.export_matches(os.path.join(tmp, "plain"))
+                elapsed = time.perf_counter() - start
+                print(f"  Incremental re-export after {update_events:,} new events: {update['pairs']:,} pairs"
+                      f" in {FRY_GREEN}{elapsed * 1000:.0f}ms{RESET} (only records past the checkpoint)")
+                results['incremental'] = {'pairs': update['pairs'], 'seconds': elapsed}
+            engine.close()
+
+    peaks = _peak_bytes(memory_events)
+    print(f"  Peak memory @ {memory_events // 1000}k events:  json document {peaks['json document'] / 2**20:.1f} MB,"
+          f" ndjson {FRY_GREEN}{peaks['ndjson'] / 2**10:.0f} KB{RESET},"
+          f" ndjson.gz {FRY_GREEN}{peaks['ndjson.gz'] / 2**10:.0f} KB{RESET}")
+    results['peak_bytes'] = peaks
+
+    return results
+
+
+def main():
+    print(f"\n{FRY_RED}{BOLD}{'='*70}{RESET}")
+    print(f"{FRY_RED}{BOLD}FRY Wreckage Matching - Benchmarks{RESET}")
+    print(f"{FRY_RED}{BOLD}{'='*70}{RESET}")
+
+    benchmark_matching_book()
+    benchmark_live_pending()
+    benchmark_max_weight()
+    benchmark_partial_fill()
+    benchmark_event_storage()
+    benchmark_streaming_export()
+
+    print(f"\n{FRY_RED}{BOLD}{'='*70}{RESET}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,15 +23,36 @@ Features:
 - Cash-settled swap execution (no token transfers)
 - Enhanced FRY minting for matched swap pairs
 - Real-time matching dashboard simulation
+- Matching book bucketed by asset and funding sign with per-DEX queues
+- Live pending set; settled events go to an append-only binary archive
+- Maximum-weight (FRY) batch matching mode with a greedy fallback for
+  large buckets
+- Partial-fill matching mode: events carry remaining notional and fill
+  against several counterparties in price/time priority
+- Compact storage: slotted WreckageEvent, and an array-backed event table
+  (interned name codes, float64 columns, partner event ids) for pending
+  wreckage
+- Streaming NDJSON export of settled pairs: incremental from the last
+  exported archive offset, optional gzip, size-based file rotation
 
 Usage:
     python3 core/fry_wreckage_matching_engine.py
 """
 
+import mmap
+from array import array
+import numpy as np
+import os
 import random
+import struct
 import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from heapq import heappop, heappush
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
+
+from settlement_export import SettlementExporter, EXPORT_ROTATE_BYTES
 
 # FRY color scheme for terminal
 FRY_RED = "\033[91m"
@@ -43,6 +64,22 @@ DIM = "\033[2m"
 # DEX venues
 DEXES = ["dYdX", "Hyperliquid", "Aster", "GMX", "Vertex"]
 
+# Recent matched pairs / swaps kept in memory (full history is in the archive)
+RECENT_HISTORY_SIZE = 10_000
+
+# Matching modes: arrival-order first fit, or FRY-maximizing batch assignment
+MATCHING_MODES = ("first_fit", "max_weight", "partial_fill")
+MAX_WEIGHT_EXACT_LIMIT = 256  # Larger bucket sides use the greedy approximation
+
+# Settlement archive layout
+ARCHIVE_MAGIC = b'FRYWRECK'
+ARCHIVE_VERSION = 2
+ARCHIVE_HEADER = struct.Struct('<8sI16s')  # magic, version, random archive id
+ARCHIVE_EVENT_FIELDS = [  # Per-event record fields, struct 'qHHHddd'
+    ('event_id', '<i8'), ('dex', '<u2'), ('type', '<u2'), ('asset', '<u2'),
+    ('amount_usd', '<f8'), ('timestamp', '<f8'), ('funding_exposure', '<f8'),
+]
+
 # Wreckage types
 WRECKAGE_TYPES = {
     "long_liq": "Long Liquidation",
@@ -54,7 +91,16 @@ WRECKAGE_TYPES = {
 
 
 class WreckageEvent:
-    """Represents a single wreckage event from a DEX with funding rate exposure"""
+    """
+    Represents a single wreckage event from a DEX with funding rate exposure
+    
+    The engine copies a collected event into its EventTable, so match state
+    is not written back to this object: look an event up by event_id in
+    the settlement archive (or engine.matched_pairs) to see its partner.
+    """
+    
+    __slots__ = ('dex', 'wreckage_type', 'asset', 'amount_usd', 'timestamp',
+                 'event_id', 'funding_exposure')
     
     def __init__(self, dex: str, wreckage_type: str, asset: str, amount_usd: float, timestamp: float):
         self.dex = dex
@@ -62,8 +108,7 @@ class WreckageEvent:
         self.asset = asset
         self.amount_usd = amount_usd
         self.timestamp = timestamp
-        self.matched = False
-        self.match_partner = None
+        self.event_id: Optional[int] = None  # Assigned when collected
         
         # Funding rate exposure (annualized)
         self.funding_exposure = self._calculate_funding_exposure()
@@ -101,17 +146,580 @@ class WreckageEvent:
         return True
 
 
+class EventTable:
+    """
+    Array-backed store for the wreckage the engine works on.
+    
+    One typed array per field instead of one Python object per event: DEX,
+    wreckage type and asset names are interned to uint16 codes, amounts and
+    exposures are float64, and a matched event records its partner's
+    event id (-1 = none) instead of an object reference. Events are
+    addressed by row; rows are in arrival order.
+    """
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        
+        self.event_id = array('q')
+        self.dex = array('H')
+        self.wreckage_type = array('H')
+        self.asset = array('H')
+        self.amount_usd = array('d')
+        self.timestamp = array('d')
+        self.funding_exposure = array('d')
+        self.remaining_usd = array('d')  # Notional not yet filled or minted
+        self.partner = array('q')        # Latest counterparty's event id
+    
+    def __len__(self) -> int:
+        return len(self.event_id)
+    
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+    
+    def append(self, event: WreckageEvent, event_id: int) -> int:
+        """Copy `event` into a new row and return the row"""
+        row = len(self.event_id)
+        self.event_id.append(event_id)
+        self.dex.append(self.code(event.dex))
+        self.wreckage_type.append(self.code(event.wreckage_type))
+        self.asset.append(self.code(event.asset))
+        self.amount_usd.append(event.amount_usd)
+        self.timestamp.append(event.timestamp)
+        self.funding_exposure.append(event.funding_exposure)
+        self.remaining_usd.append(event.amount_usd)
+        self.partner.append(-1)
+        return row
+    
+    @property
+    def _columns(self) -> Tuple[array, ...]:
+        return (self.event_id, self.dex, self.wreckage_type, self.asset, self.amount_usd,
+                self.timestamp, self.funding_exposure, self.remaining_usd, self.partner)
+    
+    @property
+    def row_bytes(self) -> int:
+        """Column bytes per row"""
+        return sum(column.itemsize for column in self._columns)
+    
+    def clear(self):
+        """Drop every row (interned names are kept)"""
+        for column in self._columns:
+            del column[:]
+
+
+class MatchingBook:
+    """
+    Pending rows of an EventTable bucketed by (asset, funding exposure
+    sign), with one FIFO queue per DEX inside each bucket.
+    
+    An incoming event only looks at the opposite-sign bucket of its asset
+    and takes the oldest pending event queued on any other DEX, so a match
+    costs O(number of DEXes) no matter how many events are pending.
+    Events with zero funding exposure offset nothing and are never queued.
+    """
+    
+    def __init__(self, table: EventTable):
+        self.table = table
+        # (asset code, sign) -> dex code -> deque of rows (rows are in arrival order)
+        self._buckets: Dict[Tuple[int, int], Dict[int, deque]] = defaultdict(dict)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def match_or_add(self, row: int) -> Optional[int]:
+        """
+        Take the oldest pending event that offsets `row`, or queue `row`.
+        
+        Returns:
+            The offsetting partner's row (removed from the book), or None
+        """
+        table = self.table
+        exposure = table.funding_exposure[row]
+        sign = (exposure > 0) - (exposure < 0)
+        if sign == 0:
+            return None
+        asset, dex = table.asset[row], table.dex[row]
+        
+        opposite = self._buckets.get((asset, -sign))
+        if opposite:
+            oldest = None
+            for queue_dex, queue in opposite.items():
+                if queue and queue_dex != dex and (oldest is None or queue[0] < oldest[0]):
+                    oldest = queue
+            if oldest is not None:
+                self._size -= 1
+                return oldest.popleft()
+        
+        queues = self._buckets[(asset, sign)]
+        queue = queues.get(dex)
+        if queue is None:
+            queue = queues[dex] = deque()
+        queue.append(row)
+        self._size += 1
+        return None
+    
+    def clear(self):
+        self._buckets.clear()
+        self._size = 0
+
+
+class PartialFillBook:
+    """
+    Pending rows of an EventTable with remaining notional, bucketed by
+    (asset, funding exposure sign) with one priority heap per DEX inside
+    each bucket.
+    
+    Price/time priority: the resting event with the largest |funding
+    exposure| fills first, the earliest arrival among equals. An incoming
+    event fills against the best head on any other DEX, again and again,
+    until its notional is exhausted or the opposite bucket runs dry; any
+    remainder rests in the book. Each fill costs O(DEXes + log N).
+    """
+    
+    def __init__(self, table: EventTable):
+        self.table = table
+        # (asset code, sign) -> dex code -> heap of (-|funding|, row)
+        self._buckets: Dict[Tuple[int, int], Dict[int, List]] = defaultdict(dict)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def fill(self, row: int) -> List[Tuple[int, float]]:
+        """
+        Fill `row` against the book, resting any remaining notional.
+        
+        Returns:
+            (resting counterparty row, filled notional) per fill, in fill
+            order; remaining_usd is reduced on both sides
+        """
+        table = self.table
+        exposure = table.funding_exposure[row]
+        sign = (exposure > 0) - (exposure < 0)
+        if sign == 0:
+            return []
+        asset, dex = table.asset[row], table.dex[row]
+        
+        fills = []
+        remaining_usd = table.remaining_usd
+        remaining = remaining_usd[row]
+        opposite = self._buckets.get((asset, -sign))
+        if opposite:
+            heaps = [heap for heap_dex, heap in opposite.items() if heap and heap_dex != dex]
+            while remaining > 0 and heaps:
+                best = heaps[0]
+                for heap in heaps:
+                    if heap[0] < best[0]:
+                        best = heap
+                resting = best[0][1]
+                resting_remaining = remaining_usd[resting]
+                quantity = remaining if remaining < resting_remaining else resting_remaining
+                remaining -= quantity
+                resting_remaining -= quantity
+                remaining_usd[resting] = resting_remaining
+                if resting_remaining <= 0:
+                    heappop(best)
+                    self._size -= 1
+                    if not best:
+                        heaps.remove(best)
+                fills.append((resting, quantity))
+        
+        remaining_usd[row] = remaining
+        if remaining > 0:
+            heaps = self._buckets[(asset, sign)]
+            heap = heaps.get(dex)
+            if heap is None:
+                heap = heaps[dex] = []
+            heappush(heap, (-abs(exposure), row))
+            self._size += 1
+        return fills
+    
+    def clear(self):
+        self._buckets.clear()
+        self._size = 0
+
+
+class SettlementArchive:
+    """
+    Append-only binary log of settled wreckage.
+    
+    Fixed-width little-endian records after a magic, version and archive
+    id header. DEX, wreckage type and asset names are interned to uint16
+    codes; a name record is written the first time a code is used, so the
+    log is self-describing and can be reopened and appended to.
+    
+    The archive id is drawn at random when the log is created and kept
+    across reopenings, so readers that checkpoint byte offsets (see
+    SettlementExporter) can tell one log from another.
+    
+    Records:
+    - pair: both events, hedge efficiency and FRY minted for the swap
+    - unmatched: one event and its base-rate FRY
+    - fill / residual: partial-fill variants of pair / unmatched that also
+      carry the notional filled or left over; they read back as 'pair' /
+      'unmatched' records with a 'notional' field
+    
+    Event fields are (event_id, dex, type, asset, amount_usd, timestamp,
+    funding_exposure). With path=None the log is kept in a compact
+    in-memory buffer instead of a file.
+    """
+    
+    NAME, PAIR, UNMATCHED, FILL, RESIDUAL = 0, 1, 2, 3, 4
+    
+    _KIND = struct.Struct('<B')
+    _NAME = struct.Struct('<BHH')  # kind, code, utf-8 length (name bytes follow)
+    _PAIR = struct.Struct('<B' + 'qHHHddd' * 2 + 'dd')
+    _UNMATCHED = struct.Struct('<B' + 'qHHHddd' + 'd')
+    _FILL = struct.Struct('<B' + 'qHHHddd' * 2 + 'ddd')  # + filled notional
+    _RESIDUAL = struct.Struct('<B' + 'qHHHddd' + 'dd')   # + unfilled notional
+    
+    # Packed NumPy layouts of the pair / fill records, for batch appends
+    _PAIR_DTYPE = np.dtype(
+        [('kind', 'u1')]
+        + [(f'{name}1', dtype) for name, dtype in ARCHIVE_EVENT_FIELDS]
+        + [(f'{name}2', dtype) for name, dtype in ARCHIVE_EVENT_FIELDS]
+        + [('hedge_efficiency', '<f8'), ('fry_minted', '<f8')]
+    )
+    _FILL_DTYPE = np.dtype(_PAIR_DTYPE.descr + [('notional', '<f8')])
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.records_written = 0
+        self._table: Optional[EventTable] = None
+        self._table_codes: List[int] = []
+        
+        self._file = None
+        
+        if path is not None and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._load_names()
+            return
+        
+        self.archive_id = os.urandom(16).hex()
+        header = ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, bytes.fromhex(self.archive_id))
+        if path is None:
+            self._buffer = bytearray(header)
+        else:
+            with open(path, 'wb') as f:
+                f.write(header)
+    
+    @property
+    def size(self) -> int:
+        """Archive size in bytes"""
+        if self.path is None:
+            return len(self._buffer)
+        self.flush()
+        return os.path.getsize(self.path)
+    
+    def _write(self, data: bytes):
+        if self.path is None:
+            self._buffer += data
+            return
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(data)
+    
+    def _code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+            encoded = name.encode('utf-8')
+            self._write(self._NAME.pack(self.NAME, code, len(encoded)) + encoded)
+        return code
+    
+    def _table_codes_for(self, table: EventTable) -> List[int]:
+        """Archive code of each name `table` has interned (name records written on first use)"""
+        if table is not self._table:
+            self._table, self._table_codes = table, []
+        codes = self._table_codes
+        if len(codes) < len(table.names):
+            codes.extend(self._code(name) for name in table.names[len(codes):])
+        return codes
+    
+    def _event_fields(self, table: EventTable, row: int) -> Tuple:
+        codes = self._table_codes_for(table)
+        return (table.event_id[row], codes[table.dex[row]], codes[table.wreckage_type[row]],
+                codes[table.asset[row]], table.amount_usd[row], table.timestamp[row],
+                table.funding_exposure[row])
+    
+    def append_pairs(self, table: EventTable, rows1: np.ndarray, rows2: np.ndarray,
+                     hedge_efficiency: np.ndarray, fry_minted: np.ndarray,
+                     notional: Optional[np.ndarray] = None):
+        """
+        Pair records for rows1[i] / rows2[i] in one write: whole-event pairs,
+        or fills of notional[i] when given
+        """
+        codes = np.array(self._table_codes_for(table), dtype=np.uint16)
+        columns = {
+            'event_id': np.frombuffer(table.event_id, dtype=np.int64),
+            'dex': codes[np.frombuffer(table.dex, dtype=np.uint16)],
+            'type': codes[np.frombuffer(table.wreckage_type, dtype=np.uint16)],
+            'asset': codes[np.frombuffer(table.asset, dtype=np.uint16)],
+            'amount_usd': np.frombuffer(table.amount_usd),
+            'timestamp': np.frombuffer(table.timestamp),
+            'funding_exposure': np.frombuffer(table.funding_exposure),
+        }
+        
+        records = np.empty(len(rows1), dtype=self._PAIR_DTYPE if notional is None else self._FILL_DTYPE)
+        records['kind'] = self.PAIR if notional is None else self.FILL
+        for side, rows in ((1, rows1), (2, rows2)):
+            for name, column in columns.items():
+                records[f'{name}{side}'] = column[rows]
+        records['hedge_efficiency'] = hedge_efficiency
+        records['fry_minted'] = fry_minted
+        if notional is not None:
+            records['notional'] = notional
+        
+        self._write(records.tobytes())
+        self.records_written += len(records)
+    
+    def append_unmatched(self, table: EventTable, row: int, fry_minted: float,
+                         notional: Optional[float] = None):
+        """Whole unmatched event, or its unfilled `notional` when given"""
+        fields = self._event_fields(table, row)
+        if notional is None:
+            self._write(self._UNMATCHED.pack(self.UNMATCHED, *fields, fry_minted))
+        else:
+            self._write(self._RESIDUAL.pack(self.RESIDUAL, *fields, fry_minted, notional))
+        self.records_written += 1
+    
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+    
+    def close(self):
+        """Close the file (a later append reopens it)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def records(self, offset: int = 0) -> Iterator[Tuple[int, Dict]]:
+        """
+        Settled records from a byte offset, oldest first.
+        
+        Yields:
+            (offset just past the record, record dict)
+        """
+        self.flush()
+        if self.path is None:
+            yield from self._parse(self._buffer, offset, len(self._buffer))
+            return
+        
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= max(offset, ARCHIVE_HEADER.size):
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield from self._parse(view, offset, size)
+    
+    def _load_names(self):
+        """Rebuild the name table of an existing archive file"""
+        with open(self.path, 'rb') as f:
+            header = f.read(ARCHIVE_HEADER.size).ljust(ARCHIVE_HEADER.size, b'\0')  # Short = not an archive
+            magic, version, archive_id = ARCHIVE_HEADER.unpack(header)
+            if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+                raise ValueError(f"{self.path} is not a v{ARCHIVE_VERSION} settlement archive")
+        self.archive_id = archive_id.hex()
+        for _ in self.records():
+            self.records_written += 1
+    
+    def _parse(self, buffer, offset: int, end: int) -> Iterator[Tuple[int, Dict]]:
+        pos = max(offset, ARCHIVE_HEADER.size)
+        names = self._names
+        
+        def event(fields):
+            return {
+                'event_id': fields[0],
+                'dex': names[fields[1]],
+                'type': names[fields[2]],
+                'asset': names[fields[3]],
+                'amount_usd': fields[4],
+                'timestamp': fields[5],
+                'funding_exposure': fields[6],
+            }
+        
+        while pos < end:
+            kind = self._KIND.unpack_from(buffer, pos)[0]
+            if kind == self.NAME:
+                _, code, length = self._NAME.unpack_from(buffer, pos)
+                pos += self._NAME.size
+                if code == len(names):
+                    name = bytes(buffer[pos:pos + length]).decode('utf-8')
+                    names.append(name)
+                    self._codes[name] = code
+                pos += length
+            elif kind == self.PAIR or kind == self.FILL:
+                layout = self._PAIR if kind == self.PAIR else self._FILL
+                fields = layout.unpack_from(buffer, pos)
+                pos += layout.size
+                yield pos, {
+                    'kind': 'pair',
+                    'event1': event(fields[1:8]),
+                    'event2': event(fields[8:15]),
+                    'hedge_efficiency': fields[15],
+                    'fry_minted': fields[16],
+                    'notional': fields[17] if kind == self.FILL else min(fields[5], fields[12]),
+                }
+            elif kind == self.UNMATCHED or kind == self.RESIDUAL:
+                layout = self._UNMATCHED if kind == self.UNMATCHED else self._RESIDUAL
+                fields = layout.unpack_from(buffer, pos)
+                pos += layout.size
+                yield pos, {
+                    'kind': 'unmatched',
+                    'event': event(fields[1:8]),
+                    'fry_minted': fields[8],
+                    'notional': fields[9] if kind == self.RESIDUAL else fields[5],
+                }
+            else:
+                raise ValueError(f"Corrupt settlement archive record at byte {pos}")
+
+
+def max_weight_assignment(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maximum-weight bipartite assignment (Hungarian method, O(n^2 m)).
+    
+    Rows are added one at a time and the cheapest augmenting path is grown
+    with row/column potentials; each step is one vectorized pass over the
+    columns.
+    
+    Args:
+        weights: (n, m) non-negative edge weights, 0 = no edge
+    
+    Returns:
+        (rows, cols) index arrays of the assigned pairs with positive weight
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape[0] > weights.shape[1]:
+        cols, rows = max_weight_assignment(weights.T)
+        return rows, cols
+    
+    n, m = weights.shape
+    # Column 0 is the virtual start of every augmenting path
+    cost = np.empty((n, m + 1))
+    cost[:, 0] = np.inf
+    cost[:, 1:] = -weights
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)  # Row (1-based) holding each column
+    way = np.zeros(m + 1, dtype=np.int64)
+    
+    for row in range(1, n + 1):
+        owner[0] = row
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            reduced = cost[owner[j0] - 1] - u[owner[j0]] - v
+            better = (reduced < minv) & ~used
+            minv[better] = reduced[better]
+            way[better] = j0
+            minv[used] = np.inf
+            j1 = int(minv.argmin())
+            delta = minv[j1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        # Flip the augmenting path back to the virtual column
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    
+    cols = np.flatnonzero(owner[1:])
+    rows = owner[1:][cols] - 1
+    keep = weights[rows, cols] > 0
+    return rows[keep], cols[keep]
+
+
+class _FundingLadder:
+    """
+    One DEX's side of a bucket (EventTable rows) sorted by |funding
+    exposure|, with union-find skip pointers so the nearest still-available
+    event on either side of a given exposure is found in near-constant time.
+    """
+    
+    def __init__(self, rows: List[int], funding_exposure: array):
+        self.rows = sorted(rows, key=lambda row: abs(funding_exposure[row]))
+        self.keys = [abs(funding_exposure[row]) for row in self.rows]
+        n = len(self.rows)
+        self._right = list(range(n + 1))  # Next available index >= i (n = none)
+        self._left = list(range(n + 1))   # 1 + last available index < i (0 = none)
+    
+    @staticmethod
+    def _find(parent: List[int], i: int) -> int:
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+    
+    def take(self, i: int):
+        self._right[i] = i + 1
+        self._left[i + 1] = i
+    
+    def nearest(self, key: float) -> List[int]:
+        """Indices of the available events just below and just above `key`"""
+        pos = bisect_left(self.keys, key)
+        found = []
+        below = self._find(self._left, pos) - 1
+        if below >= 0:
+            found.append(below)
+        above = self._find(self._right, pos)
+        if above < len(self.rows):
+            found.append(above)
+        return found
+
+
 class FRYWreckageMatchingEngine:
     """Cross-DEX funding rate swap matching and FRY minting engine"""
     
-    def __init__(self):
-        self.wreckage_pool: List[WreckageEvent] = []
-        self.matched_pairs: List[Tuple[WreckageEvent, WreckageEvent]] = []
-        self.funding_swaps: List[Dict] = []  # Track swap details
+    def __init__(self, archive_path: Optional[str] = None,
+                 history_size: int = RECENT_HISTORY_SIZE,
+                 matching_mode: str = "first_fit",
+                 exact_limit: int = MAX_WEIGHT_EXACT_LIMIT):
+        """
+        Args:
+            archive_path: Settlement archive file (appended to if it exists);
+                None keeps the archive in a compact in-memory buffer
+            history_size: Recent matched pairs (event id pairs) / swaps kept
+                in memory
+            matching_mode: Default match_wreckage mode (see MATCHING_MODES)
+            exact_limit: Largest bucket side solved exactly in max_weight mode
+        """
+        if matching_mode not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode {matching_mode!r}; expected one of {MATCHING_MODES}")
+        self.matching_mode = matching_mode
+        self.exact_limit = exact_limit
+        self.events = EventTable()  # Collected, not yet settled
+        self.book = MatchingBook(self.events)
+        self.fill_book = PartialFillBook(self.events)
+        self.archive = SettlementArchive(archive_path)
+        self.matched_pairs = deque(maxlen=history_size)
+        self.funding_swaps = deque(maxlen=history_size)  # Track swap details
         self.total_fry_minted = 0.0
         self.total_wreckage_collected = 0.0
         self.total_swap_notional = 0.0
         
+        # Lifetime totals (settled events themselves are only in the archive)
+        self.total_events = 0
+        self.settled_events = 0
+        self.total_matched_pairs = 0
+        self.total_hedge_efficiency = 0.0
+        self.asset_wreckage: Dict[str, float] = defaultdict(float)
+        self.dex_pair_matches: Dict[Tuple[str, str], int] = defaultdict(int)
+        
         # Minting rates
         self.base_fry_rate = 0.5  # 0.5 FRY per $1 wreckage (unmatched)
         self.swap_fry_rate = 1.4  # 1.4 FRY per $1 wreckage (funding swap matched)
@@ -121,55 +729,279 @@ class FRYWreckageMatchingEngine:
         print(DIM + "Cross-DEX loss netting via cash-settled funding swaps" + RESET)
     
     def collect_wreckage(self, event: WreckageEvent):
-        """Add wreckage event to the pool"""
-        self.wreckage_pool.append(event)
+        """
+        Add wreckage event to the pending set
+        
+        The event is copied into the pending EventTable and gets its
+        event_id; the object itself is not kept or updated by matching.
+        """
+        event.event_id = self.total_events
+        self.events.append(event, self.total_events)
+        self.total_events += 1
         self.total_wreckage_collected += event.amount_usd
+        self.asset_wreckage[event.asset] += event.amount_usd
     
-    def match_wreckage(self) -> int:
+    def match_wreckage(self, mode: Optional[str] = None) -> int:
         """
         Match offsetting wreckage events across DEXes
         Returns number of new matches found
+        
+        first_fit: pending events go through the matching book in arrival
+        order; each is paired with the oldest earlier event it offsets.
+        max_weight: the pending batch is assigned per asset bucket so that
+        the FRY minted by the pairs is maximal (see _max_weight_pairs).
+        partial_fill: like first_fit, but events fill part of their notional
+        against several counterparties (see PartialFillBook).
+        Whatever notional is still unmatched afterwards is minted at the
+        base rate.
+        Every pending event is then settled to the archive and dropped, so
+        the cost of a call depends only on the events pending for it.
+        
+        Args:
+            mode: One of MATCHING_MODES (default: self.matching_mode)
         """
-        matches_found = 0
-        unmatched = [w for w in self.wreckage_pool if not w.matched]
+        mode = mode or self.matching_mode
+        if mode not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode {mode!r}; expected one of {MATCHING_MODES}")
         
-        for i, w1 in enumerate(unmatched):
-            if w1.matched:
-                continue
-                
-            for w2 in unmatched[i+1:]:
-                if w2.matched:
-                    continue
-                
-                if w1.is_offsetting(w2):
+        table = self.events
+        num_pending = len(table)
+        rows1, rows2 = [], []
+        notional = None
+        
+        if mode == "max_weight":
+            for row1, row2 in self._max_weight_pairs():
+                rows1.append(row1)
+                rows2.append(row2)
+        elif mode == "partial_fill":
+            book = self.fill_book
+            notional = []
+            for row2 in range(num_pending):
+                for row1, quantity in book.fill(row2):
+                    rows1.append(row1)
+                    rows2.append(row2)
+                    notional.append(quantity)
+            
+            book.clear()
+        else:
+            book = self.book
+            for row2 in range(num_pending):
+                row1 = book.match_or_add(row2)
+                if row1 is not None:
                     # Match found!
-                    w1.matched = True
-                    w2.matched = True
-                    w1.match_partner = w2
-                    w2.match_partner = w1
-                    
-                    self.matched_pairs.append((w1, w2))
-                    matches_found += 1
-                    
-                    # Mint FRY for matched pair
-                    self._mint_matched_pair(w1, w2)
-                    break
+                    rows1.append(row1)
+                    rows2.append(row2)
+            
+            book.clear()
+        
+        matches_found = self._settle_pairs(rows1, rows2, notional)
         
         # Mint FRY for remaining unmatched wreckage at base rate
-        still_unmatched = [w for w in self.wreckage_pool if not w.matched]
-        for w in still_unmatched:
-            self._mint_unmatched(w)
-            w.matched = True  # Mark as processed
+        remaining_usd = table.remaining_usd
+        for row in range(num_pending):
+            if remaining_usd[row] > 0:
+                self._mint_unmatched(row)
+        self.settled_events += num_pending
+        table.clear()
         
         return matches_found
     
-    def _mint_matched_pair(self, w1: WreckageEvent, w2: WreckageEvent):
-        """Mint FRY for a matched funding rate swap at enhanced rate"""
-        total_wreckage = w1.amount_usd + w2.amount_usd
+    def _settle_pairs(self, rows1: List[int], rows2: List[int],
+                      notional: Optional[List[float]] = None) -> int:
+        """
+        Link matched pairs of pending rows and mint FRY for them, in one
+        vectorized pass over the table columns
+        
+        Args:
+            rows1, rows2: rows1[i] is matched with rows2[i], in match order
+            notional: Filled notional per pair for partial fills
+                (remaining_usd is already reduced by the book); None
+                matches both events whole
+        
+        Returns:
+            Number of pairs settled
+        """
+        if not rows1:
+            return 0
         
-        # Calculate swap notional and hedge efficiency
-        swap_notional = min(w1.amount_usd, w2.amount_usd)
-        funding_hedge_quality = abs(w1.funding_exposure + w2.funding_exposure) / max(abs(w1.funding_exposure), abs(w2.funding_exposure))
+        table = self.events
+        rows1 = np.asarray(rows1, dtype=np.int64)
+        rows2 = np.asarray(rows2, dtype=np.int64)
+        event_id = np.frombuffer(table.event_id, dtype=np.int64)
+        ids1, ids2 = event_id[rows1], event_id[rows2]
+        
+        partner = np.frombuffer(table.partner, dtype=np.int64)
+        partner[rows1] = ids2  # Latest counterparty for partial fills
+        partner[rows2] = ids1
+        if notional is None:
+            remaining_usd = np.frombuffer(table.remaining_usd)
+            remaining_usd[rows1] = remaining_usd[rows2] = 0.0
+        else:
+            notional = np.asarray(notional, dtype=np.float64)
+        
+        swap_notional, hedge_efficiency, fry = self._mint_matched_pairs(rows1, rows2, notional)
+        
+        # Recent history only; the archive has every pair
+        tail = slice(-self.matched_pairs.maxlen, None) if self.matched_pairs.maxlen else slice(None)
+        self.matched_pairs.extend(zip(ids1[tail].tolist(), ids2[tail].tolist()))
+        
+        tail = slice(-self.funding_swaps.maxlen, None) if self.funding_swaps.maxlen else slice(None)
+        rows1, rows2 = rows1[tail], rows2[tail]
+        names = table.names
+        dex = np.frombuffer(table.dex, dtype=np.uint16)
+        asset = np.frombuffer(table.asset, dtype=np.uint16)
+        funding = np.frombuffer(table.funding_exposure)
+        
+        # Record swap details
+        for dex1, dex2, asset_code, size, funding1, funding2, efficiency, minted in zip(
+            dex[rows1].tolist(), dex[rows2].tolist(), asset[rows1].tolist(), swap_notional[tail].tolist(),
+            funding[rows1].tolist(), funding[rows2].tolist(), hedge_efficiency[tail].tolist(), fry[tail].tolist()
+        ):
+            self.funding_swaps.append({
+                'dex1': names[dex1],
+                'dex2': names[dex2],
+                'asset': names[asset_code],
+                'notional': size,
+                'funding1': funding1,
+                'funding2': funding2,
+                'hedge_efficiency': efficiency,
+                'fry_minted': minted
+            })
+        
+        return len(ids1)
+    
+    def _pair_gain(self, row1: int, row2: int) -> float:
+        """FRY a pair mints over minting both events unmatched"""
+        table = self.events
+        f1, f2 = table.funding_exposure[row1], table.funding_exposure[row2]
+        hedge_efficiency = 1.0 - abs(f1 + f2) / max(abs(f1), abs(f2))
+        pair_rate = self.swap_fry_rate * (1.0 + (self.funding_efficiency_bonus - 1.0) * hedge_efficiency)
+        return (table.amount_usd[row1] + table.amount_usd[row2]) * (pair_rate - self.base_fry_rate)
+    
+    def _gain_matrix(self, positive: np.ndarray, negative: np.ndarray, amount: np.ndarray,
+                     funding: np.ndarray, dex: np.ndarray) -> np.ndarray:
+        """_pair_gain for every (positive, negative) row pair; 0 where they cannot match"""
+        funding_p = funding[positive]
+        funding_n = -funding[negative]
+        
+        # Opposite signs: 1 - |f1 + f2| / max(|f1|, |f2|) = min / max
+        hedge_efficiency = np.minimum.outer(funding_p, funding_n) / np.maximum.outer(funding_p, funding_n)
+        pair_rate = self.swap_fry_rate * (1.0 + (self.funding_efficiency_bonus - 1.0) * hedge_efficiency)
+        gain = np.add.outer(amount[positive], amount[negative]) * (pair_rate - self.base_fry_rate)
+        
+        gain[np.equal.outer(dex[positive], dex[negative])] = 0.0
+        return np.maximum(gain, 0.0)
+    
+    def _max_weight_pairs(self) -> List[Tuple[int, int]]:
+        """
+        Pairs of pending rows maximizing total FRY over the batch.
+        
+        Each asset is a bipartite graph between positive and negative
+        funding exposure, weighted by _pair_gain. Buckets with both sides
+        within self.exact_limit are solved exactly with
+        max_weight_assignment; larger ones use _greedy_pairs.
+        
+        Returns:
+            (earlier, later) row pairs, ordered by the later row
+        """
+        table = self.events
+        amount = np.array(table.amount_usd)
+        funding = np.array(table.funding_exposure)
+        asset = np.array(table.asset)
+        dex = np.array(table.dex)
+        
+        pairs = []
+        for code in np.unique(asset):
+            in_asset = asset == code
+            positive = np.flatnonzero(in_asset & (funding > 0))
+            negative = np.flatnonzero(in_asset & (funding < 0))
+            if not len(positive) or not len(negative):
+                continue
+            if max(len(positive), len(negative)) <= self.exact_limit:
+                i, j = max_weight_assignment(self._gain_matrix(positive, negative, amount, funding, dex))
+                pairs.extend(zip(positive[i].tolist(), negative[j].tolist()))
+            else:
+                pairs.extend(self._greedy_pairs(positive.tolist(), negative.tolist()))
+        
+        pairs = [(a, b) if a < b else (b, a) for a, b in pairs]
+        pairs.sort(key=lambda pair: pair[1])
+        return pairs
+    
+    def _greedy_pairs(self, positive: List[int], negative: List[int]) -> List[Tuple[int, int]]:
+        """
+        Greedy approximation of the max-weight assignment for large buckets.
+        
+        Events are taken largest notional first; each pairs with the
+        best-gain candidate among the available events on every other DEX
+        whose |funding exposure| is nearest its own (the best hedge from
+        each side). O(N * DEXes * log N).
+        """
+        table = self.events
+        funding_exposure, dexes = table.funding_exposure, table.dex
+        
+        ladders = []
+        slots = {}  # row -> (ladder, index) on its own side
+        for side in (positive, negative):
+            by_dex = defaultdict(list)
+            for row in side:
+                by_dex[dexes[row]].append(row)
+            side_ladders = {dex: _FundingLadder(rows, funding_exposure) for dex, rows in by_dex.items()}
+            for ladder in side_ladders.values():
+                for i, row in enumerate(ladder.rows):
+                    slots[row] = (ladder, i)
+            ladders.append(side_ladders)
+        
+        pairs = []
+        taken = set()
+        for row in sorted(positive + negative, key=table.amount_usd.__getitem__, reverse=True):
+            if row in taken:
+                continue
+            exposure = funding_exposure[row]
+            best, best_gain = None, 0.0
+            for dex, ladder in ladders[exposure > 0].items():
+                if dex == dexes[row]:
+                    continue
+                for i in ladder.nearest(abs(exposure)):
+                    gain = self._pair_gain(row, ladder.rows[i])
+                    if gain > best_gain:
+                        best, best_gain = (ladder, i), gain
+            if best is None:
+                continue
+            
+            ladder, i = best
+            partner = ladder.rows[i]
+            ladder.take(i)
+            own_ladder, own_index = slots[row]
+            own_ladder.take(own_index)
+            taken.add(partner)
+            pairs.append((row, partner))
+        
+        return pairs
+    
+    def _mint_matched_pairs(self, rows1: np.ndarray, rows2: np.ndarray,
+                            notional: Optional[np.ndarray] = None) -> Tuple[np.ndarray, ...]:
+        """
+        Mint FRY for matched funding rate swaps at enhanced rate
+        
+        Returns:
+            (swap notional, hedge efficiency, FRY minted) per pair
+        """
+        table = self.events
+        amount = np.frombuffer(table.amount_usd)
+        funding = np.frombuffer(table.funding_exposure)
+        amount1, amount2 = amount[rows1], amount[rows2]
+        funding1, funding2 = funding[rows1], funding[rows2]
+        
+        if notional is None:
+            total_wreckage = amount1 + amount2
+            swap_notional = np.minimum(amount1, amount2)
+        else:
+            # Partial fill: `notional` of each side is swapped
+            total_wreckage = 2.0 * notional
+            swap_notional = notional
+        
+        # Calculate hedge efficiency
+        funding_hedge_quality = np.abs(funding1 + funding2) / np.maximum(np.abs(funding1), np.abs(funding2))
         hedge_efficiency = 1.0 - funding_hedge_quality  # Better hedge = lower residual
         
         # Enhanced rate for funding swaps
@@ -179,27 +1011,32 @@ class FRYWreckageMatchingEngine:
         efficiency_fry = base_fry * (self.funding_efficiency_bonus - 1.0) * hedge_efficiency
         
         total_fry = base_fry + efficiency_fry
-        self.total_fry_minted += total_fry
-        self.total_swap_notional += swap_notional
+        self.total_fry_minted += float(total_fry.sum())
+        self.total_swap_notional += float(swap_notional.sum())
+        self.total_matched_pairs += len(rows1)
+        self.total_hedge_efficiency += float(hedge_efficiency.sum())
         
-        # Record swap details
-        self.funding_swaps.append({
-            'dex1': w1.dex,
-            'dex2': w2.dex,
-            'asset': w1.asset,
-            'notional': swap_notional,
-            'funding1': w1.funding_exposure,
-            'funding2': w2.funding_exposure,
-            'hedge_efficiency': hedge_efficiency,
-            'fry_minted': total_fry
-        })
+        # Cross-DEX counts, keyed by the DEX names in sorted order
+        dex = np.frombuffer(table.dex, dtype=np.uint16)
+        dex1, dex2 = dex[rows1], dex[rows2]
+        pairs, counts = np.unique(np.stack([np.minimum(dex1, dex2), np.maximum(dex1, dex2)]),
+                                  axis=1, return_counts=True)
+        names = table.names
+        for (code1, code2), count in zip(pairs.T.tolist(), counts.tolist()):
+            name1, name2 = sorted((names[code1], names[code2]))
+            self.dex_pair_matches[(name1, name2)] += count
         
-        return total_fry
+        self.archive.append_pairs(table, rows1, rows2, hedge_efficiency, total_fry, notional)
+        return swap_notional, hedge_efficiency, total_fry
     
-    def _mint_unmatched(self, w: WreckageEvent):
-        """Mint FRY for unmatched wreckage at base rate"""
-        fry = w.amount_usd * self.base_fry_rate
+    def _mint_unmatched(self, row: int):
+        """Mint FRY for unmatched wreckage (or a partial fill's remainder) at base rate"""
+        table = self.events
+        remaining = table.remaining_usd[row]
+        fry = remaining * self.base_fry_rate
         self.total_fry_minted += fry
+        self.archive.append_unmatched(table, row, fry, remaining if remaining < table.amount_usd[row] else None)
+        table.remaining_usd[row] = 0.0
         return fry
     
     def simulate_wreckage_stream(self, duration_seconds: int = 60, events_per_second: float = 2.0):
@@ -240,15 +1077,15 @@ class FRYWreckageMatchingEngine:
         print(f"{FRY_RED}{BOLD}FRY Wreckage Matching Summary{RESET}")
         print(f"{BOLD}{'='*70}{RESET}")
         
-        total_events = len(self.wreckage_pool)
-        matched_events = sum(1 for w in self.wreckage_pool if w.matched)
+        total_events = self.total_events
+        matched_events = self.settled_events
         match_rate = (matched_events / total_events * 100) if total_events > 0 else 0
         
         print(f"\n{BOLD}Wreckage Collection:{RESET}")
         print(f"  Total Events: {total_events}")
         print(f"  Total Wreckage: ${self.total_wreckage_collected:,.2f}")
         print(f"  Matched Events: {matched_events} ({match_rate:.1f}%)")
-        print(f"  Matched Pairs: {len(self.matched_pairs)}")
+        print(f"  Matched Pairs: {self.total_matched_pairs}")
         
         print(f"\n{BOLD}FRY Minting:{RESET}")
         print(f"  Total FRY Minted: {FRY_YELLOW}{self.total_fry_minted:,.2f} FRY{RESET}")
@@ -261,72 +1098,63 @@ class FRYWreckageMatchingEngine:
         
         print(f"\n{BOLD}Funding Rate Swaps:{RESET}")
         print(f"  Total Swap Notional: ${self.total_swap_notional:,.2f}")
-        print(f"  Number of Swaps: {len(self.funding_swaps)}")
+        print(f"  Number of Swaps: {self.total_matched_pairs}")
         
-        if self.funding_swaps:
-            avg_efficiency = sum(s['hedge_efficiency'] for s in self.funding_swaps) / len(self.funding_swaps)
+        if self.total_matched_pairs:
+            avg_efficiency = self.total_hedge_efficiency / self.total_matched_pairs
             print(f"  Average Hedge Efficiency: {avg_efficiency:.1%}")
             print(f"  {FRY_YELLOW}Note: Swaps are cash-settled, no token transfers{RESET}")
         
         # Cross-DEX breakdown
         print(f"\n{BOLD}Cross-DEX Matching:{RESET}")
-        dex_pairs = {}
-        for w1, w2 in self.matched_pairs:
-            pair_key = tuple(sorted([w1.dex, w2.dex]))
-            dex_pairs[pair_key] = dex_pairs.get(pair_key, 0) + 1
-        
-        for (dex1, dex2), count in sorted(dex_pairs.items(), key=lambda x: -x[1]):
+        for (dex1, dex2), count in sorted(self.dex_pair_matches.items(), key=lambda x: -x[1]):
             print(f"  {dex1} <--> {dex2}: {count} matches")
         
         # Asset breakdown
         print(f"\n{BOLD}Top Assets by Wreckage:{RESET}")
-        asset_wreckage = {}
-        for w in self.wreckage_pool:
-            asset_wreckage[w.asset] = asset_wreckage.get(w.asset, 0) + w.amount_usd
-        
-        for asset, amount in sorted(asset_wreckage.items(), key=lambda x: -x[1])[:5]:
+        for asset, amount in sorted(self.asset_wreckage.items(), key=lambda x: -x[1])[:5]:
             print(f"  {asset}: ${amount:,.2f}")
         
         print(f"\n{BOLD}{'='*70}{RESET}")
     
-    def export_matches(self, filename: str = None):
-        """Export matched pairs to JSON"""
-        if filename is None:
-            filename = f"fry_wreckage_matches_{int(time.time())}.json"
+    def export_matches(self, base_path: str = "fry_wreckage_matches", compress: bool = False,
+                       max_file_bytes: int = EXPORT_ROTATE_BYTES) -> Dict:
+        """
+        Stream matched pairs settled since the last export to NDJSON
         
-        import json
-        data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "summary": {
-                "total_events": len(self.wreckage_pool),
-                "matched_pairs": len(self.matched_pairs),
-                "total_fry_minted": self.total_fry_minted,
-                "total_wreckage": self.total_wreckage_collected
-            },
-            "matched_pairs": [
-                {
-                    "pair_id": i,
-                    "event1": {
-                        "dex": w1.dex,
-                        "type": w1.wreckage_type,
-                        "asset": w1.asset,
-                        "amount_usd": w1.amount_usd
-                    },
-                    "event2": {
-                        "dex": w2.dex,
-                        "type": w2.wreckage_type,
-                        "asset": w2.asset,
-                        "amount_usd": w2.amount_usd
-                    }
-                }
-                for i, (w1, w2) in enumerate(self.matched_pairs)
-            ]
-        }
+        Lines are read straight from the archive and appended to rotating
+        files (see SettlementExporter), so memory stays flat however many
+        pairs have settled. A checkpoint left at base_path by another
+        archive (e.g. a previous run's in-memory one) is not resumed: this
+        archive is exported from its start into a new file.
+        
+        Args:
+            base_path: Path prefix of the export files and their checkpoint
+            compress: gzip the output
+            max_file_bytes: Rotate to a new file past this size
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        Returns:
+            SettlementExporter.export result (lines, pairs, files, offset,
+            archive_id)
+        """
+        exporter = SettlementExporter(base_path, compress, max_file_bytes)
+        result = exporter.export(self.archive, summary={
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "total_events": self.total_events,
+            "matched_pairs": self.total_matched_pairs,
+            "total_fry_minted": self.total_fry_minted,
+            "total_wreckage": self.total_wreckage_collected
+        })
         
-        print(f"{FRY_YELLOW}📄 Exported to {filename}{RESET}")
+        if result['files']:
+            print(f"{FRY_YELLOW}📄 Exported {result['pairs']} pairs to {', '.join(result['files'])}{RESET}")
+        else:
+            print(f"{FRY_YELLOW}📄 No new settlements to export since archive offset {result['offset']}{RESET}")
+        return result
+    
+    def close(self):
+        """Close the archive file (it stays readable via archive.records())"""
+        self.archive.close()
 
 
 def main():
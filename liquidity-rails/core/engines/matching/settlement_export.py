@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FRY Settlement Export
+=====================
+
+Streaming NDJSON export of the settlement archive written by
+FRYWreckageMatchingEngine.
+
+- One JSON line per matched pair (both events and the swap terms), read
+  record by record from the archive, so memory stays flat no matter how
+  long the settled history is
+- Incremental: the archive byte offset reached is checkpointed next to the
+  export, and each run appends only what settled since the previous one
+- Checkpoints are keyed by the archive's id: exporting a different archive
+  (a fresh in-memory one, or a file recreated at the same path) to the
+  same base path starts over from its first record in a new file
+- Optional gzip compression (each run appends one gzip member; readers
+  such as gzip.open see a single stream)
+- Output rotates to a new numbered file once the current one reaches a
+  size limit
+
+Files for base path "exports/matches":
+    exports/matches.000000.ndjson[.gz], exports/matches.000001.ndjson[.gz], ...
+    exports/matches.offset.json  (checkpoint: archive id and offset, file index, totals)
+
+Usage:
+    from settlement_export import SettlementExporter
+"""
+
+import gzip
+import json
+import os
+from typing import Dict, List, Optional
+
+EXPORT_ROTATE_BYTES = 64 * 2**20  # Start a new file past 64 MB (compressed size when gzipped)
+
+
+class SettlementExporter:
+    """
+    Appends settled archive records to rotating NDJSON files.
+
+    Delivery is at-least-once: the checkpoint is written after the lines,
+    so a crash mid-export re-exports that run's records on the next one.
+    """
+
+    def __init__(self, base_path: str, compress: bool = False,
+                 max_file_bytes: int = EXPORT_ROTATE_BYTES, include_unmatched: bool = False):
+        """
+        Args:
+            base_path: Path prefix for the numbered files and the checkpoint
+            compress: gzip the output (.ndjson.gz)
+            max_file_bytes: Rotate once a file reaches this many bytes on disk
+            include_unmatched: Also export unmatched (base-rate) settlements
+        """
+        self.base_path = base_path
+        self.compress = compress
+        self.max_file_bytes = max_file_bytes
+        self.include_unmatched = include_unmatched
+        self.state_path = f"{base_path}.offset.json"
+        self.state = self._load_state()
+
+    def file_path(self, index: int) -> str:
+        return f"{self.base_path}.{index:06d}.ndjson" + (".gz" if self.compress else "")
+
+    def export(self, archive, summary: Optional[Dict] = None) -> Dict:
+        """
+        Write every record settled since the last export of this archive.
+
+        Args:
+            archive: SettlementArchive to read from
+            summary: Engine totals stored with the checkpoint
+
+        Returns:
+            Lines written this run, the 'files' written to, the new
+            archive 'offset' and the 'archive_id' it belongs to
+        """
+        if self.state['archive_id'] != archive.archive_id:
+            self._start_archive(archive.archive_id)
+
+        offset = self.state['offset']
+        if offset > archive.size:
+            raise ValueError(f"Export checkpoint at byte {offset} is past the end of the archive "
+                             f"({archive.size} bytes); remove {self.state_path} to export from the start")
+
+        files: List[str] = []
+        raw = stream = None
+        lines = pairs = 0
+        try:
+            for offset, record in archive.records(offset):
+                if record['kind'] == 'pair':
+                    line = self._pair_line(record, self.state['pairs_exported'] + pairs)
+                    pairs += 1
+                elif self.include_unmatched:
+                    line = {'kind': 'unmatched', **record}
+                else:
+                    continue
+
+                if stream is None:
+                    raw, stream = self._open_current()
+                    files.append(raw.name)
+                stream.write(json.dumps(line, separators=(',', ':')).encode('utf-8') + b'\n')
+                lines += 1
+
+                if raw.tell() >= self.max_file_bytes:
+                    self._close(raw, stream)
+                    raw = stream = None
+                    self.state['file_index'] += 1
+        finally:
+            if stream is not None:
+                self._close(raw, stream)
+
+        self.state['offset'] = offset
+        self.state['pairs_exported'] += pairs
+        self.state['lines_exported'] += lines
+        if summary is not None:
+            self.state['summary'] = summary
+        self._save_state()
+
+        return {'lines': lines, 'pairs': pairs, 'files': files, 'offset': offset,
+                'archive_id': self.state['archive_id']}
+
+    @staticmethod
+    def _pair_line(record: Dict, pair_id: int) -> Dict:
+        w1, w2 = record['event1'], record['event2']
+        return {
+            'kind': 'pair',
+            'pair_id': pair_id,
+            'event1': w1,
+            'event2': w2,
+            'swap': {
+                'dex1': w1['dex'],
+                'dex2': w2['dex'],
+                'asset': w1['asset'],
+                'notional': record['notional'],
+                'funding1': w1['funding_exposure'],
+                'funding2': w2['funding_exposure'],
+                'hedge_efficiency': record['hedge_efficiency'],
+                'fry_minted': record['fry_minted'],
+            },
+        }
+
+    def _start_archive(self, archive_id: str):
+        """Checkpoint a new archive from its start, in the next unused file"""
+        file_index = self.state['file_index']
+        while os.path.exists(self.file_path(file_index)):
+            file_index += 1
+        self.state = self._initial_state()
+        self.state.update(archive_id=archive_id, file_index=file_index)
+
+    def _open_current(self):
+        """(raw file, writable stream) for the current file, rotating past full ones"""
+        while True:
+            path = self.file_path(self.state['file_index'])
+            if not os.path.exists(path) or os.path.getsize(path) < self.max_file_bytes:
+                break
+            self.state['file_index'] += 1
+
+        raw = open(path, 'ab')
+        if self.compress:
+            return raw, gzip.GzipFile(fileobj=raw, mode='ab')
+        return raw, raw
+
+    @staticmethod
+    def _close(raw, stream):
+        if stream is not raw:
+            stream.close()  # Writes the gzip trailer; leaves raw open
+        raw.close()
+
+    @staticmethod
+    def _initial_state() -> Dict:
+        return {'archive_id': None, 'offset': 0, 'file_index': 0, 'pairs_exported': 0, 'lines_exported': 0}
+
+    def _load_state(self) -> Dict:
+        state = self._initial_state()
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state.update(json.load(f))
+        return state
+
+    def _save_state(self):
+        # Replace atomically so a crash never leaves a torn checkpoint
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FRY Number Theory Service
+=========================
+
+Shared factorization backend for the number-theory engines (FryBoy AMM,
+v3 swap matcher, topology router).
+
+- Smallest-prime-factor sieve up to a configurable bound: factoring any
+  n below it is a chain of table lookups
+- Pollard-rho (Brent) with deterministic Miller-Rabin above the bound
+- Memoized factor sets: pinned for venue capacities (they rarely change),
+  LRU for recently seen trade sizes; pins past a fixed limit fall back to
+  the LRU so changing capacities cannot grow the cache without bound
+
+Usage:
+    from number_theory_service import prime_factorize, factor_set
+
+Consumers in routing/ and visualization/ add core/engines to sys.path
+when this import fails, so their demos also run from their own directory.
+"""
+
+import numpy as np
+from collections import OrderedDict
+from math import gcd, isqrt
+from typing import Dict, FrozenSet, List, Optional
+import random
+import threading
+
+# Sieve covers every notional up to $1M in one lookup chain
+SIEVE_LIMIT = 1 << 20
+FACTOR_CACHE_SIZE = 4096
+FACTOR_PIN_LIMIT = 1024  # Venue capacities; a handful per venue in practice
+
+# Deterministic Miller-Rabin witnesses for n < 3.3e24
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+class NumberTheoryService:
+    """
+    Prime factorization with a smallest-prime-factor sieve, Pollard-rho
+    fallback and memoized factor sets.
+    """
+
+    def __init__(self, sieve_limit: int = SIEVE_LIMIT, cache_size: int = FACTOR_CACHE_SIZE,
+                 pin_limit: int = FACTOR_PIN_LIMIT):
+        self.sieve_limit = max(int(sieve_limit), 2)
+        self.cache_size = cache_size
+        self.pin_limit = pin_limit
+        self._spf = self._build_sieve(self.sieve_limit)
+
+        self._pinned: Dict[int, FrozenSet[int]] = {}
+        self._recent: 'OrderedDict[int, FrozenSet[int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._rng = random.Random(0x46525921)  # Deterministic rho seeds
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _build_sieve(limit: int) -> np.ndarray:
+        """spf[n] = smallest prime factor of n (0 for n < 2)"""
+        spf = np.zeros(limit + 1, dtype=np.int32)
+        spf[2::2] = 2
+        for p in range(3, isqrt(limit) + 1, 2):
+            if spf[p] == 0:
+                multiples = spf[p * p::2 * p]
+                multiples[multiples == 0] = p
+
+        # Whatever is still unmarked above 1 is prime
+        primes = np.flatnonzero(spf == 0)
+        primes = primes[primes >= 2]
+        spf[primes] = primes
+        return spf
+
+    def prime_factorize(self, n: int) -> List[int]:
+        """
+        Prime factors of n with multiplicity, ascending.
+
+        Returns [] for n < 2.
+        """
+        n = int(n)
+        if n < 2:
+            return []
+        if n <= self.sieve_limit:
+            return self._sieve_factors(n)
+
+        factors = []
+        # Strip small primes first so rho only sees large cofactors
+        for p in (2, 3, 5, 7, 11, 13):
+            while n % p == 0:
+                factors.append(p)
+                n //= p
+        self._split(n, factors)
+        return sorted(factors)
+
+    def factor_set(self, n: int, pin: bool = False) -> FrozenSet[int]:
+        """
+        Distinct prime factors of n, memoized.
+
+        Args:
+            n: Integer to factor
+            pin: Keep permanently (venue capacities) instead of in the LRU,
+                while fewer than pin_limit values are pinned
+        """
+        n = int(n)
+        primes = self._pinned.get(n)
+        if primes is not None:
+            self.hits += 1
+            return primes
+
+        with self._lock:
+            primes = self._recent.get(n)
+            if primes is not None:
+                self.hits += 1
+                if pin and len(self._pinned) < self.pin_limit:
+                    self._pinned[n] = self._recent.pop(n)
+                else:
+                    self._recent.move_to_end(n)
+                return primes
+            self.misses += 1
+
+        primes = frozenset(self.prime_factorize(n))
+
+        with self._lock:
+            if pin and len(self._pinned) < self.pin_limit:
+                self._pinned[n] = primes
+            else:
+                self._recent[n] = primes
+                if len(self._recent) > self.cache_size:
+                    self._recent.popitem(last=False)
+        return primes
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'sieve_limit': self.sieve_limit,
+            'pinned': len(self._pinned),
+            'recent': len(self._recent),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _sieve_factors(self, n: int) -> List[int]:
+        spf = self._spf
+        factors = []
+        while n > 1:
+            p = int(spf[n])
+            factors.append(p)
+            n //= p
+        return factors
+
+    def _split(self, n: int, factors: List[int]):
+        """Append the prime factors of n (any order)"""
+        if n < 2:
+            return
+        if n <= self.sieve_limit:
+            factors.extend(self._sieve_factors(n))
+            return
+        if is_probable_prime(n):
+            factors.append(n)
+            return
+
+        d = self._pollard_brent(n)
+        self._split(d, factors)
+        self._split(n // d, factors)
+
+    def _pollard_brent(self, n: int) -> int:
+        """Non-trivial factor of composite n (Brent's cycle variant)"""
+        if n % 2 == 0:
+            return 2
+
+        while True:
+            y = self._rng.randrange(1, n)
+            c = self._rng.randrange(1, n)
+            m = 128
+            g = r = q = 1
+            x = ys = y
+
+            while g == 1:
+                x = y
+                for _ in range(r):
+                    y = (y * y + c) % n
+                k = 0
+                while k < r and g == 1:
+                    ys = y
+                    for _ in range(min(m, r - k)):
+                        y = (y * y + c) % n
+                        q = q * abs(x - y) % n
+                    g = gcd(q, n)
+                    k += m
+                r *= 2
+
+            if g == n:
+                # Batched product hit zero; back up one step at a time
+                g = 1
+                while g == 1:
+                    ys = (ys * ys + c) % n
+                    g = gcd(abs(x - ys), n)
+
+            if g != n:
+                return g
+
+
+def is_probable_prime(n: int) -> bool:
+    """Miller-Rabin, deterministic below 3.3e24"""
+    if n < 2:
+        return False
+    for p in MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+_default_service: Optional[NumberTheoryService] = None
+_default_lock = threading.Lock()
+
+
+def get_service() -> NumberTheoryService:
+    """Process-wide service (sieve is built on first use)"""
+    global _default_service
+    if _default_service is None:
+        with _default_lock:
+            if _default_service is None:
+                _default_service = NumberTheoryService()
+    return _default_service
+
+
+def configure(sieve_limit: int = SIEVE_LIMIT, cache_size: int = FACTOR_CACHE_SIZE,
+              pin_limit: int = FACTOR_PIN_LIMIT) -> NumberTheoryService:
+    """Replace the process-wide service (e.g. a larger sieve bound)"""
+    global _default_service
+    with _default_lock:
+        _default_service = NumberTheoryService(sieve_limit, cache_size, pin_limit)
+    return _default_service
+
+
+def prime_factorize(n: int) -> List[int]:
+    """Decompose notional into prime factors (shared service)"""
+    return get_service().prime_factorize(n)
+
+
+def factor_set(n: int, pin: bool = False) -> FrozenSet[int]:
+    """Distinct prime factors of n, memoized (shared service)"""
+    return get_service().factor_set(n, pin)
@@ -0,0 +1,845 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Liquidity Rails Benchmarks
+==========================
+
+Micro-benchmarks for the liquidity rails routing hot path at venue/asset
+counts well beyond the five default venues.
+
+Benchmarks:
+- Pool index: candidate selection at 10k pools (index vs full scan)
+- Split solver: convex water-filling vs greedy multi-hop (cost + latency)
+- Batch routing: route_wreckage_batch vs per-event route_wreckage throughput
+- Pool table: memory per pool and summary latency (columns vs dataclass objects)
+- Quote cache: hit rate and latency of quote_route under repeated quotes + executions
+- Reservations: 32-thread quote/reserve/commit stress test with overbooking checks
+- Capital allocation: incremental venue aggregates vs full recompute, cached reads
+- Profiler: per-stage route_wreckage breakdown and disabled-timer overhead
+- Snapshots: save / warm-start load time and size vs rebuilding pool state
+- Pareto search: DP frontier vs brute-force enumeration (exactness + latency)
+- What-if overlays: copy-on-write what_if() vs deepcopy of the engine
+- Robust routing: Monte Carlo route_wreckage_robust vs the candidate with
+  the most point-estimate FRY (latency, route flips, held-out tail FRY)
+
+Usage:
+    python3 core/engines/routing/liquidity_rails_benchmark.py
+"""
+
+import copy
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+
+from liquidity_rails_engine import LiquidityRailsEngine, LiquidityPool, PoolTable, RoutingProfiler
+
+# FRY color scheme
+FRY_RED = "\033[91m"
+FRY_YELLOW = "\033[93m"
+FRY_GREEN = "\033[92m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+
+def build_engine(num_pools: int, num_assets: int = 20, seed: int = 7) -> LiquidityRailsEngine:
+    """Build a rails engine with `num_pools` synthetic pools spread over `num_assets` assets"""
+    logging.getLogger("liquidity_rails_engine").setLevel(logging.WARNING)
+    np.random.seed(seed)  # default BTC/ETH pools draw utilization from np.random
+    rng = np.random.default_rng(seed)
+
+    rails = LiquidityRailsEngine()
+    assets = [f"ASSET{i}" for i in range(num_assets)]
+    num_venues = max(num_pools // num_assets, 1)
+
+    for v in range(num_venues):
+        for asset in assets:
+            rails.add_pool(LiquidityPool(
+                venue=f"Venue{v}",
+                asset=asset,
+                depth_usd=float(rng.uniform(5_000_000, 50_000_000)),
+                spread_bps=float(rng.uniform(2.0, 5.0)),
+                funding_rate=float(rng.uniform(-0.002, 0.002)),
+                utilization=float(rng.uniform(0.3, 0.7))
+            ))
+
+    return rails
+
+
+def _scan_candidates(pools_by_venue: Dict[str, List[LiquidityPool]], asset: str,
+                     amount_usd: float) -> List[LiquidityPool]:
+    """Pre-index candidate selection: walk every venue's pool list"""
+    available_pools = []
+    for venue, pools in pools_by_venue.items():
+        for pool in pools:
+            if pool.asset == asset and pool.available_liquidity() >= amount_usd * 0.1:
+                available_pools.append(pool)
+    return available_pools
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    """Average wall time per call in microseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def benchmark_pool_index(num_pools: int = 10_000, iterations: int = 2_000):
+    """Candidate selection and utilization updates at `num_pools` pools"""
+    print(f"\n{BOLD}Pool Index @ {num_pools:,} pools{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(num_pools)
+    rng = np.random.default_rng(11)
+    assets = list(rails.pool_index._rows.keys())
+    requests = [(str(rng.choice(assets)), float(rng.uniform(50_000, 2_000_000)))
+                for _ in range(iterations)]
+
+    # Both paths must select the same pool set
+    pools_by_venue = rails.liquidity_pools
+    for asset, amount in requests[:50]:
+        indexed = rails.pool_index.candidates(asset, amount * 0.1)
+        scanned = _scan_candidates(pools_by_venue, asset, amount)
+        assert set(indexed) == {p._row for p in scanned}
+
+    it = iter(requests)
+    scan_us = _time_per_call(lambda: _scan_candidates(pools_by_venue, *next(it)), iterations)
+
+    it = iter([(asset, amount * 0.1) for asset, amount in requests])
+    index_us = _time_per_call(lambda: rails.pool_index.candidates(*next(it)), iterations)
+
+    # Utilization churn as execute_route would apply it
+    rows = rails.pool_table.active_rows()
+    updates = [(int(rows[i]), float(u)) for i, u in zip(
+        rng.integers(0, len(rows), iterations), rng.uniform(0.3, 0.9, iterations))]
+    it = iter(updates)
+    update_us = _time_per_call(lambda: rails.pool_index.update(*next(it)), iterations)
+
+    it = iter([(amount, asset) for asset, amount in requests])
+    route_us = _time_per_call(lambda: rails.route_wreckage(*next(it), max_hops=3), iterations // 10)
+
+    print(f"  Full scan selection:    {scan_us:10.1f} µs/request")
+    print(f"  Indexed selection:      {FRY_GREEN}{index_us:10.1f} µs/request{RESET}")
+    print(f"  Speedup:                {FRY_RED}{scan_us / index_us:10.1f}x{RESET}")
+    print(f"  Index update:           {update_us:10.1f} µs/update")
+    print(f"  route_wreckage (total): {route_us:10.1f} µs/request")
+
+    return {
+        'scan_us': scan_us,
+        'index_us': index_us,
+        'update_us': update_us,
+        'route_us': route_us,
+    }
+
+
+def benchmark_split_solver(pools_per_asset: int = 100, num_requests: int = 500,
+                           max_hops: int = 3):
+    """Cost saved and latency of the convex split solver vs the greedy router"""
+    print(f"\n{BOLD}Split Solver @ {pools_per_asset} pools/asset, max_hops={max_hops}{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(pools_per_asset * 20)
+    rng = np.random.default_rng(23)
+    assets = list(rails.pool_index._rows.keys())
+    requests = [(float(rng.uniform(1_000_000, 40_000_000)), str(rng.choice(assets)))
+                for _ in range(num_requests)]
+
+    results = {}
+    for solver in ('greedy', 'convex'):
+        routes = []
+        solve_time = 0.0
+        for amount, asset in requests:
+            rows = rails.pool_index.candidates(asset, amount * 0.1)
+            find_route = (rails._find_convex_split_route if solver == 'convex'
+                          else rails._find_multi_hop_route)
+            start = time.perf_counter()
+            route = find_route(amount, asset, rows, max_hops)
+            solve_time += time.perf_counter() - start
+            routes.append(route)
+        results[solver] = (routes, solve_time / num_requests * 1e6)
+
+    greedy_routes, greedy_us = results['greedy']
+    convex_routes, convex_us = results['convex']
+
+    both = [(g, c) for g, c in zip(greedy_routes, convex_routes) if g and c]
+    greedy_cost_usd = sum(g.total_cost_bps * g.wreckage_amount / 10_000 for g, _ in both)
+    convex_cost_usd = sum(c.total_cost_bps * c.wreckage_amount / 10_000 for _, c in both)
+    avg_saved_bps = np.mean([g.total_cost_bps - c.total_cost_bps for g, c in both]) if both else 0.0
+    worse = sum(1 for g, c in both if c.total_cost_bps > g.total_cost_bps + 1e-9)
+
+    print(f"  Routes found:           greedy {sum(r is not None for r in greedy_routes)}"
+          f" / convex {sum(r is not None for r in convex_routes)} of {num_requests}")
+    print(f"  Greedy cost:            ${greedy_cost_usd:14,.0f}")
+    print(f"  Convex cost:            {FRY_GREEN}${convex_cost_usd:14,.0f}{RESET}")
+    print(f"  Cost saved:             {FRY_RED}{avg_saved_bps:10.2f} bps avg{RESET}"
+          f" (${greedy_cost_usd - convex_cost_usd:,.0f} total)")
+    print(f"  Convex worse than greedy: {worse} routes")
+    print(f"  Greedy latency:         {greedy_us:10.1f} µs/route")
+    print(f"  Convex latency:         {convex_us:10.1f} µs/route")
+
+    return {
+        'greedy_cost_usd': greedy_cost_usd,
+        'convex_cost_usd': convex_cost_usd,
+        'avg_saved_bps': avg_saved_bps,
+        'greedy_us': greedy_us,
+        'convex_us': convex_us,
+    }
+
+
+def benchmark_batch_routing(num_events: int = 5_000, pools_per_asset: int = 100,
+                            max_hops: int = 3):
+    """Throughput of route_wreckage_batch against a per-event route_wreckage loop"""
+    print(f"\n{BOLD}Batch Routing @ {num_events:,} events, {pools_per_asset} pools/asset{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(pools_per_asset * 20)
+    rng = np.random.default_rng(31)
+    assets = np.array(list(rails.pool_index._rows.keys()))
+    amounts = rng.uniform(10_000, 40_000_000, num_events)
+    event_assets = rng.choice(assets, num_events)
+
+    start = time.perf_counter()
+    single_routes = [rails.route_wreckage(float(amount), str(asset), max_hops)
+                     for amount, asset in zip(amounts, event_assets)]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_routes = rails.route_wreckage_batch(amounts, event_assets, max_hops)
+    batch_s = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for s_route, b_route in zip(single_routes, batch_routes)
+        if (s_route is None) != (b_route is None) or (s_route and (
+            s_route.hops != b_route.hops or s_route.fry_minted != b_route.fry_minted))
+    )
+
+    print(f"  Per-event loop:         {num_events / single_s:12,.0f} events/s")
+    print(f"  Batch API:              {FRY_GREEN}{num_events / batch_s:12,.0f} events/s{RESET}")
+    print(f"  Speedup:                {FRY_RED}{single_s / batch_s:12.1f}x{RESET}")
+    print(f"  Route mismatches:       {mismatches:12d}")
+
+    return {
+        'single_eps': num_events / single_s,
+        'batch_eps': num_events / batch_s,
+        'mismatches': mismatches,
+    }
+
+
+def _legacy_summary(pools: List[LiquidityPool]) -> Dict[str, float]:
+    """Pre-table get_liquidity_summary: per-venue Python sums over pool objects"""
+    by_venue: Dict[str, List[LiquidityPool]] = {}
+    for pool in pools:
+        by_venue.setdefault(pool.venue, []).append(pool)
+    return {venue: sum(p.available_liquidity() for p in venue_pools)
+            for venue, venue_pools in by_venue.items()}
+
+
+def benchmark_pool_table(num_pools: int = 10_000, iterations: int = 50):
+    """Memory per pool and summary latency: pool table vs LiquidityPool objects"""
+    print(f"\n{BOLD}Pool Table @ {num_pools:,} pools{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(num_pools)
+    snapshots = [rails.pool_table.pool(row) for row in rails.pool_table.active_rows().tolist()]
+
+    # Dataclass objects (one per pool, as the venue dict of lists held them),
+    # each owning its float fields like pools built from market data
+    tracemalloc.start()
+    objects = [LiquidityPool(p.venue, p.asset, p.depth_usd + 0.0, p.spread_bps + 0.0,
+                             p.funding_rate + 0.0, p.utilization + 0.0) for p in snapshots]
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = PoolTable()
+    for pool in snapshots:
+        table.add(pool)
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    legacy_us = _time_per_call(lambda: _legacy_summary(objects), iterations)
+    summary_us = _time_per_call(rails.get_liquidity_summary, iterations)
+    allocate_us = _time_per_call(lambda: rails.allocate_capital(10_000_000), iterations)
+
+    print(f"  Dataclass objects:      {object_bytes / len(objects):10.1f} bytes/pool")
+    print(f"  Pool table:             {FRY_GREEN}{table_bytes / len(table):10.1f} bytes/pool{RESET}")
+    print(f"  Legacy summary loop:    {legacy_us:10.1f} µs/call")
+    print(f"  get_liquidity_summary:  {FRY_GREEN}{summary_us:10.1f} µs/call{RESET}")
+    print(f"  Speedup:                {FRY_RED}{legacy_us / summary_us:10.1f}x{RESET}")
+    print(f"  allocate_capital:       {allocate_us:10.1f} µs/call")
+
+    return {
+        'object_bytes_per_pool': object_bytes / len(objects),
+        'table_bytes_per_pool': table_bytes / len(table),
+        'legacy_summary_us': legacy_us,
+        'summary_us': summary_us,
+        'allocate_us': allocate_us,
+    }
+
+
+def benchmark_quote_cache(num_quotes: int = 20_000, pools_per_asset: int = 100,
+                          execute_every: int = 500):
+    """Repeated quotes (popular sizes) with an execution every `execute_every` quotes"""
+    print(f"\n{BOLD}Quote Cache @ {num_quotes:,} quotes, execute every {execute_every}{RESET}")
+    print("-" * 70)
+
+    rng = np.random.default_rng(41)
+    sizes = np.round(rng.uniform(10_000, 5_000_000, 200), -3)
+    popularity = 1.0 / np.arange(1, len(sizes) + 1)  # Zipf-like request sizes
+    picks = rng.choice(len(sizes), num_quotes, p=popularity / popularity.sum())
+
+    timings = {}
+    for cached in (False, True):
+        rails = build_engine(pools_per_asset * 20)
+        assets = list(rails.pool_index._rows.keys())
+        quote = rails.quote_route if cached else rails.route_wreckage
+
+        start = time.perf_counter()
+        for i, pick in enumerate(picks.tolist()):
+            asset = assets[i % 4]
+            route = quote(float(sizes[pick]), asset, 3)
+            if route and i % execute_every == 0:
+                rails.execute_route(route)
+        timings[cached] = (time.perf_counter() - start) / num_quotes * 1e6
+
+    stats = rails.quote_cache.stats()
+
+    print(f"  Uncached route_wreckage: {timings[False]:10.1f} µs/quote")
+    print(f"  Cached quote_route:      {FRY_GREEN}{timings[True]:10.1f} µs/quote{RESET}")
+    print(f"  Speedup:                 {FRY_RED}{timings[False] / timings[True]:10.1f}x{RESET}")
+    print(f"  Hit rate:                {stats['hit_rate']:10.1%}")
+    print(f"  Hits / misses:           {stats['hits']:,} / {stats['misses']:,}")
+    print(f"  Invalidations:           {stats['invalidations']:,}")
+    print(f"  Evictions:               {stats['evictions']:,}")
+
+    return {
+        'uncached_us': timings[False],
+        'cached_us': timings[True],
+        **stats,
+    }
+
+
+def benchmark_reservations(num_threads: int = 32, ops_per_thread: int = 150,
+                           pools_per_asset: int = 100, commit_ratio: float = 0.8):
+    """
+    Concurrent quote -> reserve -> commit/release from `num_threads` threads.
+
+    Requests far exceed pool liquidity so threads compete for the same
+    pools. Liquidity is overbooked if any pool ends (or is ever observed)
+    with committed + reserved liquidity beyond its depth, or if committed
+    fills exceed what was available at the start.
+    """
+    print(f"\n{BOLD}Reservations @ {num_threads} threads x {ops_per_thread} ops{RESET}")
+    print("-" * 70)
+
+    total_ops = num_threads * ops_per_thread
+
+    def run(threads: int):
+        rails = build_engine(pools_per_asset * 4, num_assets=4)
+        logging.getLogger("liquidity_rails_engine").setLevel(logging.ERROR)  # exhausted pools warn
+        table = rails.pool_table
+        rows = table.active_rows()
+        initial_available = table.depth_usd[rows] * (1.0 - table.utilization[rows])
+        initial_utilization = table.utilization[rows].copy()
+        assets = list(rails.pool_index._rows.keys())
+
+        committed = [dict() for _ in range(threads)]
+        counts = np.zeros((threads, 3), dtype=np.int64)  # committed, released, no route
+        violations = []
+        done = threading.Event()
+
+        def worker(t: int):
+            rng = np.random.default_rng(100 + t)
+            for _ in range(total_ops // threads):
+                amount = float(rng.uniform(100_000, 5_000_000))
+                reservation = rails.route_and_reserve(amount, str(rng.choice(assets)), 3)
+                if reservation is None:
+                    counts[t, 2] += 1
+                elif rng.random() < commit_ratio:
+                    rails.commit_reservation(reservation)
+                    for row, held in reservation.holds.items():
+                        committed[t][row] = committed[t].get(row, 0.0) + held
+                    counts[t, 0] += 1
+                else:
+                    rails.release_reservation(reservation)
+                    counts[t, 1] += 1
+
+        def monitor():
+            # Lock-free invariant sampling while the workers run
+            while not done.is_set():
+                used = table.depth_usd[rows] * table.utilization[rows] + table.reserved_usd[rows]
+                if np.any(used > table.depth_usd[rows] * (1 + 1e-9)):
+                    violations.append(used)
+                time.sleep(0.001)
+
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        watcher = threading.Thread(target=monitor)
+        watcher.start()
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        watcher.join()
+
+        committed_usd = np.zeros(len(rows))
+        position = {row: i for i, row in enumerate(rows.tolist())}
+        for thread_fills in committed:
+            for row, held in thread_fills.items():
+                committed_usd[position[row]] += held
+
+        utilization_usd = (table.utilization[rows] - initial_utilization) * table.depth_usd[rows]
+        checks = {
+            'overbooked_pools': int(np.sum(committed_usd > initial_available + 1e-6)),
+            'accounting_errors': int(np.sum(np.abs(utilization_usd - committed_usd) > 1e-3)),
+            'max_utilization': float(table.utilization[rows].max()),
+            'leftover_reserved': float(table.reserved_usd[rows].sum()),
+            'open_reservations': len(rails.reservations),
+            'monitor_violations': len(violations),
+        }
+        return total_ops / elapsed, counts.sum(axis=0), rails.reservation_conflicts, checks
+
+    single_ops, _, _, _ = run(1)
+    ops, (num_committed, num_released, num_none), conflicts, checks = run(num_threads)
+
+    print(f"  1 thread:               {single_ops:10,.0f} ops/s ({total_ops:,} ops)")
+    print(f"  {num_threads} threads:             {FRY_GREEN}{ops:10,.0f} ops/s{RESET}")
+    print(f"  Committed / released:   {num_committed:,} / {num_released:,}"
+          f" ({num_none:,} with no route left)")
+    print(f"  Reservation conflicts:  {conflicts:,} (re-quoted)")
+    print(f"  Max pool utilization:   {checks['max_utilization']:10.4f}")
+    ok = (checks['overbooked_pools'] == 0 and checks['accounting_errors'] == 0
+          and checks['monitor_violations'] == 0 and checks['open_reservations'] == 0
+          and checks['leftover_reserved'] < 1e-3)
+    status = f"{FRY_GREEN}never overbooked{RESET}" if ok else f"{FRY_RED}OVERBOOKED{RESET}"
+    print(f"  Liquidity:              {status} {checks}")
+
+    return {
+        'single_thread_ops': single_ops,
+        'threaded_ops': ops,
+        'conflicts': conflicts,
+        **checks,
+    }
+
+
+def _full_allocation(rails: LiquidityRailsEngine, total_capital: float) -> Dict[str, float]:
+    """Allocation recomputed from every pool (the pre-aggregate algorithm)"""
+    venue_scores = {}
+    for venue, pools in rails.liquidity_pools.items():
+        total_depth = sum(p.depth_usd for p in pools)
+        avg_utilization = np.mean([p.utilization for p in pools])
+        avg_funding = np.mean([abs(p.funding_rate) for p in pools])
+        venue_scores[venue] = total_depth * (1 - avg_utilization) / (1 + avg_funding * 100)
+    total_score = sum(venue_scores.values())
+    return {venue: score / total_score * total_capital for venue, score in venue_scores.items()}
+
+
+def benchmark_allocation(num_pools: int = 10_000, iterations: int = 200,
+                         changes_per_call: int = 5):
+    """allocate_capital after a few pool changes, and cached GETs with no changes"""
+    print(f"\n{BOLD}Capital Allocation @ {num_pools:,} pools, {changes_per_call} changes/call{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(num_pools)
+    rng = np.random.default_rng(53)
+    rows = rails.pool_table.active_rows()
+    changes = [(int(rows[i]), float(u)) for i, u in zip(
+        rng.integers(0, len(rows), iterations * changes_per_call),
+        rng.uniform(0.3, 0.9, iterations * changes_per_call))]
+
+    full_start = time.perf_counter()
+    for _ in range(5):
+        _full_allocation(rails, 10_000_000)
+    full_us = (time.perf_counter() - full_start) / 5 * 1e6
+
+    it = iter(changes)
+
+    def changed_then_allocate():
+        for _ in range(changes_per_call):
+            rails.pool_index.update(*next(it))
+        rails.allocate_capital(10_000_000)
+
+    rails.allocate_capital(10_000_000)
+    incremental_us = _time_per_call(changed_then_allocate, iterations)
+    cached_us = _time_per_call(lambda: rails.allocate_capital(10_000_000, use_cache=True), iterations)
+
+    # Incremental aggregates must agree with a full recompute
+    reference = _full_allocation(rails, 10_000_000)
+    drift = max(abs(rails.capital_allocations[venue] - amount) / amount
+                for venue, amount in reference.items())
+
+    print(f"  Full recompute:         {full_us:10.1f} µs/call")
+    print(f"  Incremental:            {FRY_GREEN}{incremental_us:10.1f} µs/call{RESET}"
+          f" (incl. {changes_per_call} index updates)")
+    print(f"  Cached (no changes):    {FRY_GREEN}{cached_us:10.1f} µs/call{RESET}")
+    print(f"  Speedup:                {FRY_RED}{full_us / incremental_us:10.1f}x{RESET}")
+    print(f"  Max relative drift:     {drift:10.2e}")
+
+    return {
+        'full_us': full_us,
+        'incremental_us': incremental_us,
+        'cached_us': cached_us,
+        'max_drift': drift,
+    }
+
+
+class _GuardCountingProfiler(RoutingProfiler):
+    """Disabled profiler that counts how often instrumented code checks it"""
+
+    def __init__(self):
+        super().__init__()
+        self.checks = 0
+
+    @property
+    def enabled(self):
+        self.checks += 1
+        return False
+
+    @enabled.setter
+    def enabled(self, value):
+        pass
+
+
+def benchmark_profiler(num_requests: int = 2_000, pools_per_asset: int = 100):
+    """Stage breakdown of route_wreckage and the cost of the timers when disabled"""
+    print(f"\n{BOLD}Routing Profiler @ {num_requests:,} requests, {pools_per_asset} pools/asset{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(pools_per_asset * 20)
+    rng = np.random.default_rng(61)
+    assets = list(rails.pool_index._rows.keys())
+    requests = [(float(rng.uniform(10_000, 20_000_000)), str(rng.choice(assets)))
+                for _ in range(num_requests)]
+
+    # Disabled cost = guard checks per call x cost of one check
+    counting = rails.profiler = _GuardCountingProfiler()
+    for amount, asset in requests[:100]:
+        rails.route_wreckage(amount, asset, 3)
+    checks_per_call = counting.checks / 100
+
+    profiler = RoutingProfiler()
+    check_ns = min(
+        _time_per_call(lambda: profiler.enabled, 100_000) for _ in range(5)
+    ) * 1e3
+    empty_ns = min(_time_per_call(lambda: None, 100_000) for _ in range(5)) * 1e3
+    overhead_ns = checks_per_call * max(check_ns - empty_ns, 0.0)
+
+    rails.profiler = profiler
+    it = iter(requests)
+    disabled_us = _time_per_call(lambda: rails.route_wreckage(*next(it), 3), num_requests)
+
+    profiler.enable()
+    it = iter(requests)
+    enabled_us = _time_per_call(lambda: rails.route_wreckage(*next(it), 3), num_requests)
+    stats = profiler.stats()
+
+    print(f"  {'stage':<22}{'count':>8}{'mean µs':>10}{'p50 µs':>10}{'p99 µs':>10}")
+    for stage, summary in sorted(stats['stages'].items(), key=lambda x: -x[1]['total_ms']):
+        print(f"  {stage:<22}{summary['count']:>8}{summary['mean_us']:>10.1f}"
+              f"{summary['p50_us']:>10.1f}{summary['p99_us']:>10.1f}")
+    print(f"  Counters:               {stats['counters']}")
+    print(f"  route_wreckage:         {disabled_us:10.1f} µs disabled / {enabled_us:.1f} µs enabled")
+    print(f"  Disabled overhead:      {FRY_GREEN}{overhead_ns:10.1f} ns/call{RESET}"
+          f" ({checks_per_call:.0f} checks x {check_ns - empty_ns:.1f} ns)")
+
+    return {
+        'disabled_us': disabled_us,
+        'enabled_us': enabled_us,
+        'disabled_overhead_ns': overhead_ns,
+        'stages': stats['stages'],
+    }
+
+
+def benchmark_snapshot(num_pools: int = 100_000):
+    """Binary snapshot save/load against re-adding every pool"""
+    print(f"\n{BOLD}Snapshot @ {num_pools:,} pools{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(num_pools)
+    pools = [rails.pool_table.pool(row) for row in rails.pool_table.active_rows().tolist()]
+    path = os.path.join(tempfile.mkdtemp(), "rails.snapshot")
+
+    start = time.perf_counter()
+    rebuilt = LiquidityRailsEngine()
+    for pool in pools:
+        if rebuilt.get_pool(pool.venue, pool.asset) is None:  # defaults already added
+            rebuilt.add_pool(pool)
+    rebuild_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    rails.save_snapshot(path)
+    save_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    loaded = LiquidityRailsEngine(snapshot_path=path)
+    mmap_ms = (time.perf_counter() - start) * 1e3
+    assert loaded.get_liquidity_summary()['venues'] == rails.get_liquidity_summary()['venues']
+
+    start = time.perf_counter()
+    loaded.load_snapshot(path, mmap=False)
+    read_ms = (time.perf_counter() - start) * 1e3
+
+    size = os.path.getsize(path)
+    os.remove(path)
+
+    print(f"  Rebuild via add_pool:   {rebuild_ms:10.1f} ms")
+    print(f"  save_snapshot:          {save_ms:10.1f} ms ({size / num_pools:.1f} bytes/pool)")
+    print(f"  Warm start (mmap):      {FRY_GREEN}{mmap_ms:10.1f} ms{RESET}")
+    print(f"  Warm start (read):      {read_ms:10.1f} ms")
+    print(f"  Speedup:                {FRY_RED}{rebuild_ms / mmap_ms:10.1f}x{RESET}")
+
+    return {
+        'rebuild_ms': rebuild_ms,
+        'save_ms': save_ms,
+        'mmap_load_ms': mmap_ms,
+        'read_load_ms': read_ms,
+        'bytes_per_pool': size / num_pools,
+    }
+
+
+def _brute_force_frontier(rails: LiquidityRailsEngine, amount_usd: float, asset: str,
+                          max_hops: int, resolution: int) -> List[tuple]:
+    """(cost, FRY) frontier from every pool subset x every fill split"""
+    rows = np.array(rails.pool_index.candidates(asset, amount_usd * 0.1), dtype=np.intp)
+    depth, spread, available, native = rails.pool_table.columns(rows)
+    q = resolution
+
+    fills = amount_usd * np.arange(1, q + 1) / q
+    hop_cost = (spread[:, None] + np.float_power(fills / depth[:, None], 2) * 100) * (fills / amount_usd)
+    hop_cost[fills > available[:, None]] = np.inf
+
+    points = []
+    for k in range(1, max_hops + 1):
+        pools = np.array(list(itertools.combinations(range(len(rows)), k)))
+        # Positive k-part splits of q steps
+        cuts = list(itertools.combinations(range(1, q), k - 1))
+        cuts = np.array(cuts, dtype=np.intp).reshape(len(cuts), k - 1)
+        splits = np.diff(np.hstack([np.zeros((len(cuts), 1), np.intp), cuts,
+                                    np.full((len(cuts), 1), q)]), axis=1)
+        cost = sum(hop_cost[pools[:, i, None], splits[None, :, i] - 1] for i in range(k))
+        natives = native[pools].sum(axis=1).astype(np.float64)[:, None]
+        fry = rails._calculate_fry_minting(amount_usd, cost, num_hops=k, native_hops=natives)
+        finite = np.isfinite(cost)
+        points.extend(zip(cost[finite].tolist(), np.broadcast_to(fry, cost.shape)[finite].tolist()))
+
+    frontier, best_fry = [], -np.inf
+    for cost, fry in sorted(points, key=lambda x: (x[0], -x[1])):
+        if fry > best_fry:
+            frontier.append((cost, fry))
+            best_fry = fry
+    return frontier
+
+
+def _pareto_engine(extra_pools: int, seed: int = 71) -> LiquidityRailsEngine:
+    """Default BTC pools (two native venues) plus `extra_pools` synthetic BTC pools"""
+    rails = build_engine(0, num_assets=1)
+    rng = np.random.default_rng(seed)
+    for v in range(extra_pools):
+        rails.add_pool(LiquidityPool(
+            venue=f"Venue{v}",
+            asset="BTC",
+            depth_usd=float(rng.uniform(5_000_000, 50_000_000)),
+            spread_bps=float(rng.uniform(2.0, 5.0)),
+            funding_rate=0.0,
+            utilization=float(rng.uniform(0.3, 0.7))
+        ))
+    return rails
+
+
+def benchmark_pareto(max_hops: int = 3, resolution: int = 20):
+    """DP frontier against brute-force enumeration, then DP latency at scale"""
+    print(f"\n{BOLD}Pareto Route Search @ max_hops={max_hops}, {resolution} fill steps{RESET}")
+    print("-" * 70)
+
+    rng = np.random.default_rng(73)
+    mismatches = 0
+    brute_ms, dp_ms = [], []
+    for trial in range(5):
+        rails = _pareto_engine(10, seed=trial)
+        amount = float(rng.uniform(5_000_000, 30_000_000))
+
+        start = time.perf_counter()
+        expected = _brute_force_frontier(rails, amount, "BTC", max_hops, resolution)
+        brute_ms.append((time.perf_counter() - start) * 1e3)
+
+        start = time.perf_counter()
+        frontier = rails.pareto_routes(amount, "BTC", max_hops, resolution)
+        dp_ms.append((time.perf_counter() - start) * 1e3)
+
+        found = [(route.total_cost_bps, route.fry_minted) for route in frontier]
+        if len(found) != len(expected) or not np.allclose(found, expected, rtol=1e-9):
+            mismatches += 1
+
+    print(f"  15 pools (5 trials):    brute force {np.mean(brute_ms):8.1f} ms"
+          f" / DP {FRY_GREEN}{np.mean(dp_ms):6.1f} ms{RESET}")
+    print(f"  Frontier mismatches:    {mismatches:10d}")
+
+    results = {'mismatches': mismatches, 'brute_ms': float(np.mean(brute_ms))}
+    for num_pools in (100, 200):
+        rails = _pareto_engine(num_pools)
+        amounts = rng.uniform(5_000_000, 60_000_000, 20)
+        start = time.perf_counter()
+        sizes = [len(rails.pareto_routes(float(a), "BTC", max_hops, resolution)) for a in amounts]
+        latency_ms = (time.perf_counter() - start) / len(amounts) * 1e3
+        print(f"  {num_pools + 5} pools:              DP {FRY_GREEN}{latency_ms:6.1f} ms/query{RESET}"
+              f" ({np.mean(sizes):.1f} frontier routes avg)")
+        results[f'dp_ms_{num_pools + 5}'] = latency_ms
+
+    return results
+
+
+def _deepcopy_engine(rails: LiquidityRailsEngine) -> LiquidityRailsEngine:
+    """Full engine copy; locks are shared since deepcopy cannot copy them"""
+    locks = list(rails._pool_locks) + [rails._state_lock, rails.pool_index._lock,
+                                       rails.quote_cache._lock, rails.profiler._lock]
+    return copy.deepcopy(rails, {id(lock): lock for lock in locks})
+
+
+def benchmark_what_if(num_pools: int = 100_000, num_events: int = 1_000):
+    """Copy-on-write what-if overlays against deep-copying the engine"""
+    print(f"\n{BOLD}What-If Overlays @ {num_pools:,} pools, {num_events:,} events{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(num_pools)
+    logging.getLogger("liquidity_rails_engine").setLevel(logging.ERROR)  # exhausted pools warn
+    before = rails.get_liquidity_summary()
+    rng = np.random.default_rng(83)
+    assets = sorted({rails.pool_table.asset_of(row) for row in rails.pool_table.active_rows().tolist()})
+    events = [(float(rng.uniform(100_000, 30_000_000)), assets[int(rng.integers(len(assets)))])
+              for _ in range(num_events)]
+
+    def run(engine: LiquidityRailsEngine) -> List:
+        hops = []
+        for amount, asset in events:
+            route = engine.route_wreckage(amount, asset)
+            if route:
+                engine.execute_route(route)
+                hops.append(route.hops)
+        return hops
+
+    start = time.perf_counter()
+    deep = _deepcopy_engine(rails)
+    deepcopy_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    overlay = rails.what_if()
+    overlay_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    overlay_hops = run(overlay)
+    overlay_run_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    deep_hops = run(deep)
+    deep_run_ms = (time.perf_counter() - start) * 1e3
+
+    identical = (overlay_hops == deep_hops
+                 and overlay.get_liquidity_summary() == deep.get_liquidity_summary())
+    untouched = rails.get_liquidity_summary() == before
+
+    print(f"  deepcopy(engine):       {deepcopy_ms:10.2f} ms")
+    print(f"  what_if():              {FRY_GREEN}{overlay_ms:10.2f} ms{RESET}")
+    print(f"  Routes on overlay:      {overlay_run_ms:10.1f} ms")
+    print(f"  Routes on deep copy:    {deep_run_ms:10.1f} ms")
+    print(f"  Identical results:      {str(identical):>10}")
+    print(f"  Live state untouched:   {str(untouched):>10}")
+
+    return {
+        'deepcopy_ms': deepcopy_ms,
+        'what_if_ms': overlay_ms,
+        'overlay_run_ms': overlay_run_ms,
+        'deepcopy_run_ms': deep_run_ms,
+        'identical': identical,
+        'untouched': untouched,
+    }
+
+
+def _route_key(route) -> tuple:
+    return tuple((hop['venue'], round(hop['amount'], 6)) for hop in route.hops)
+
+
+def benchmark_robust_routes(pools_per_asset: int = 50, num_requests: int = 100,
+                            holdout_scenarios: int = 20_000):
+    """Robust route choice vs point estimates, judged on held-out scenarios"""
+    print(f"\n{BOLD}Robust Routing @ {pools_per_asset} pools/asset, {num_requests} requests{RESET}")
+    print("-" * 70)
+
+    rails = build_engine(pools_per_asset * 20, num_assets=20)
+    rng = np.random.default_rng(79)
+    requests = [(float(rng.uniform(5_000_000, 60_000_000)), f"ASSET{rng.integers(20)}")
+                for _ in range(num_requests)]
+
+    start = time.perf_counter()
+    for amount, asset in requests:
+        rails.route_wreckage(amount, asset)
+    point_ms = (time.perf_counter() - start) / num_requests * 1e3
+
+    robust_ms, robust_routes = [], []
+    for amount, asset in requests:
+        start = time.perf_counter()
+        robust_routes.append(rails.route_wreckage_robust(amount, asset))
+        robust_ms.append((time.perf_counter() - start) * 1e3)
+
+    # Point-estimate pick: most fry_minted among the same candidates.
+    # Judge both picks on scenarios neither one was chosen with.
+    flips, point_tail, robust_tail = 0, 0.0, 0.0
+    for (amount, asset), robust in zip(requests, robust_routes):
+        if robust is None:
+            continue
+        scored = rails.robust_routes(amount, asset, num_scenarios=holdout_scenarios,
+                                     latency_budget_ms=None, seed=97)
+        holdout = {_route_key(route.route): route.tail_fry for route in scored}
+        point = max(scored, key=lambda route: route.route.fry_minted).route
+        flips += _route_key(point) != _route_key(robust.route)
+        point_tail += holdout[_route_key(point)]
+        robust_tail += holdout[_route_key(robust.route)]
+
+    scenarios = np.mean([route.scenarios for route in robust_routes if route])
+    print(f"  route_wreckage:         {point_ms:10.2f} ms/request")
+    print(f"  route_wreckage_robust:  {FRY_GREEN}{np.mean(robust_ms):10.2f} ms/request{RESET}"
+          f" (p99 {np.percentile(robust_ms, 99):.2f} ms, {scenarios:,.0f} scenarios avg)")
+    print(f"  Route flips:            {flips:10d} / {num_requests}")
+    print(f"  Held-out 5% tail FRY:   {FRY_RED}{robust_tail / point_tail - 1:+10.2%}{RESET}"
+          f" vs max point-estimate FRY")
+
+    return {
+        'point_ms': point_ms,
+        'robust_ms': float(np.mean(robust_ms)),
+        'robust_p99_ms': float(np.percentile(robust_ms, 99)),
+        'flips': flips,
+        'tail_gain': robust_tail / point_tail - 1,
+    }
+
+
+def main():
+    print(f"\n{FRY_RED}{BOLD}{'='*70}{RESET}")
+    print(f"{FRY_RED}{BOLD}FRY Liquidity Rails - Benchmarks{RESET}")
+    print(f"{FRY_RED}{BOLD}{'='*70}{RESET}")
+
+    benchmark_pool_index()
+    benchmark_split_solver()
+    benchmark_batch_routing()
+    benchmark_pool_table()
+    benchmark_quote_cache()
+    benchmark_reservations()
+    benchmark_allocation()
+    benchmark_profiler()
+    benchmark_snapshot()
+    benchmark_pareto()
+    benchmark_what_if()
+    benchmark_robust_routes()
+
+    print(f"\n{FRY_RED}{BOLD}{'='*70}{RESET}\n")
+
+
+if __name__ == "__main__":
+    main()
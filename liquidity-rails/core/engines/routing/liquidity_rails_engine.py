@@ -37,6 +37,16 @@ Architecture:
 
 Features:
 - Optimal wreckage routing across DEX network
+- Asset-indexed pool selection ordered by available liquidity
+- Columnar (structure-of-arrays) pool table with O(1) venue/asset lookup
+- Versioned LRU route quote cache invalidated on pool-state changes
+- Quote → reserve → commit/release execution with striped pool locks
+- Incrementally maintained venue aggregates for capital allocation
+- Runtime-switchable per-stage routing timers (p50/p99 histograms)
+- Versioned binary snapshots with memory-mapped warm start
+- Pareto-frontier route search (cost vs FRY minted)
+- Copy-on-write "what-if" overlays for hypothetical route sequences
+- Monte Carlo robust route scoring under funding/depth noise
 - Liquidity aggregation for better fills
 - Capital allocation based on minting surface gradients
 - Market-making for unmatched wreckage
@@ -51,9 +61,22 @@ Usage:
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import count
+from typing import Dict, List, Tuple, Optional, Sequence
+from dataclasses import dataclass, field
+import copy
+import json
 import logging
+import os
+import struct
+import threading
+import time
+
+from funding_scenarios import (EFFICIENCY_NOISE_STD, FUNDING_NOISE_STD, SCENARIO_COUNT,
+                               SCENARIO_LATENCY_BUDGET_MS, SCENARIO_SEED, TAIL_QUANTILE,
+                               funding_drag, monte_carlo_fry)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -65,6 +88,35 @@ FRY_GREEN = "\033[92m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
 
+# Routing
+MAX_COST_BPS = 50
+SPLIT_SOLVERS = ('greedy', 'convex')
+
+# Pareto route search: fills move in amount/PARETO_RESOLUTION steps
+PARETO_RESOLUTION = 20
+
+# Route quote cache
+QUOTE_CACHE_SIZE = 4096
+QUOTE_BUCKET_USD = 1.0  # Quotes are computed at amounts rounded to this
+
+# Liquidity reservations
+RESERVATION_TOLERANCE_USD = 1e-6  # Float slack when a hop takes a whole pool
+RESERVATION_RETRIES = 3
+POOL_LOCK_STRIPES = 1024  # Pool row r is guarded by lock r % POOL_LOCK_STRIPES
+
+# Engine snapshots: magic, format version, header length, JSON header,
+# then 64-byte aligned raw pool table columns
+SNAPSHOT_MAGIC = b'FRYRAILS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_PREAMBLE = struct.Struct('<8sII')
+SNAPSHOT_ALIGN = 64
+
+# Venues paying the native stablecoin bonus (USDH / USDF)
+NATIVE_STABLECOIN_VENUES = {
+    "Hyperliquid": "USDH",
+    "Aster": "USDF",
+}
+
 
 @dataclass
 class LiquidityPool:
@@ -93,6 +145,823 @@ class LiquidityPool:
         return total_cost_bps
 
 
+def water_fill_split(amount_usd, depth: np.ndarray, spread: np.ndarray,
+                     available: np.ndarray, max_hops: Optional[int] = None,
+                     tolerance: float = 1e-10, max_iterations: int = 64) -> np.ndarray:
+    """
+    Cost-minimizing split of `amount_usd` across pools (water-filling / KKT).
+    
+    Filling x through a pool costs x * (spread + 100 * (x / depth)^2) bps-USD,
+    so the total is convex and the optimum equalizes marginal cost
+    
+        spread_i + 300 * (x_i / depth_i)^2 = lambda
+    
+    across every pool that is neither empty nor full. Each pool's fill is
+    closed-form in lambda, so only the scalar lambda is searched for, with
+    bracketed Newton steps vectorized over all pools (typically < 10 steps).
+    
+    `max_hops` caps the number of pools used: the unconstrained optimum is
+    solved first, then re-solved over the `max_hops` largest fills (or the
+    `max_hops` deepest pools when those can't absorb the amount).
+    
+    `amount_usd` may be an array of m amounts; pool arrays then broadcast to
+    (m, n) and every row is solved independently in the same pass.
+    
+    Returns:
+        Fill per pool (same order as inputs). Sums to the amount whenever
+        the chosen pools can absorb it, otherwise every chosen pool is full.
+    """
+    batched = np.ndim(amount_usd) > 0
+    amounts = np.asarray(amount_usd, dtype=np.float64).reshape(-1)
+    
+    depth, spread, available = np.broadcast_arrays(
+        np.asarray(depth, dtype=np.float64),
+        np.asarray(spread, dtype=np.float64),
+        np.maximum(np.asarray(available, dtype=np.float64), 0.0)
+    )
+    shape = (len(amounts), depth.shape[-1])
+    depth = np.broadcast_to(depth, shape)
+    spread = np.broadcast_to(spread, shape)
+    available = np.broadcast_to(available, shape)
+    
+    fills = available.copy()
+    solve = available.sum(axis=1) > amounts
+    if solve.any():
+        fills[solve] = _solve_water_level(
+            amounts[solve], depth[solve], spread[solve], available[solve],
+            tolerance, max_iterations
+        )
+    
+    if max_hops is not None:
+        over = np.count_nonzero(fills, axis=1) > max_hops
+        if over.any():
+            over_fills, over_available = fills[over], available[over]
+            keep = np.argsort(-over_fills, axis=1, kind='stable')[:, :max_hops]
+            
+            # Largest fills can't absorb it all - keep the deepest pools instead
+            short = np.take_along_axis(over_available, keep, axis=1).sum(axis=1) < amounts[over]
+            keep[short] = np.argsort(-over_available[short], axis=1, kind='stable')[:, :max_hops]
+            
+            capped = np.zeros_like(over_fills)
+            np.put_along_axis(capped, keep, water_fill_split(
+                amounts[over],
+                np.take_along_axis(depth[over], keep, axis=1),
+                np.take_along_axis(spread[over], keep, axis=1),
+                np.take_along_axis(over_available, keep, axis=1),
+                tolerance=tolerance, max_iterations=max_iterations
+            ), axis=1)
+            fills[over] = capped
+    
+    return fills if batched else fills[0]
+
+
+def _solve_water_level(amounts: np.ndarray, depth: np.ndarray, spread: np.ndarray,
+                       available: np.ndarray, tolerance: float,
+                       max_iterations: int) -> np.ndarray:
+    """Per-row water level search for water_fill_split (rows can absorb their amount)"""
+    
+    # lambda at which every pool is saturated bounds the search
+    lo = spread.min(axis=1)
+    hi = (spread + 300.0 * (available / depth) ** 2).max(axis=1)
+    
+    # Start from the unsaturated solution with every pool at the best spread
+    lam = np.minimum(lo + 300.0 * (amounts / depth.sum(axis=1)) ** 2, hi)
+    scale = depth / np.sqrt(300.0)
+    
+    for _ in range(max_iterations):
+        root = np.sqrt(np.maximum(lam[:, None] - spread, 0.0))
+        unfilled = scale * root
+        fills = np.minimum(unfilled, available)
+        
+        excess = fills.sum(axis=1) - amounts
+        searching = np.abs(excess) > tolerance * amounts
+        if not searching.any():
+            break
+        lo = np.where(searching & (excess < 0), lam, lo)
+        hi = np.where(searching & (excess >= 0), lam, hi)
+        
+        # d(fill)/d(lambda) for pools between empty and full
+        open_pools = (unfilled < available) & (root > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = 0.5 * np.where(open_pools, scale / root, 0.0).sum(axis=1)
+            step = lam - excess / slope
+        bracketed = (slope > 0) & (lo < step) & (step < hi)
+        lam = np.where(searching, np.where(bracketed, step, 0.5 * (lo + hi)), lam)
+    
+    # Trim residual off so fills sum to the amount
+    return np.minimum(fills * (amounts / fills.sum(axis=1))[:, None], available)
+
+
+class PoolTable:
+    """
+    Columnar (structure-of-arrays) store for liquidity pools.
+    
+    Pool state lives in contiguous NumPy columns indexed by row, so routing
+    and summaries run as vector operations. Venue and asset names are
+    interned to integer ids, (venue, asset) maps to its row in O(1), and
+    rows freed by removals are reused by later adds.
+    
+    Per-venue aggregates (pool count, depth, utilization and |funding|
+    sums) are kept up to date on every add/remove/utilization change, and
+    the venues they touched are collected in `changed_venues`.
+    """
+    
+    def __init__(self, capacity: int = 16):
+        self.depth_usd = np.zeros(capacity)
+        self.spread_bps = np.zeros(capacity)
+        self.funding_rate = np.zeros(capacity)
+        self.utilization = np.zeros(capacity)
+        self.reserved_usd = np.zeros(capacity)  # Held by open reservations
+        self.venue_id = np.zeros(capacity, dtype=np.int32)
+        self.asset_id = np.zeros(capacity, dtype=np.int32)
+        self.native = np.zeros(capacity, dtype=bool)  # USDH/USDF venue
+        self.active = np.zeros(capacity, dtype=bool)
+        
+        self.venues: List[str] = []
+        self.assets: List[str] = []
+        self._venue_ids: Dict[str, int] = {}
+        self._asset_ids: Dict[str, int] = {}
+        
+        self.rows: Dict[int, int] = {}  # venue_id << 32 | asset_id -> row
+        self._free_rows: List[int] = []
+        self.size = 0  # High-water mark of used rows
+        
+        # Venue aggregates, indexed by venue id
+        self.venue_pools = np.zeros(0, dtype=np.int64)
+        self.venue_depth = np.zeros(0)
+        self.venue_utilization = np.zeros(0)  # Sum over the venue's pools
+        self.venue_abs_funding = np.zeros(0)  # Sum of |funding_rate|
+        self.changed_venues: set = set()
+    
+    _COLUMNS = ('depth_usd', 'spread_bps', 'funding_rate', 'utilization',
+                'reserved_usd', 'venue_id', 'asset_id', 'native', 'active')
+    _VENUE_COLUMNS = ('venue_pools', 'venue_depth', 'venue_utilization', 'venue_abs_funding')
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def _intern(self, names: List[str], ids: Dict[str, int], name: str) -> int:
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+    
+    def _grow(self):
+        """Double column capacity"""
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros(max(len(column), 16), column.dtype)]))
+    
+    def _grow_venues(self):
+        """Double venue aggregate capacity"""
+        for name in self._VENUE_COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros(max(len(column), 8), column.dtype)]))
+    
+    def add(self, pool: LiquidityPool) -> int:
+        """Store pool in a free row and return the row"""
+        if self.row(pool.venue, pool.asset) is not None:
+            raise ValueError(f"Pool {pool.venue}/{pool.asset} already exists")
+        
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            if self.size == len(self.active):
+                self._grow()
+            row = self.size
+            self.size += 1
+        
+        venue = self._intern(self.venues, self._venue_ids, pool.venue)
+        if venue == len(self.venue_pools):
+            self._grow_venues()
+        
+        self.depth_usd[row] = pool.depth_usd
+        self.spread_bps[row] = pool.spread_bps
+        self.funding_rate[row] = pool.funding_rate
+        self.utilization[row] = pool.utilization
+        self.reserved_usd[row] = 0.0
+        asset = self._intern(self.assets, self._asset_ids, pool.asset)
+        self.venue_id[row] = venue
+        self.asset_id[row] = asset
+        self.native[row] = pool.venue in NATIVE_STABLECOIN_VENUES
+        self.active[row] = True
+        
+        self.venue_pools[venue] += 1
+        self.venue_depth[venue] += self.depth_usd[row]
+        self.venue_utilization[venue] += self.utilization[row]
+        self.venue_abs_funding[venue] += abs(self.funding_rate[row])
+        self.changed_venues.add(venue)
+        
+        self.rows[venue << 32 | asset] = row
+        return row
+    
+    def remove(self, row: int) -> LiquidityPool:
+        """Free row and return a detached copy of its pool"""
+        pool = self.pool(row)
+        del self.rows[int(self.venue_id[row]) << 32 | int(self.asset_id[row])]
+        self.active[row] = False
+        self._free_rows.append(row)
+        
+        venue = self.venue_id[row]
+        self.venue_pools[venue] -= 1
+        if self.venue_pools[venue] == 0:
+            # Reset exactly rather than leave float residue
+            self.venue_depth[venue] = 0.0
+            self.venue_utilization[venue] = 0.0
+            self.venue_abs_funding[venue] = 0.0
+        else:
+            self.venue_depth[venue] -= self.depth_usd[row]
+            self.venue_utilization[venue] -= self.utilization[row]
+            self.venue_abs_funding[venue] -= abs(self.funding_rate[row])
+        self.changed_venues.add(int(venue))
+        
+        return pool
+    
+    def set_utilization(self, row: int, utilization: float):
+        """Write row utilization, keeping its venue aggregate current"""
+        venue = self.venue_id[row]
+        self.venue_utilization[venue] += utilization - self.utilization[row]
+        self.utilization[row] = utilization
+        self.changed_venues.add(int(venue))
+    
+    _SNAPSHOT_COLUMNS = ('depth_usd', 'spread_bps', 'funding_rate', 'utilization',
+                         'venue_id', 'asset_id', 'native', 'active')
+    
+    def snapshot_columns(self) -> Dict[str, np.ndarray]:
+        """Used rows of every persisted column (reservations are not persisted)"""
+        return {name: getattr(self, name)[:self.size] for name in self._SNAPSHOT_COLUMNS}
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray],
+                     venues: List[str], assets: List[str]) -> 'PoolTable':
+        """
+        Rebuild a table around existing column arrays (e.g. memory-mapped).
+        
+        Row lookup, free rows and venue aggregates are derived in bulk; the
+        columns themselves are used as-is until the table grows.
+        """
+        table = cls(capacity=0)
+        size = len(columns['active'])
+        for name in cls._SNAPSHOT_COLUMNS:
+            setattr(table, name, columns[name])
+        table.reserved_usd = np.zeros(size)
+        table.size = size
+        
+        table.venues = list(venues)
+        table.assets = list(assets)
+        table._venue_ids = {name: i for i, name in enumerate(table.venues)}
+        table._asset_ids = {name: i for i, name in enumerate(table.assets)}
+        
+        active = table.active_rows()
+        venue_ids = table.venue_id[active]
+        keys = venue_ids.astype(np.int64) << 32 | table.asset_id[active].astype(np.int64)
+        table.rows = dict(zip(keys.tolist(), active.tolist()))
+        table._free_rows = np.flatnonzero(~table.active[:size]).tolist()[::-1]
+        
+        num_venues = max(len(table.venues), 8)
+        table.venue_pools = np.bincount(venue_ids, minlength=num_venues).astype(np.int64)
+        table.venue_depth = np.bincount(venue_ids, table.depth_usd[active], num_venues)
+        table.venue_utilization = np.bincount(venue_ids, table.utilization[active], num_venues)
+        table.venue_abs_funding = np.bincount(
+            venue_ids, np.abs(table.funding_rate[active]), num_venues
+        )
+        table.changed_venues = set(range(len(table.venues)))
+        
+        return table
+    
+    def take_changed_venues(self) -> np.ndarray:
+        """Venue ids changed since the last call (clears the set)"""
+        changed, self.changed_venues = self.changed_venues, set()
+        return np.fromiter(changed, dtype=np.intp, count=len(changed))
+    
+    def row(self, venue: str, asset: str) -> Optional[int]:
+        """Row holding the pool for asset at venue"""
+        venue_id = self._venue_ids.get(venue)
+        asset_id = self._asset_ids.get(asset)
+        if venue_id is None or asset_id is None:
+            return None
+        return self.rows.get(venue_id << 32 | asset_id)
+    
+    def venue_of(self, row: int) -> str:
+        return self.venues[self.venue_id[row]]
+    
+    def asset_of(self, row: int) -> str:
+        return self.assets[self.asset_id[row]]
+    
+    def venue_names(self, rows: np.ndarray) -> List[str]:
+        venues = self.venues
+        return [venues[v] for v in self.venue_id[rows].tolist()]
+    
+    def available(self, row: int) -> float:
+        """Unreserved available liquidity of one row"""
+        depth = float(self.depth_usd[row])
+        return depth * (1.0 - float(self.utilization[row])) - float(self.reserved_usd[row])
+    
+    def active_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.active[:self.size])
+    
+    def columns(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Gather (depth, spread, available, native) for rows"""
+        depth = self.depth_usd[rows]
+        available = depth * (1.0 - self.utilization[rows]) - self.reserved_usd[rows]
+        return depth, self.spread_bps[rows], available, self.native[rows]
+    
+    def view(self, row: int) -> 'PoolView':
+        """Live read-only pool object for row"""
+        return PoolView(self, row)
+    
+    def pool(self, row: int) -> LiquidityPool:
+        """Detached LiquidityPool copy of row"""
+        return LiquidityPool(
+            venue=self.venue_of(row),
+            asset=self.asset_of(row),
+            depth_usd=float(self.depth_usd[row]),
+            spread_bps=float(self.spread_bps[row]),
+            funding_rate=float(self.funding_rate[row]),
+            utilization=float(self.utilization[row])
+        )
+
+
+class PoolView(LiquidityPool):
+    """
+    Read-only LiquidityPool backed by a PoolTable row.
+    
+    Created on demand where the public API hands out pool objects; reads go
+    straight to the table so a view never goes stale. Pool state changes go
+    through the engine (set_utilization, execute_route).
+    """
+    
+    def __init__(self, table: PoolTable, row: int):
+        self._table = table
+        self._row = row
+    
+    @property
+    def venue(self) -> str:
+        return self._table.venue_of(self._row)
+    
+    @property
+    def asset(self) -> str:
+        return self._table.asset_of(self._row)
+    
+    @property
+    def depth_usd(self) -> float:
+        return float(self._table.depth_usd[self._row])
+    
+    @property
+    def spread_bps(self) -> float:
+        return float(self._table.spread_bps[self._row])
+    
+    @property
+    def funding_rate(self) -> float:
+        return float(self._table.funding_rate[self._row])
+    
+    @property
+    def utilization(self) -> float:
+        return float(self._table.utilization[self._row])
+    
+    @property
+    def reserved_usd(self) -> float:
+        return float(self._table.reserved_usd[self._row])
+    
+    def available_liquidity(self) -> float:
+        """Available liquidity net of open reservations"""
+        return self._table.available(self._row)
+
+
+class PoolIndex:
+    """
+    Asset-keyed index of pool table rows ordered by available liquidity.
+    
+    Each asset keeps a sorted key list (negated available liquidity) next to
+    a parallel row list, so the deepest pools come first and the candidates
+    with at least `min_available` are a prefix found by bisection.
+    
+    Pool utilization and reservations must change through `update()` (or
+    the engine methods that call it) so the ordering stays valid. Every
+    add/remove/update bumps the asset's pool-state version, which cached
+    quotes are tagged with. A short internal lock makes each operation
+    atomic across threads.
+    """
+    
+    def __init__(self, table: PoolTable):
+        self.table = table
+        self._lock = threading.Lock()
+        self._keys: Dict[str, List[float]] = {}
+        self._rows: Dict[str, List[int]] = {}
+        self._versions: Dict[str, int] = {}
+    
+    def version(self, asset: str) -> int:
+        """Pool-state version of asset (changes on every pool mutation)"""
+        return self._versions.get(asset, 0)
+    
+    def rebuild(self):
+        """Re-index every active table row in one sort"""
+        table = self.table
+        rows = table.active_rows()
+        keys = -(table.depth_usd[rows] * (1.0 - table.utilization[rows]) - table.reserved_usd[rows])
+        asset_ids = table.asset_id[rows]
+        
+        order = np.lexsort((rows, keys, asset_ids))
+        rows, keys, asset_ids = rows[order], keys[order], asset_ids[order]
+        bounds = np.flatnonzero(np.diff(asset_ids)) + 1
+        
+        with self._lock:
+            self._keys, self._rows = {}, {}
+            for asset_rows, asset_keys in zip(np.split(rows, bounds), np.split(keys, bounds)):
+                if len(asset_rows):
+                    asset = table.asset_of(asset_rows[0])
+                    self._keys[asset] = asset_keys.tolist()
+                    self._rows[asset] = asset_rows.tolist()
+                    self._versions[asset] = self.version(asset) + 1
+    
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._rows.values())
+    
+    def add(self, row: int):
+        """Insert row at its liquidity-ordered position"""
+        with self._lock:
+            self._add(row)
+    
+    def remove(self, row: int):
+        """Remove row from the index"""
+        with self._lock:
+            self._remove(row)
+    
+    def update(self, row: int, utilization: Optional[float] = None,
+               reserved_usd: Optional[float] = None):
+        """Change row utilization and/or reserved liquidity and reposition it"""
+        with self._lock:
+            self._remove(row)
+            # Reserved first: a commit moving a hold into utilization never
+            # shows both to lock-free readers
+            if reserved_usd is not None:
+                self.table.reserved_usd[row] = reserved_usd
+            if utilization is not None:
+                self.table.set_utilization(row, utilization)
+            self._add(row)
+    
+    def _add(self, row: int):
+        asset = self.table.asset_of(row)
+        keys = self._keys.setdefault(asset, [])
+        rows = self._rows.setdefault(asset, [])
+        
+        key = -self.table.available(row)
+        pos = bisect_right(keys, key)
+        keys.insert(pos, key)
+        rows.insert(pos, row)
+        self._versions[asset] = self.version(asset) + 1
+    
+    def _remove(self, row: int):
+        asset = self.table.asset_of(row)
+        keys = self._keys.get(asset, [])
+        rows = self._rows.get(asset, [])
+        
+        key = -self.table.available(row)
+        pos = bisect_left(keys, key)
+        while pos < len(keys) and keys[pos] == key:
+            if rows[pos] == row:
+                del keys[pos]
+                del rows[pos]
+                self._versions[asset] = self.version(asset) + 1
+                return
+            pos += 1
+        
+        # Utilization was changed behind the index's back - fall back to a scan
+        if row in rows:
+            pos = rows.index(row)
+            del keys[pos]
+            del rows[pos]
+            self._versions[asset] = self.version(asset) + 1
+            return
+        
+        raise KeyError(f"{self.table.venue_of(row)}/{asset} pool not indexed")
+    
+    def candidates(self, asset: str, min_available: float = 0.0) -> List[int]:
+        """
+        Rows for asset with available liquidity >= min_available.
+        
+        Returned deepest-first; the cut-off is found in O(log n).
+        """
+        with self._lock:
+            keys = self._keys.get(asset)
+            if not keys:
+                return []
+            
+            end = bisect_right(keys, -min_available)
+            return self._rows[asset][:end]
+
+
+class OverlayColumn:
+    """
+    Pool table column that reads through to a live table except for rows
+    written locally.
+    
+    The override mask and values are allocated on the first write, so an
+    untouched overlay column costs nothing.
+    """
+    
+    def __init__(self, base: PoolTable, name: str):
+        self._base = base
+        self._name = name
+        self._mask: Optional[np.ndarray] = None
+        self._values: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(getattr(self._base, self._name))
+    
+    def _reserve(self, size: int):
+        # Live table grew since the overrides were allocated
+        grow = size - (0 if self._mask is None else len(self._mask))
+        if grow > 0:
+            self._mask = np.concatenate([self._mask if self._mask is not None else np.zeros(0, bool),
+                                         np.zeros(grow, bool)])
+            self._values = np.concatenate([self._values if self._values is not None else np.zeros(0),
+                                           np.zeros(grow)])
+    
+    def __getitem__(self, index):
+        column = getattr(self._base, self._name)
+        if self._mask is None:
+            return column[index]
+        self._reserve(len(column))
+        return np.where(self._mask[index], self._values[index], column[index])
+    
+    def __setitem__(self, index, value):
+        self._reserve(len(getattr(self._base, self._name)))
+        self._mask[index] = True
+        self._values[index] = value
+
+
+class OverlayPoolTable(PoolTable):
+    """
+    Copy-on-write view of a PoolTable for what-if routing.
+    
+    Utilization and reservation writes land in OverlayColumns; every other
+    attribute (depth, spread, ids, row lookup, ...) is read from the live
+    table, so creating an overlay copies only the per-venue utilization
+    sums. Pools cannot be added or removed through an overlay.
+    """
+    
+    def __init__(self, base: PoolTable):
+        self.base = base
+        self.utilization = OverlayColumn(base, 'utilization')
+        self.reserved_usd = OverlayColumn(base, 'reserved_usd')
+        self.venue_utilization = base.venue_utilization.copy()
+        self.changed_venues = set(base.changed_venues)
+    
+    def __getattr__(self, name):
+        # Only reached for attributes the overlay does not hold itself
+        return getattr(self.__dict__['base'], name)
+    
+    def add(self, pool: LiquidityPool) -> int:
+        raise TypeError("Pools cannot be added to a what-if overlay")
+    
+    def remove(self, row: int) -> LiquidityPool:
+        raise TypeError("Pools cannot be removed from a what-if overlay")
+
+
+class OverlayPoolIndex(PoolIndex):
+    """
+    Copy-on-write view of a PoolIndex for what-if routing.
+    
+    An asset's sorted lists are copied from the live index the first time
+    one of its pools changes in the overlay; until then lookups go to the
+    live index.
+    """
+    
+    def __init__(self, base: PoolIndex, table: OverlayPoolTable):
+        super().__init__(table)
+        self.base = base
+    
+    def __len__(self) -> int:
+        assets = set(self.base._rows) | set(self._rows)
+        return sum(len(self._rows.get(asset, self.base._rows.get(asset, []))) for asset in assets)
+    
+    def rebuild(self):
+        raise TypeError("A what-if overlay index cannot be rebuilt")
+    
+    def _own(self, asset: str):
+        if asset not in self._rows:
+            with self.base._lock:
+                self._keys[asset] = list(self.base._keys.get(asset, []))
+                self._rows[asset] = list(self.base._rows.get(asset, []))
+    
+    def _add(self, row: int):
+        self._own(self.table.asset_of(row))
+        super()._add(row)
+    
+    def _remove(self, row: int):
+        self._own(self.table.asset_of(row))
+        super()._remove(row)
+    
+    def candidates(self, asset: str, min_available: float = 0.0) -> List[int]:
+        if asset not in self._rows:
+            return self.base.candidates(asset, min_available)
+        return super().candidates(asset, min_available)
+
+
+class RouteQuoteCache:
+    """
+    LRU cache of route quotes tagged with the asset's pool-state version.
+    
+    Keys are (asset, amount bucket, max_hops, solver). An entry is only
+    served while its version matches the current one, so any pool change
+    for the asset (execute_route, utilization updates, pool add/remove)
+    invalidates its quotes; stale entries are dropped when next looked up.
+    """
+    
+    def __init__(self, max_size: int = QUOTE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Tuple, Tuple[int, Optional[WreckageRoute]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Tuple, version: int) -> Tuple[bool, Optional['WreckageRoute']]:
+        """Return (found, route) for key at pool-state version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                
+                del self._entries[key]
+                self.invalidations += 1
+            
+            self.misses += 1
+            return False, None
+    
+    def put(self, key: Tuple, version: int, route: Optional['WreckageRoute']):
+        """Store route for key, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (version, route)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0
+        }
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in nanoseconds.
+    
+    Each power of two is split into 8 linear sub-buckets (12.5% resolution),
+    so recording is a couple of integer ops and percentiles need no samples.
+    """
+    
+    SUB_BUCKET_BITS = 3
+    NUM_BUCKETS = 8 * 64  # Up to ~2^63 ns
+    
+    def __init__(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+    
+    def record(self, ns: int):
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        
+        if ns < 16:
+            self.counts[max(ns, 0)] += 1
+        else:
+            shift = ns.bit_length() - 4
+            self.counts[8 * shift + (ns >> shift)] += 1
+    
+    @classmethod
+    def _bucket_bounds(cls, index: int) -> Tuple[int, int]:
+        if index < 16:
+            return index, index + 1
+        shift, mantissa = index // 8 - 1, index % 8 + 8
+        return mantissa << shift, (mantissa + 1) << shift
+    
+    def percentile(self, q: float) -> float:
+        """Approximate q-quantile (0..1) in nanoseconds (bucket midpoint)"""
+        if self.count == 0:
+            return 0.0
+        
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if bucket_count and seen >= target:
+                low, high = self._bucket_bounds(index)
+                return min((low + high) / 2, self.max_ns)
+        return float(self.max_ns)
+
+
+class RoutingProfiler:
+    """
+    Per-stage timers and event counters for the routing pipeline.
+    
+    Disabled by default. Instrumented code checks `enabled` once per stage
+    boundary and only reads the clock when it is set, so the disabled cost
+    is a few attribute lookups per call. Stages nest: fry_minting time is
+    also part of the single_hop / multi_hop stage that called it.
+    """
+    
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def enable(self):
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+    
+    def record(self, stage: str, ns: int):
+        """Record one timing sample for stage"""
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(ns)
+    
+    def count(self, counter: str, n: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+    
+    def stats(self) -> Dict:
+        """Per-stage latency summary (µs) and counters"""
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'total_ms': h.total_ns / 1e6,
+                    'mean_us': h.total_ns / h.count / 1e3,
+                    'p50_us': h.percentile(0.50) / 1e3,
+                    'p99_us': h.percentile(0.99) / 1e3,
+                    'max_us': h.max_ns / 1e3
+                }
+                for stage, h in self.stages.items()
+            }
+            return {'stages': stages, 'counters': dict(self.counters)}
+    
+    def dump(self, path: Optional[str] = None) -> str:
+        """
+        Metrics in Prometheus text exposition format.
+        
+        Args:
+            path: Also write the metrics to this file
+        """
+        stats = self.stats()
+        lines = ["# TYPE liquidity_rails_stage_seconds summary"]
+        
+        for stage, summary in sorted(stats['stages'].items()):
+            for quantile, key in (("0.5", 'p50_us'), ("0.99", 'p99_us')):
+                lines.append(f'liquidity_rails_stage_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                             f'{summary[key] / 1e6:.9f}')
+            lines.append(f'liquidity_rails_stage_seconds_sum{{stage="{stage}"}} '
+                         f'{summary["total_ms"] / 1e3:.9f}')
+            lines.append(f'liquidity_rails_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        
+        lines.append("# TYPE liquidity_rails_events_total counter")
+        for counter, value in sorted(stats['counters'].items()):
+            lines.append(f'liquidity_rails_events_total{{event="{counter}"}} {value}')
+        
+        metrics = "\n".join(lines) + "\n"
+        if path:
+            with open(path, 'w') as f:
+                f.write(metrics)
+        
+        return metrics
+
+
 @dataclass
 class WreckageRoute:
     """Optimal route for wreckage through liquidity rails"""
@@ -108,6 +977,35 @@ class WreckageRoute:
         return f"<Route {self.asset} ${self.wreckage_amount:.0f} via {path} | FRY: {self.fry_minted:.2f}>"
 
 
+@dataclass
+class RobustRoute:
+    """WreckageRoute scored across sampled funding/depth scenarios"""
+    route: WreckageRoute
+    expected_fry: float
+    fry_std: float
+    tail_fry: float  # Lower tail quantile of FRY minted
+    scenarios: int
+    
+    def __repr__(self):
+        path = " → ".join([h['venue'] for h in self.route.hops])
+        return (f"<RobustRoute {self.route.asset} ${self.route.wreckage_amount:.0f} via {path} | "
+                f"E[FRY]: {self.expected_fry:.2f} tail: {self.tail_fry:.2f}>")
+
+
+class ReservationError(ValueError):
+    """Route no longer fits the pools' unreserved liquidity"""
+
+
+@dataclass
+class LiquidityReservation:
+    """Liquidity held for a quoted route until it is committed or released"""
+    reservation_id: int
+    route: WreckageRoute
+    holds: Dict[int, float]  # pool table row -> reserved USD
+    created_at: float = field(default_factory=time.time)
+    status: str = 'reserved'  # reserved / committed / released
+
+
 class LiquidityRailsEngine:
     """
     Core engine for routing wreckage through optimal liquidity paths.
@@ -118,9 +1016,28 @@ class LiquidityRailsEngine:
     - Agent B (market-making)
     """
     
-    def __init__(self):
-        self.liquidity_pools: Dict[str, List[LiquidityPool]] = {}
+    def __init__(self, snapshot_path: Optional[str] = None):
+        """
+        Args:
+            snapshot_path: Warm start from a save_snapshot() file instead of
+                initializing the default pools
+        """
+        self.pool_table = PoolTable()
+        self.pool_index = PoolIndex(self.pool_table)
+        self.quote_cache = RouteQuoteCache()
+        self.quote_bucket_usd = QUOTE_BUCKET_USD
+        self.profiler = RoutingProfiler()
+        
+        # Reservations: striped pool row locks, always taken in stripe order
+        self.reservations: Dict[int, LiquidityReservation] = {}
+        self.reservation_conflicts = 0
+        self._pool_locks = [threading.Lock() for _ in range(POOL_LOCK_STRIPES)]
+        self._reservation_ids = count(1)
+        self._state_lock = threading.Lock()  # Reservations dict + totals
+        
         self.capital_allocations: Dict[str, float] = {}
+        self._venue_scores = np.zeros(0)
+        self._allocated_capital: Optional[float] = None
         self.total_wreckage_routed = 0.0
         self.total_fry_minted = 0.0
         
@@ -129,11 +1046,151 @@ class LiquidityRailsEngine:
         self.rails_fry_rate = 1.2  # Optimized routing
         self.liquidity_bonus = 1.6  # Liquidity provision bonus
         
+        # Multi-hop split solver: 'greedy' or 'convex' (water-filling)
+        self.split_solver = 'greedy'
+        
+        if snapshot_path:
+            self.load_snapshot(snapshot_path)
+            return
+        
         # Initialize default liquidity pools
         self._initialize_liquidity_pools()
         
         logger.info(f"{FRY_RED}{BOLD}🛤️  Liquidity Rails Engine Initialized{RESET}")
-        logger.info(f"Optimal wreckage routing across {len(self.liquidity_pools)} venues")
+        logger.info(f"Optimal wreckage routing across {len(self.pool_table.venues)} venues")
+    
+    def what_if(self) -> 'LiquidityRailsEngine':
+        """
+        Copy-on-write overlay of the engine for hypothetical routing.
+        
+        The returned engine routes, reserves and executes like this one,
+        but pool changes are recorded as deltas in the overlay and totals,
+        allocations and reservations are its own; live state is never
+        modified. Pools the overlay has not touched read live state, so
+        creating and discarding an overlay is O(venues), not O(pools).
+        
+        Returns:
+            Engine view to run the hypothetical sequence against
+        """
+        
+        overlay = copy.copy(self)
+        overlay.pool_table = OverlayPoolTable(self.pool_table)
+        overlay.pool_index = OverlayPoolIndex(self.pool_index, overlay.pool_table)
+        overlay.quote_cache = RouteQuoteCache()
+        overlay.profiler = RoutingProfiler()
+        
+        overlay.reservations = {}
+        overlay.reservation_conflicts = 0
+        overlay._reservation_ids = count(1)
+        overlay._state_lock = threading.Lock()
+        
+        overlay.capital_allocations = dict(self.capital_allocations)
+        overlay._venue_scores = self._venue_scores.copy()
+        
+        return overlay
+    
+    def save_snapshot(self, path: str):
+        """
+        Write pools, capital allocations and totals to a binary snapshot.
+        
+        Open reservations are not persisted: their liquidity is free again
+        in the snapshot.
+        """
+        
+        if self.reservations:
+            logger.warning(f"Snapshot drops {len(self.reservations)} open reservations")
+        
+        columns = self.pool_table.snapshot_columns()
+        header = {
+            'format_version': SNAPSHOT_VERSION,
+            'created_at': time.time(),
+            'size': self.pool_table.size,
+            'venues': self.pool_table.venues,
+            'assets': self.pool_table.assets,
+            'capital_allocations': self.capital_allocations,
+            'total_wreckage_routed': self.total_wreckage_routed,
+            'total_fry_minted': self.total_fry_minted,
+            'split_solver': self.split_solver,
+            'columns': []
+        }
+        
+        # Column offsets depend on the header length, which depends on the
+        # offsets - lay out against a padded header size
+        header_size = SNAPSHOT_ALIGN * 4
+        while True:
+            offset = SNAPSHOT_PREAMBLE.size + header_size
+            header['columns'] = []
+            for name, column in columns.items():
+                offset = -(-offset // SNAPSHOT_ALIGN) * SNAPSHOT_ALIGN
+                header['columns'].append({'name': name, 'dtype': column.dtype.str, 'offset': offset})
+                offset += column.nbytes
+            encoded = json.dumps(header).encode('utf-8')
+            if len(encoded) <= header_size:
+                break
+            header_size = -(-len(encoded) // SNAPSHOT_ALIGN) * SNAPSHOT_ALIGN
+        
+        # Write-then-rename: engines mapping the old file keep their pages
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, header_size))
+            f.write(encoded.ljust(header_size, b' '))
+            for spec, column in zip(header['columns'], columns.values()):
+                f.write(b'\0' * (spec['offset'] - f.tell()))
+                f.write(np.ascontiguousarray(column).tobytes())
+        os.replace(tmp_path, path)
+        
+        logger.info(f"Saved snapshot of {len(self.pool_table)} pools to {path}")
+    
+    def load_snapshot(self, path: str, mmap: bool = True):
+        """
+        Replace pool state, allocations and totals with a snapshot's.
+        
+        Args:
+            path: File written by save_snapshot()
+            mmap: Map columns copy-on-write instead of reading them; pages
+                are shared (e.g. across forked workers) until written
+        
+        Raises:
+            ValueError: not a snapshot, or an unsupported format version
+        """
+        
+        with open(path, 'rb') as f:
+            magic, version, header_size = SNAPSHOT_PREAMBLE.unpack(f.read(SNAPSHOT_PREAMBLE.size))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a liquidity rails snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot format version {version} "
+                                 f"(expected {SNAPSHOT_VERSION})")
+            header = json.loads(f.read(header_size))
+        
+        size = header['size']
+        columns = {}
+        for spec in header['columns']:
+            dtype = np.dtype(spec['dtype'])
+            if size == 0:
+                columns[spec['name']] = np.zeros(0, dtype)
+            elif mmap:
+                columns[spec['name']] = np.memmap(path, dtype=dtype, mode='c',
+                                                  offset=spec['offset'], shape=(size,))
+            else:
+                columns[spec['name']] = np.fromfile(path, dtype=dtype, count=size,
+                                                    offset=spec['offset'])
+        
+        self.pool_table = PoolTable.from_columns(columns, header['venues'], header['assets'])
+        self.pool_index = PoolIndex(self.pool_table)
+        self.pool_index.rebuild()
+        self.reservations = {}
+        self.quote_cache.clear()
+        
+        self.capital_allocations = dict(header['capital_allocations'])
+        self._venue_scores = np.zeros(0)
+        self._allocated_capital = None
+        self.total_wreckage_routed = header['total_wreckage_routed']
+        self.total_fry_minted = header['total_fry_minted']
+        self.split_solver = header['split_solver']
+        
+        logger.info(f"Loaded snapshot of {len(self.pool_table)} pools "
+                    f"across {len(self.pool_table.venues)} venues from {path}")
     
     def _initialize_liquidity_pools(self):
         """Initialize liquidity pools for major DEXes"""
@@ -148,11 +1205,8 @@ class LiquidityRailsEngine:
         ]
         
         for venue, btc_depth, eth_depth, spread, funding in venues_config:
-            if venue not in self.liquidity_pools:
-                self.liquidity_pools[venue] = []
-            
             # BTC pool
-            self.liquidity_pools[venue].append(LiquidityPool(
+            self.add_pool(LiquidityPool(
                 venue=venue,
                 asset="BTC",
                 depth_usd=btc_depth,
@@ -162,7 +1216,7 @@ class LiquidityRailsEngine:
             ))
             
             # ETH pool
-            self.liquidity_pools[venue].append(LiquidityPool(
+            self.add_pool(LiquidityPool(
                 venue=venue,
                 asset="ETH",
                 depth_usd=eth_depth,
@@ -171,10 +1225,54 @@ class LiquidityRailsEngine:
                 utilization=np.random.uniform(0.3, 0.7)
             ))
         
-        logger.info(f"Initialized {sum(len(pools) for pools in self.liquidity_pools.values())} liquidity pools")
+        logger.info(f"Initialized {len(self.pool_index)} liquidity pools")
+    
+    @property
+    def liquidity_pools(self) -> Dict[str, List[LiquidityPool]]:
+        """Pools grouped by venue (read-only views over the pool table)"""
+        table = self.pool_table
+        pools: Dict[str, List[LiquidityPool]] = {}
+        for row in table.active_rows().tolist():
+            pools.setdefault(table.venue_of(row), []).append(table.view(row))
+        return pools
+    
+    def add_pool(self, pool: LiquidityPool):
+        """Register a liquidity pool with the rails"""
+        row = self.pool_table.add(pool)
+        self.pool_index.add(row)
+    
+    def remove_pool(self, venue: str, asset: str) -> LiquidityPool:
+        """Remove a liquidity pool from the rails"""
+        row = self._pool_row(venue, asset)
+        with self._pool_lock(row):
+            if self.pool_table.reserved_usd[row] > 0:
+                raise ValueError(f"Pool {venue}/{asset} has open reservations")
+            self.pool_index.remove(row)
+            return self.pool_table.remove(row)
+    
+    def get_pool(self, venue: str, asset: str) -> Optional[LiquidityPool]:
+        """Look up the pool for asset at venue"""
+        row = self.pool_table.row(venue, asset)
+        return None if row is None else self.pool_table.view(row)
+    
+    def set_utilization(self, venue: str, asset: str, utilization: float):
+        """Update pool utilization, keeping the pool index ordered"""
+        row = self._pool_row(venue, asset)
+        with self._pool_lock(row):
+            self.pool_index.update(row, utilization)
+    
+    def _pool_lock(self, row: int) -> threading.Lock:
+        return self._pool_locks[row % POOL_LOCK_STRIPES]
+    
+    def _pool_row(self, venue: str, asset: str) -> int:
+        row = self.pool_table.row(venue, asset)
+        if row is None:
+            raise KeyError(f"No {asset} pool at {venue}")
+        return row
     
     def route_wreckage(self, amount_usd: float, asset: str, 
-                       max_hops: int = 3) -> Optional[WreckageRoute]:
+                       max_hops: int = 3,
+                       solver: Optional[str] = None) -> Optional[WreckageRoute]:
         """
         Find optimal route for wreckage through liquidity rails.
         
@@ -184,71 +1282,586 @@ class LiquidityRailsEngine:
             amount_usd: Wreckage amount in USD
             asset: Asset type (BTC, ETH, etc.)
             max_hops: Maximum number of venue hops
+            solver: Multi-hop split solver ('greedy' or 'convex');
+                defaults to self.split_solver
         
         Returns:
             Optimal WreckageRoute or None if no route found
         """
+        solver = solver or self.split_solver
+        if solver not in SPLIT_SOLVERS:
+            raise ValueError(f"Unknown split solver '{solver}' (expected one of {SPLIT_SOLVERS})")
+        
+        profiler = self.profiler
+        timed = profiler.enabled
+        if timed:
+            start = time.perf_counter_ns()
         
-        # Get all pools for this asset
-        available_pools = []
-        for venue, pools in self.liquidity_pools.items():
-            for pool in pools:
-                if pool.asset == asset and pool.available_liquidity() >= amount_usd * 0.1:
-                    available_pools.append(pool)
+        # Pools for this asset with enough depth, deepest first
+        rows = self.pool_index.candidates(asset, amount_usd * 0.1)
         
-        if not available_pools:
+        if timed:
+            profiler.record('candidates', time.perf_counter_ns() - start)
+        
+        if not rows:
             logger.warning(f"No liquidity pools available for {asset}")
+            if timed:
+                profiler.count('no_candidates')
             return None
         
-        # Single-hop routes (direct fill)
-        best_route = None
-        best_score = -float('inf')
+        # Score single-hop and multi-hop routes with the batch kernel
+        best_route = self._route_asset_batch(
+            np.array([amount_usd], dtype=np.float64), asset,
+            np.array(rows, dtype=np.intp), max_hops, solver
+        )[0]
+        
+        if best_route:
+            logger.info(f"{FRY_GREEN}✓{RESET} Optimal route found: {best_route}")
+        
+        if timed:
+            profiler.record('route_wreckage', time.perf_counter_ns() - start)
+            profiler.count('routes_found' if best_route else 'no_route')
+        
+        return best_route
+    
+    def quote_route(self, amount_usd: float, asset: str,
+                    max_hops: int = 3,
+                    solver: Optional[str] = None) -> Optional[WreckageRoute]:
+        """
+        Cached route quote for wreckage (read-only; nothing is executed).
+        
+        The amount is rounded to `quote_bucket_usd` and the route is computed
+        for the rounded amount, so every request in a bucket gets the same
+        quote. Quotes are reused until the asset's pool state changes.
+        Returned routes are shared between callers and must not be mutated.
+        
+        Args:
+            amount_usd: Wreckage amount in USD
+            asset: Asset type (BTC, ETH, etc.)
+            max_hops: Maximum number of venue hops
+            solver: Multi-hop split solver ('greedy' or 'convex');
+                defaults to self.split_solver
+        
+        Returns:
+            WreckageRoute for the bucketed amount or None if no route found
+        """
+        solver = solver or self.split_solver
+        bucket = max(round(amount_usd / self.quote_bucket_usd), 1)
+        key = (asset, bucket, max_hops, solver)
+        version = self.pool_index.version(asset)
+        
+        found, route = self.quote_cache.get(key, version)
+        if not found:
+            route = self.route_wreckage(bucket * self.quote_bucket_usd, asset, max_hops, solver)
+            self.quote_cache.put(key, version, route)
+        
+        return route
+    
+    def pareto_routes(self, amount_usd: float, asset: str,
+                      max_hops: int = 3,
+                      resolution: int = PARETO_RESOLUTION) -> List[WreckageRoute]:
+        """
+        Non-dominated routes across total cost (lower) and FRY minted (higher).
+        
+        Dynamic program over the candidate pools with fills in steps of
+        amount/resolution. The state after each pool is (steps filled,
+        hops, native hops) -> lowest cost, so partial routes that reach the
+        same state at a higher cost are pruned as soon as they appear; a
+        partial route is also pruned when another with the same fill and
+        hop count costs no more and uses more native venues, and once a
+        route has spent all hops without filling the amount.
+        
+        FRY minted only depends on cost, hops and native hops, so the
+        cheapest route per (hops, native hops) is the only candidate for
+        the frontier from each group.
+        
+        Args:
+            amount_usd: Wreckage amount in USD
+            asset: Asset type (BTC, ETH, etc.)
+            max_hops: Maximum number of venue hops
+            resolution: Fill steps per route (20 = 5% of the amount)
+        
+        Returns:
+            Frontier routes ordered by increasing cost (and FRY minted)
+        """
+        
+        rows = np.array(self.pool_index.candidates(asset, amount_usd * 0.1), dtype=np.intp)
+        if len(rows) == 0:
+            logger.warning(f"No liquidity pools available for {asset}")
+            return []
+        
+        depth, spread, available, native = self.pool_table.columns(rows)
+        native = native.astype(np.intp)
+        q, num_hops = resolution, max_hops + 1
+        
+        # Cost contribution (bps of the whole amount) of filling j steps in each pool
+        steps = np.arange(1, q + 1)
+        fills = amount_usd * steps / q
+        hop_cost = (spread[:, None] + np.float_power(fills / depth[:, None], 2) * 100) * (fills / amount_usd)
+        hop_cost[fills > available[:, None]] = np.inf
+        
+        # Min-plus step matrix: entering with f steps filled, leaving with g
+        taken = np.arange(q + 1)[:, None] - np.arange(q + 1)[None, :]  # g - f
+        step_cost = np.where(taken >= 1, hop_cost[:, np.clip(taken - 1, 0, q - 1)], np.inf)
         
-        for pool in available_pools:
-            cost_bps = pool.cost_to_fill(amount_usd)
-            if cost_bps == float('inf'):
+        cost = np.full((q + 1, num_hops, num_hops), np.inf)  # [steps, hops, natives]
+        cost[0, 0, 0] = 0.0
+        choices = np.zeros((len(rows), q + 1, num_hops, num_hops), dtype=np.int16)
+        
+        for p in range(len(rows)):
+            n = native[p]
+            
+            # Use pool p: (f, h, k) -> (g, h + 1, k + n) for every g > f at once
+            entering = cost[None, :, :max_hops, :num_hops - n] + step_cost[p][:, :, None, None]
+            best_from = entering.argmin(axis=1)
+            best = np.take_along_axis(entering, best_from[:, None], axis=1)[:, 0]
+            
+            target = cost[:, 1:, n:]
+            use = best < target
+            cost[:, 1:, n:] = np.where(use, best, target)
+            choices[p, :, 1:, n:] = np.where(use, np.arange(q + 1)[:, None, None] - best_from, 0)
+            
+            # Prune: hop budget spent before the amount is filled
+            cost[:q, max_hops] = np.inf
+            # Prune: same fill and hops, no cheaper than a route with more native hops
+            more_native = np.minimum.accumulate(cost[:, :, ::-1], axis=2)[:, :, ::-1]
+            cost[:, :, :-1][cost[:, :, :-1] >= more_native[:, :, 1:]] = np.inf
+        
+        # Complete routes: cheapest per (hops, native hops)
+        candidates = []
+        for h in range(1, num_hops):
+            for k in range(h + 1):
+                if np.isfinite(cost[q, h, k]):
+                    candidates.append((float(cost[q, h, k]), h, k))
+        
+        if not candidates:
+            return []
+        
+        total_cost = np.array([c for c, _, _ in candidates])
+        hops_used = np.array([h for _, h, _ in candidates])
+        natives_used = np.array([k for _, _, k in candidates], dtype=np.float64)
+        fry = self._calculate_fry_minting(
+            amount_usd, total_cost, num_hops=hops_used, native_hops=natives_used
+        )
+        
+        # Frontier: sort by cost (ties: more FRY first), keep strictly rising FRY
+        venues = self.pool_table.venue_names(rows)
+        frontier = []
+        best_fry = -np.inf
+        for i in np.lexsort((-fry, total_cost)).tolist():
+            if fry[i] <= best_fry:
                 continue
+            best_fry = fry[i]
+            
+            # Walk the choices back from the complete state
+            hops = []
+            f, h, k = q, hops_used[i], int(natives_used[i])
+            for p in range(len(rows) - 1, -1, -1):
+                j = int(choices[p, f, h, k])
+                if j:
+                    fill_amount = amount_usd * j / q
+                    hops.append({
+                        'venue': venues[p],
+                        'amount': fill_amount,
+                        'cost_bps': float(spread[p] + np.float_power(fill_amount / depth[p], 2) * 100),
+                        'liquidity_depth': float(depth[p])
+                    })
+                    f, h, k = f - j, h - 1, k - native[p]
             
-            # Calculate FRY minting for this route
-            fry_minted = self._calculate_fry_minting(
-                amount_usd, cost_bps, num_hops=1
+            frontier.append(WreckageRoute(
+                wreckage_amount=amount_usd,
+                asset=asset,
+                hops=hops[::-1],
+                total_cost_bps=float(total_cost[i]),
+                fry_minted=float(fry[i]),
+                efficiency_score=float(fry[i] / (1 + total_cost[i] / 100))
+            ))
+        
+        logger.info(f"{FRY_GREEN}✓{RESET} Pareto frontier for {asset} ${amount_usd:,.0f}: "
+                    f"{len(frontier)} routes")
+        
+        return frontier
+    
+    def robust_routes(self, amount_usd: float, asset: str,
+                      max_hops: int = 3,
+                      num_scenarios: int = SCENARIO_COUNT,
+                      tail_quantile: float = TAIL_QUANTILE,
+                      latency_budget_ms: Optional[float] = SCENARIO_LATENCY_BUDGET_MS,
+                      funding_std: float = FUNDING_NOISE_STD,
+                      depth_std: float = EFFICIENCY_NOISE_STD,
+                      seed: Optional[int] = SCENARIO_SEED) -> List[RobustRoute]:
+        """
+        Score candidate routes across sampled funding/depth scenarios.
+        
+        Candidates are the Pareto frontier plus the greedy and convex split
+        routes. Each scenario perturbs every candidate pool's funding rate
+        and depth (see funding_scenarios) and re-prices all routes in one
+        vectorized pass: hop costs are recomputed at the sampled depth and
+        FRY is charged for the fill-weighted funding exposure, so unlike
+        fry_minted the scenario FRY depends on funding. A route that no
+        longer fits a pool's available liquidity mints nothing in that
+        scenario.
+        
+        Args:
+            amount_usd: Wreckage amount in USD
+            asset: Asset type (BTC, ETH, etc.)
+            max_hops: Maximum number of venue hops
+            num_scenarios: Scenarios to draw when the latency budget allows
+            tail_quantile: Lower FRY quantile reported as tail risk
+            latency_budget_ms: Budget for the whole call; scenarios are drawn
+                until it would be overrun (None = unbounded, and reproducible
+                for a fixed seed)
+            funding_std: Funding rate noise (absolute)
+            depth_std: Pool depth noise (relative)
+            seed: RNG seed (None for fresh entropy)
+        
+        Returns:
+            Robust route scores, best tail first (empty if no route found)
+        """
+        
+        start = time.perf_counter()
+        candidates = {}
+        routes = self.pareto_routes(amount_usd, asset, max_hops) + [
+            self.route_wreckage(amount_usd, asset, max_hops, solver) for solver in SPLIT_SOLVERS
+        ]
+        for route in routes:
+            if route is not None:
+                key = tuple((hop['venue'], round(hop['amount'], 6)) for hop in route.hops)
+                candidates.setdefault(key, route)
+        
+        if not candidates:
+            return []
+        
+        routes = list(candidates.values())
+        table = self.pool_table
+        
+        # Routes as padded slots into the distinct pools they fill
+        route_rows = [[table.row(hop['venue'], asset) for hop in route.hops] for route in routes]
+        rows = np.unique(np.concatenate(route_rows))
+        width = max(len(r) for r in route_rows)
+        slots = np.zeros((len(routes), width), dtype=np.intp)
+        fills = np.zeros((len(routes), width))
+        for i, (route, hop_rows) in enumerate(zip(routes, route_rows)):
+            slots[i, :len(hop_rows)] = np.searchsorted(rows, hop_rows)
+            fills[i, :len(hop_rows)] = [hop['amount'] for hop in route.hops]
+        
+        spread = table.spread_bps[rows][slots]
+        free_share = (1.0 - table.utilization[rows])[slots]
+        reserved = table.reserved_usd[rows][slots]
+        fill_share = fills / fills.sum(axis=1, keepdims=True)
+        num_hops = np.array([len(r) for r in route_rows])
+        native_hops = table.native[rows][slots].sum(axis=1, where=fills > 0).astype(np.float64)
+        
+        def score_chunk(funding: np.ndarray, depth: np.ndarray) -> np.ndarray:
+            depth = depth[:, slots]
+            cost_bps = ((spread + (fills / depth) ** 2 * 100) * (fills / amount_usd)).sum(axis=2)
+            fry = self._calculate_fry_minting(
+                amount_usd, cost_bps, num_hops=num_hops, native_hops=native_hops
             )
+            fits = (fills <= depth * free_share - reserved).all(axis=2)
+            drag = (funding_drag(funding[:, slots]) * fill_share).sum(axis=2)
+            return np.where(fits, fry * drag, 0.0)
+        
+        scores = monte_carlo_fry(
+            score_chunk, table.funding_rate[rows], table.depth_usd[rows],
+            num_scenarios, tail_quantile, latency_budget_ms,
+            funding_std, depth_std, seed, start_time=start
+        )
+        
+        robust = [
+            RobustRoute(route, expected, std, tail, scores['scenarios'])
+            for route, expected, std, tail in zip(routes, scores['expected'].tolist(),
+                                                  scores['std'].tolist(), scores['tail'].tolist())
+        ]
+        robust.sort(key=lambda x: x.tail_fry, reverse=True)
+        return robust
+    
+    def route_wreckage_robust(self, amount_usd: float, asset: str,
+                              max_hops: int = 3, objective: str = 'tail',
+                              **scenario_params) -> Optional[RobustRoute]:
+        """
+        Best route under funding/depth noise (see robust_routes).
+        
+        Args:
+            objective: 'tail' (maximize the tail FRY quantile) or 'expected'
+            **scenario_params: Passed through to robust_routes
+        
+        Returns:
+            RobustRoute or None if no route found
+        """
+        if objective not in ('tail', 'expected'):
+            raise ValueError(f"Unknown objective '{objective}' (expected 'tail' or 'expected')")
+        
+        routes = self.robust_routes(amount_usd, asset, max_hops, **scenario_params)
+        if not routes:
+            return None
+        
+        return max(routes, key=lambda x: getattr(x, f'{objective}_fry'))
+    
+    def route_wreckage_batch(self, amounts: np.ndarray, assets: np.ndarray,
+                             max_hops: int = 3,
+                             solver: Optional[str] = None) -> List[Optional[WreckageRoute]]:
+        """
+        Find optimal routes for many wreckage events in one pass.
+        
+        Every (event, pool) pair of an asset is scored at once with matrix
+        math, and the greedy split fills hop k of every event together.
+        Events are quoted independently against the current pool state
+        (nothing is executed), so each result is the route that
+        route_wreckage() returns for that event.
+        
+        Args:
+            amounts: Wreckage amounts in USD, shape (n,)
+            assets: Asset per event, shape (n,)
+            max_hops: Maximum number of venue hops
+            solver: Multi-hop split solver ('greedy' or 'convex');
+                defaults to self.split_solver
+        
+        Returns:
+            One WreckageRoute (or None) per event, in input order
+        """
+        solver = solver or self.split_solver
+        if solver not in SPLIT_SOLVERS:
+            raise ValueError(f"Unknown split solver '{solver}' (expected one of {SPLIT_SOLVERS})")
+        
+        profiler = self.profiler
+        timed = profiler.enabled
+        if timed:
+            start = time.perf_counter_ns()
+        
+        amounts = np.asarray(amounts, dtype=np.float64)
+        assets = np.asarray(assets)
+        routes: List[Optional[WreckageRoute]] = [None] * len(amounts)
+        
+        for asset in np.unique(assets):
+            asset = str(asset)
+            events = np.flatnonzero(assets == asset)
             
-            # Efficiency score: FRY minted per cost
-            efficiency = fry_minted / (1 + cost_bps / 100)
+            # Every pool row for the asset, deepest first; each event's
+            # candidates are a prefix of this list
+            rows = self.pool_index.candidates(asset)
+            if not rows:
+                logger.warning(f"No liquidity pools available for {asset}")
+                continue
             
-            if efficiency > best_score:
-                best_score = efficiency
-                best_route = WreckageRoute(
-                    wreckage_amount=amount_usd,
-                    asset=asset,
-                    hops=[{
-                        'venue': pool.venue,
-                        'amount': amount_usd,
-                        'cost_bps': cost_bps,
-                        'liquidity_depth': pool.depth_usd
-                    }],
-                    total_cost_bps=cost_bps,
-                    fry_minted=fry_minted,
-                    efficiency_score=efficiency
-                )
+            asset_routes = self._route_asset_batch(
+                amounts[events], asset, np.array(rows, dtype=np.intp), max_hops, solver
+            )
+            for event, route in zip(events, asset_routes):
+                routes[event] = route
+        
+        found = sum(route is not None for route in routes)
+        logger.info(f"{FRY_GREEN}✓{RESET} Batch routed {found}/{len(routes)} wreckage events")
         
-        # Multi-hop routes (split across venues)
+        if timed:
+            profiler.record('route_wreckage_batch', time.perf_counter_ns() - start)
+            profiler.count('batch_events', len(routes))
+            profiler.count('routes_found', found)
+            profiler.count('no_route', len(routes) - found)
+        
+        return routes
+    
+    def _route_asset_batch(self, amounts: np.ndarray, asset: str,
+                           rows: np.ndarray, max_hops: int,
+                           solver: str) -> List[Optional[WreckageRoute]]:
+        """Score and route a batch of same-asset events against pool `rows`"""
+        
+        profiler = self.profiler
+        timed = profiler.enabled
+        if timed:
+            start = time.perf_counter_ns()
+        
+        depth, spread, available, native = self.pool_table.columns(rows)
+        
+        events = np.arange(len(amounts))
+        a = amounts[:, None]
+        
+        # (event, pool) candidate mask - same cut as the pool index
+        eligible = available >= a * 0.1
+        
+        # Single-hop routes (direct fill): score every pair at once.
+        # float_power goes through libm pow like cost_to_fill's `** 2`, so
+        # costs match the scalar path bit for bit
+        fill_ratio = a / depth
+        cost = spread + np.float_power(fill_ratio, 2) * 100
+        fillable = eligible & (a <= available)
+        
+        with np.errstate(invalid='ignore'):
+            fry = self._calculate_fry_minting(
+                a, cost, num_hops=1, native_hops=native.astype(np.float64)
+            )
+            efficiency = np.where(fillable, fry / (1 + cost / 100), -np.inf)
+        
+        best_pool = np.argmax(efficiency, axis=1)
+        has_single = fillable[events, best_pool]
+        best_score = np.where(has_single, efficiency[events, best_pool], -np.inf)
+        
+        routes: List[Optional[WreckageRoute]] = [None] * len(amounts)
+        
+        if timed:
+            split = time.perf_counter_ns()
+            profiler.record('single_hop', split - start)
+        
+        # Multi-hop routes (split across venues) replace the direct fill
+        # where strictly more efficient
         if max_hops > 1:
-            multi_hop_route = self._find_multi_hop_route(
-                amount_usd, asset, available_pools, max_hops
+            if solver == 'convex':
+                multi_hop_routes = self._convex_split_batch(
+                    amounts, asset, rows, eligible.sum(axis=1),
+                    depth, spread, available, max_hops
+                )
+            else:
+                multi_hop_routes = self._greedy_split_batch(
+                    amounts, asset, rows, eligible,
+                    depth, spread, available, native, max_hops
+                )
+            
+            for e, route in enumerate(multi_hop_routes):
+                if route and route.efficiency_score > best_score[e]:
+                    routes[e] = route
+            
+            if timed:
+                profiler.record(f'multi_hop_{solver}', time.perf_counter_ns() - split)
+                profiler.count('multi_hop_wins', sum(route is not None for route in routes))
+        
+        if timed:
+            split = time.perf_counter_ns()
+        
+        single = np.flatnonzero(has_single).tolist()
+        best_pool = best_pool.tolist()
+        amount_list = amounts.tolist()
+        venues = self.pool_table.venue_names(rows)
+        
+        for e in single:
+            if routes[e] is not None:
+                continue
+            p = best_pool[e]
+            cost_bps = float(cost[e, p])
+            routes[e] = WreckageRoute(
+                wreckage_amount=amount_list[e],
+                asset=asset,
+                hops=[{
+                    'venue': venues[p],
+                    'amount': amount_list[e],
+                    'cost_bps': cost_bps,
+                    'liquidity_depth': float(depth[p])
+                }],
+                total_cost_bps=cost_bps,
+                fry_minted=float(fry[e, p]),
+                efficiency_score=float(efficiency[e, p])
             )
+        
+        if timed:
+            profiler.record('route_build', time.perf_counter_ns() - split)
+        
+        return routes
+    
+    def _greedy_split_batch(self, amounts: np.ndarray, asset: str,
+                            rows: np.ndarray, eligible: np.ndarray,
+                            depth: np.ndarray, spread: np.ndarray,
+                            available: np.ndarray, native: np.ndarray,
+                            max_hops: int) -> List[Optional[WreckageRoute]]:
+        """Vectorized _find_multi_hop_route over a batch of events"""
+        
+        events = np.arange(len(amounts))
+        a = amounts[:, None]
+        
+        # Sort pools by cost of filling amount/max_hops (ineligible last)
+        slice_amount = a / max_hops
+        slice_cost = spread + np.float_power(slice_amount / depth, 2) * 100
+        slice_cost = np.where(slice_amount > available, np.inf, slice_cost)
+        order = np.argsort(np.where(eligible, slice_cost, np.nan), axis=1, kind='stable')
+        order = order[:, :max_hops]
+        
+        remaining = amounts.copy()
+        total_cost = np.zeros(len(amounts))
+        num_hops = np.zeros(len(amounts), dtype=np.int64)
+        native_hops = np.zeros(len(amounts))
+        hop_fill = np.zeros(order.shape)
+        hop_cost = np.zeros(order.shape)
+        hop_used = np.zeros(order.shape, dtype=bool)
+        
+        # Fill hop k of every event at once
+        for k in range(order.shape[1]):
+            p = order[:, k]
+            used = eligible[events, p] & (remaining > 0)
             
-            if multi_hop_route and multi_hop_route.efficiency_score > best_score:
-                best_route = multi_hop_route
+            fill_amount = np.minimum(remaining, available[p])
+            cost_bps = spread[p] + np.float_power(fill_amount / depth[p], 2) * 100
+            
+            remaining = np.where(used, remaining - fill_amount, remaining)
+            total_cost = np.where(used, total_cost + cost_bps * (fill_amount / amounts), total_cost)
+            num_hops += used
+            native_hops += used & native[p]
+            
+            hop_fill[:, k] = fill_amount
+            hop_cost[:, k] = cost_bps
+            hop_used[:, k] = used
         
-        if best_route:
-            logger.info(f"{FRY_GREEN}✓{RESET} Optimal route found: {best_route}")
+        filled = remaining <= amounts * 0.05  # At most 5% unfilled
         
-        return best_route
+        fry = self._calculate_fry_minting(
+            amounts, total_cost, num_hops=num_hops, native_hops=native_hops
+        )
+        efficiency = fry / (1 + total_cost / 100)
+        
+        routes: List[Optional[WreckageRoute]] = [None] * len(amounts)
+        order, hop_used = order.tolist(), hop_used.tolist()
+        hop_fill, hop_cost = hop_fill.tolist(), hop_cost.tolist()
+        amounts, total_cost = amounts.tolist(), total_cost.tolist()
+        fry, efficiency = fry.tolist(), efficiency.tolist()
+        venues, depths = self.pool_table.venue_names(rows), depth.tolist()
+        
+        for e in np.flatnonzero(filled).tolist():
+            routes[e] = WreckageRoute(
+                wreckage_amount=amounts[e],
+                asset=asset,
+                hops=[{
+                    'venue': venues[p],
+                    'amount': fill_amount,
+                    'cost_bps': cost_bps,
+                    'liquidity_depth': depths[p]
+                } for p, fill_amount, cost_bps, used in zip(
+                    order[e], hop_fill[e], hop_cost[e], hop_used[e]) if used],
+                total_cost_bps=total_cost[e],
+                fry_minted=fry[e],
+                efficiency_score=efficiency[e]
+            )
+        
+        return routes
+    
+    def _convex_split_batch(self, amounts: np.ndarray, asset: str,
+                            rows: np.ndarray, num_candidates: np.ndarray,
+                            depth: np.ndarray, spread: np.ndarray,
+                            available: np.ndarray,
+                            max_hops: int) -> List[Optional[WreckageRoute]]:
+        """
+        Convex split for a batch of events.
+        
+        Events with the same candidate count share a pool prefix, so each
+        group is solved as one (events x pools) water_fill_split.
+        """
+        
+        routes: List[Optional[WreckageRoute]] = [None] * len(amounts)
+        
+        for n in np.unique(num_candidates):
+            if n == 0:
+                continue
+            
+            group = np.flatnonzero(num_candidates == n)
+            fills = water_fill_split(
+                amounts[group], depth[:n], spread[:n], available[:n], max_hops
+            )
+            
+            for e, event_fills in zip(group, fills):
+                routes[e] = self._split_route(
+                    float(amounts[e]), asset, rows[:n], event_fills
+                )
+        
+        return routes
     
     def _find_multi_hop_route(self, amount_usd: float, asset: str,
-                             pools: List[LiquidityPool], 
+                             rows: Sequence[int], 
                              max_hops: int) -> Optional[WreckageRoute]:
         """
         Find optimal multi-hop route by splitting wreckage across venues.
@@ -256,26 +1869,44 @@ class LiquidityRailsEngine:
         Uses greedy algorithm: fill cheapest pools first until wreckage absorbed.
         """
         
-        # Sort pools by cost
-        pool_costs = [(pool, pool.cost_to_fill(amount_usd / max_hops)) 
-                     for pool in pools]
-        pool_costs.sort(key=lambda x: x[1])
+        rows = np.asarray(rows, dtype=np.intp)
+        depth, spread, available, native = self.pool_table.columns(rows)
+        eligible = np.ones((1, len(rows)), dtype=bool)
+        
+        return self._greedy_split_batch(
+            np.array([amount_usd], dtype=np.float64), asset, rows, eligible,
+            depth, spread, available, native, max_hops
+        )[0]
+    
+    def _find_convex_split_route(self, amount_usd: float, asset: str,
+                                 rows: Sequence[int],
+                                 max_hops: int) -> Optional[WreckageRoute]:
+        """
+        Find multi-hop route from the cost-minimizing split (see water_fill_split).
+        
+        Unlike the greedy router this never fills one pool deep into its
+        quadratic slippage while a cheaper marginal fill exists elsewhere.
+        """
+        
+        rows = np.asarray(rows, dtype=np.intp)
+        depth, spread, available, _ = self.pool_table.columns(rows)
+        
+        fills = water_fill_split(amount_usd, depth, spread, available, max_hops)
+        
+        return self._split_route(amount_usd, asset, rows, fills)
+    
+    def _split_route(self, amount_usd: float, asset: str,
+                     rows: np.ndarray, fills: np.ndarray) -> Optional[WreckageRoute]:
+        """Build a multi-hop route from per-row fill amounts"""
         
         hops = []
-        remaining = amount_usd
         total_cost = 0.0
         
-        for pool, _ in pool_costs[:max_hops]:
-            if remaining <= 0:
-                break
-            
-            # Fill as much as possible in this pool
-            fill_amount = min(remaining, pool.available_liquidity())
+        for i in np.flatnonzero(fills):
+            pool = self.pool_table.view(rows[i])
+            fill_amount = float(fills[i])
             cost_bps = pool.cost_to_fill(fill_amount)
             
-            if cost_bps == float('inf'):
-                continue
-            
             hops.append({
                 'venue': pool.venue,
                 'amount': fill_amount,
@@ -283,15 +1914,15 @@ class LiquidityRailsEngine:
                 'liquidity_depth': pool.depth_usd
             })
             
-            remaining -= fill_amount
             total_cost += cost_bps * (fill_amount / amount_usd)
         
-        if remaining > amount_usd * 0.05:  # More than 5% unfilled
+        remaining = amount_usd - sum(hop['amount'] for hop in hops)
+        if not hops or remaining > amount_usd * 0.05:  # More than 5% unfilled
             return None
         
-        # Calculate FRY minting for multi-hop route
         fry_minted = self._calculate_fry_minting(
-            amount_usd, total_cost, num_hops=len(hops)
+            amount_usd, total_cost, num_hops=len(hops),
+            venues=[hop['venue'] for hop in hops]
         )
         
         efficiency = fry_minted / (1 + total_cost / 100)
@@ -306,7 +1937,9 @@ class LiquidityRailsEngine:
         )
     
     def _calculate_fry_minting(self, amount_usd: float, 
-                               cost_bps: float, num_hops: int) -> float:
+                               cost_bps: float, num_hops: int,
+                               venues: Sequence[str] = (),
+                               native_hops: Optional[int] = None) -> float:
         """
         Calculate FRY minting for a route.
         
@@ -315,8 +1948,16 @@ class LiquidityRailsEngine:
         - Routing efficiency (lower cost = more FRY)
         - Multi-hop bonus (liquidity aggregation)
         - Liquidity provision bonus
+        
+        Works elementwise on NumPy arrays when `native_hops` (number of
+        native stablecoin venues on the route) is passed instead of `venues`.
         """
         
+        profiler = self.profiler
+        timed = profiler.enabled
+        if timed:
+            start = time.perf_counter_ns()
+        
         # Base FRY
         base_fry = amount_usd * self.rails_fry_rate
         
@@ -330,39 +1971,97 @@ class LiquidityRailsEngine:
         liquidity_bonus = 0.6  # 60% bonus for providing liquidity
         
         # Native stablecoin bonus (50% for using USDH/USDF)
-        native_bonus = 0.0
-        for hop in self.route.hops:
-            if hop['venue'] in DEXES:
-                native_bonus += 0.5  # 50% bonus per native stablecoin venue
+        if native_hops is None:
+            native_hops = sum(1 for venue in venues if venue in NATIVE_STABLECOIN_VENUES)
+        native_bonus = 0.5 * native_hops  # 50% bonus per native stablecoin venue
         
         total_multiplier = 1 + efficiency_bonus + multi_hop_bonus + liquidity_bonus + native_bonus
         fry_minted = base_fry * total_multiplier
         
+        if timed:
+            profiler.record('fry_minting', time.perf_counter_ns() - start)
+        
         return fry_minted
     
-    def execute_route(self, route: WreckageRoute) -> Dict:
+    def reserve_route(self, route: WreckageRoute) -> LiquidityReservation:
+        """
+        Hold the liquidity a quoted route needs.
+        
+        Locks the route's pools in stripe order, checks every hop against the
+        pool's unreserved liquidity, and reserves all hops or none. Quotes
+        are computed without locks, so a route quoted against since-consumed
+        liquidity is rejected here rather than overbooking the pool.
+        
+        Raises:
+            ReservationError: a hop exceeds its pool's unreserved liquidity
+        """
+        
+        holds: Dict[int, float] = {}
+        for hop in route.hops:
+            row = self.pool_table.row(hop['venue'], route.asset)
+            if row is None:
+                raise ReservationError(f"No {route.asset} pool at {hop['venue']}")
+            holds[row] = holds.get(row, 0.0) + hop['amount']
+        
+        stripes = sorted({row % POOL_LOCK_STRIPES for row in holds})
+        locks = [self._pool_locks[stripe] for stripe in stripes]
+        for lock in locks:
+            lock.acquire()
+        try:
+            for row, amount in holds.items():
+                available = self.pool_table.available(row)
+                if amount > available + RESERVATION_TOLERANCE_USD:
+                    with self._state_lock:
+                        self.reservation_conflicts += 1
+                    raise ReservationError(
+                        f"{self.pool_table.venue_of(row)}/{route.asset}: "
+                        f"${amount:,.2f} requested, ${available:,.2f} unreserved"
+                    )
+            
+            for row, amount in holds.items():
+                reserved = float(self.pool_table.reserved_usd[row])
+                self.pool_index.update(row, reserved_usd=reserved + amount)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        
+        reservation = LiquidityReservation(
+            reservation_id=next(self._reservation_ids),
+            route=route,
+            holds=holds
+        )
+        with self._state_lock:
+            self.reservations[reservation.reservation_id] = reservation
+        
+        return reservation
+    
+    def commit_reservation(self, reservation: LiquidityReservation) -> Dict:
         """
-        Execute wreckage route through liquidity rails.
+        Execute a reserved route: move its holds into pool utilization and mint FRY.
         
         Returns execution summary with FRY minted.
         """
         
+        self._close_reservation(reservation, 'committed')
+        route = reservation.route
+        
         logger.info(f"{FRY_YELLOW}Executing route:{RESET} {route}")
         
-        # Update pool utilizations
-        for hop in route.hops:
-            venue = hop['venue']
-            amount = hop['amount']
-            
-            # Find pool and update utilization
-            for pool in self.liquidity_pools.get(venue, []):
-                if pool.asset == route.asset:
-                    fill_ratio = amount / pool.depth_usd
-                    pool.utilization = min(pool.utilization + fill_ratio, 0.95)
+        # Reserved liquidity becomes utilization
+        table = self.pool_table
+        for row, amount in sorted(reservation.holds.items()):
+            with self._pool_lock(row):
+                fill_ratio = amount / float(table.depth_usd[row])
+                self.pool_index.update(
+                    row,
+                    utilization=float(table.utilization[row]) + fill_ratio,
+                    reserved_usd=max(float(table.reserved_usd[row]) - amount, 0.0)
+                )
         
         # Mint FRY
-        self.total_fry_minted += route.fry_minted
-        self.total_wreckage_routed += route.wreckage_amount
+        with self._state_lock:
+            self.total_fry_minted += route.fry_minted
+            self.total_wreckage_routed += route.wreckage_amount
         
         execution_summary = {
             'route': route,
@@ -377,56 +2076,152 @@ class LiquidityRailsEngine:
         
         return execution_summary
     
-    def allocate_capital(self, total_capital: float) -> Dict[str, float]:
+    def release_reservation(self, reservation: LiquidityReservation):
+        """Return a reservation's held liquidity to its pools"""
+        
+        self._close_reservation(reservation, 'released')
+        
+        table = self.pool_table
+        for row, amount in sorted(reservation.holds.items()):
+            with self._pool_lock(row):
+                self.pool_index.update(
+                    row, reserved_usd=max(float(table.reserved_usd[row]) - amount, 0.0)
+                )
+    
+    def _close_reservation(self, reservation: LiquidityReservation, status: str):
+        with self._state_lock:
+            if self.reservations.pop(reservation.reservation_id, None) is None:
+                raise KeyError(f"Reservation {reservation.reservation_id} is not open "
+                               f"({reservation.status})")
+            reservation.status = status
+    
+    def route_and_reserve(self, amount_usd: float, asset: str,
+                          max_hops: int = 3,
+                          solver: Optional[str] = None,
+                          retries: int = RESERVATION_RETRIES) -> Optional[LiquidityReservation]:
+        """
+        Quote a route and reserve it, re-quoting when another thread wins the liquidity.
+        
+        Returns:
+            Open LiquidityReservation, or None if no route could be reserved
+        """
+        
+        for _ in range(retries + 1):
+            route = self.route_wreckage(amount_usd, asset, max_hops, solver)
+            if route is None:
+                return None
+            try:
+                return self.reserve_route(route)
+            except ReservationError:
+                continue
+        
+        logger.warning(f"Could not reserve {asset} route for ${amount_usd:,.0f} "
+                       f"after {retries + 1} attempts")
+        return None
+    
+    def execute_route(self, route: WreckageRoute) -> Dict:
+        """
+        Execute wreckage route through liquidity rails (reserve + commit).
+        
+        Returns execution summary with FRY minted.
+        
+        Raises:
+            ReservationError: the route no longer fits the pools' liquidity
+        """
+        
+        return self.commit_reservation(self.reserve_route(route))
+    
+    def allocate_capital(self, total_capital: float,
+                         use_cache: bool = False) -> Dict[str, float]:
         """
         Allocate capital across venues based on minting surface gradients.
         
         Uses topology routing to find optimal capital distribution.
+        
+        Venue scores come from the pool table's incrementally maintained
+        venue aggregates and only venues changed since the last call are
+        re-scored, so no per-pool work is done here.
+        
+        Args:
+            total_capital: Capital to distribute (USD)
+            use_cache: Return the previous allocation unchanged when pool
+                state and total_capital are the same as last time
+        
+        Returns:
+            Copy of the venue -> USD allocation; venues with no pools left
+            are dropped
         """
         
-        # Calculate minting potential for each venue
-        venue_scores = {}
+        table = self.pool_table
         
-        for venue, pools in self.liquidity_pools.items():
-            # Score based on: liquidity depth, low utilization, favorable funding
-            total_depth = sum(p.depth_usd for p in pools)
-            avg_utilization = np.mean([p.utilization for p in pools])
-            avg_funding = np.mean([abs(p.funding_rate) for p in pools])
-            
-            # Higher score = more capital allocation
-            score = total_depth * (1 - avg_utilization) / (1 + avg_funding * 100)
-            venue_scores[venue] = score
+        if use_cache and not table.changed_venues and total_capital == self._allocated_capital:
+            return dict(self.capital_allocations)
+        
+        # Re-score changed venues only
+        if len(self._venue_scores) < len(table.venues):
+            self._venue_scores = np.concatenate([
+                self._venue_scores, np.zeros(len(table.venues) - len(self._venue_scores))
+            ])
+        
+        changed = table.take_changed_venues()
+        counts = table.venue_pools[changed]
+        has_pools = counts > 0
+        safe_counts = np.maximum(counts, 1)
+        
+        # Score based on: liquidity depth, low utilization, favorable funding
+        avg_utilization = table.venue_utilization[changed] / safe_counts
+        avg_funding = table.venue_abs_funding[changed] / safe_counts
+        
+        # Higher score = more capital allocation
+        self._venue_scores[changed] = np.where(
+            has_pools,
+            table.venue_depth[changed] * (1 - avg_utilization) / (1 + avg_funding * 100),
+            0.0
+        )
         
         # Normalize to capital allocation
-        total_score = sum(venue_scores.values())
+        active = np.flatnonzero(table.venue_pools[:len(table.venues)] > 0)
+        scores = self._venue_scores[active]
+        allocations = (scores / scores.sum() * total_capital).tolist()
         
-        for venue in venue_scores:
-            allocation = (venue_scores[venue] / total_score) * total_capital
-            self.capital_allocations[venue] = allocation
+        # Rebuilt from active venues so ones emptied by remove_pool drop out
+        self.capital_allocations = {
+            table.venues[venue]: allocation
+            for venue, allocation in zip(active.tolist(), allocations)
+        }
+        self._allocated_capital = total_capital
         
         logger.info(f"{FRY_YELLOW}Capital allocated across {len(self.capital_allocations)} venues{RESET}")
         
-        return self.capital_allocations
+        return dict(self.capital_allocations)
     
     def get_liquidity_summary(self) -> Dict:
         """Get summary of liquidity rails state"""
         
-        total_liquidity = 0
-        total_available = 0
+        table = self.pool_table
+        rows = table.active_rows()
+        venue_ids = table.venue_id[rows]
+        num_venues = len(table.venues)
+        
+        depth = table.depth_usd[rows]
+        available = depth * (1.0 - table.utilization[rows]) - table.reserved_usd[rows]
+        
+        # Per-venue sums in one pass each
+        counts = np.bincount(venue_ids, minlength=num_venues)
+        venue_liquidity = np.bincount(venue_ids, depth, num_venues)
+        venue_available = np.bincount(venue_ids, available, num_venues)
+        
+        total_liquidity = float(depth.sum())
+        total_available = float(available.sum())
         venue_breakdown = {}
         
-        for venue, pools in self.liquidity_pools.items():
-            venue_liquidity = sum(p.depth_usd for p in pools)
-            venue_available = sum(p.available_liquidity() for p in pools)
-            
-            total_liquidity += venue_liquidity
-            total_available += venue_available
-            
-            venue_breakdown[venue] = {
-                'total_liquidity': venue_liquidity,
-                'available_liquidity': venue_available,
-                'utilization': 1.0 - (venue_available / venue_liquidity) if venue_liquidity > 0 else 0,
-                'num_pools': len(pools)
+        for v in np.flatnonzero(counts).tolist():
+            liquidity, avail = float(venue_liquidity[v]), float(venue_available[v])
+            venue_breakdown[table.venues[v]] = {
+                'total_liquidity': liquidity,
+                'available_liquidity': avail,
+                'utilization': 1.0 - (avail / liquidity) if liquidity > 0 else 0,
+                'num_pools': int(counts[v])
             }
         
         return {
@@ -436,7 +2231,10 @@ class LiquidityRailsEngine:
             'venues': venue_breakdown,
             'total_wreckage_routed': self.total_wreckage_routed,
             'total_fry_minted': self.total_fry_minted,
-            'effective_rate': self.total_fry_minted / self.total_wreckage_routed if self.total_wreckage_routed > 0 else 0
+            'effective_rate': self.total_fry_minted / self.total_wreckage_routed if self.total_wreckage_routed > 0 else 0,
+            'quote_cache': self.quote_cache.stats(),
+            'open_reservations': len(self.reservations),
+            'reservation_conflicts': self.reservation_conflicts
         }
 
 
@@ -134,8 +134,8 @@ class IntegratedLiquiditySystem:
         self.wreckage_matcher.collect_wreckage(wreckage_event)
         matches = self.wreckage_matcher.match_wreckage()
         
-        if matches > 0 and wreckage_event.matched:
-            # P2P match found! Highest FRY rate
+        if matches > 0:
+            # P2P match found! Highest FRY rate (this event is the only one pending)
             result['strategy'] = 'p2p_swap'
             result['fry_minted'] = wreckage_event.amount_usd * self.wreckage_matcher.swap_fry_rate
             result['cost_bps'] = 0  # No cost for P2P
@@ -254,7 +254,8 @@ class IntegratedLiquiditySystem:
             'opportunities': opportunities
         }
     
-    def optimize_capital_allocation(self, total_capital: float) -> Dict:
+    def optimize_capital_allocation(self, total_capital: float,
+                                    use_cache: bool = False) -> Dict:
         """
         Optimize capital allocation across venues using topology + liquidity rails.
         
@@ -262,10 +263,14 @@ class IntegratedLiquiditySystem:
         - Liquidity rails capital allocation
         - Topology minting surface gradients
         - Agent B positioning
+        
+        With use_cache, the rails allocation is reused while pool state is unchanged.
         """
         
         # Get liquidity rails allocation
-        rails_allocation = self.liquidity_rails.allocate_capital(total_capital * 0.7)
+        rails_allocation = self.liquidity_rails.allocate_capital(
+            total_capital * 0.7, use_cache=use_cache
+        )
         
         # Reserve capital for Agent B market making
         agent_b_capital = total_capital * 0.3
@@ -302,8 +307,8 @@ class IntegratedLiquiditySystem:
             'liquidity_rails': liquidity_summary,
             'agent_b': agent_b_metrics,
             'wreckage_matcher': {
-                'total_events': len(self.wreckage_matcher.wreckage_pool),
-                'matched_pairs': len(self.wreckage_matcher.matched_pairs),
+                'total_events': self.wreckage_matcher.total_events,
+                'matched_pairs': self.wreckage_matcher.total_matched_pairs,
                 'total_fry': self.wreckage_matcher.total_fry_minted
             }
         }
@@ -0,0 +1,590 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Topology Routing Benchmarks
+===========================
+
+Micro-benchmarks for TopologyRouter on DEX networks well beyond the four
+venues of the FRY v3 topology.
+
+Benchmarks:
+- Path index: k-best path lookup vs exhaustive DFS per find_optimal_route,
+  agreement with the exhaustive optimum, incremental refresh vs rebuild
+- Minting surface: scalar loop vs vectorized grid at 20², 200², 2000²,
+  refined grid and closed-form optimum (latency + dy/dx gap)
+- Number theory: trial division vs sieve/Pollard-rho service with memoized
+  factor sets (route scoring bonus and large notionals)
+- Route cache: hit rate and latency of quote_route under repeated federated
+  requests with periodic DEX parameter updates
+- Agent B history: streaming metrics + bounded history vs full-history
+  np.mean per route (latency growth, memory, spilled training export)
+- Feature extraction: get_topology_features_batch at 1M routes vs per-route
+  get_topology_features
+- Config graph: JSON load, cold/warm query latency and incremental edge
+  updates on a 500-node venue/asset graph
+- Robust scoring: Monte Carlo find_robust_route vs point-estimate
+  find_optimal_route (latency, route flips, held-out tail FRY)
+
+Usage:
+    python core/engines/routing/topology_routing_benchmark.py
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from number_theory_service import configure
+from topology_routing_engine import (TopologyRouter, TopologyAwareAgentB, MintingSurface,
+                                     PATH_INDEX_K, gcd)
+
+# FRY color scheme
+FRY_RED = "\033[91m"
+FRY_YELLOW = "\033[93m"
+FRY_GREEN = "\033[92m"
+RESET = "\033[0m"
+BOLD = "\033[1m"
+
+
+def build_router(num_dexes: int, degree: int = 6, seed: int = 11) -> TopologyRouter:
+    """Random DEX network with `degree` outgoing connections per DEX"""
+    rng = np.random.default_rng(seed)
+    router = TopologyRouter()
+    names = [f"DEX-{i}" for i in range(num_dexes)]
+    router.dex_network = {
+        name: {
+            'efficiency': float(rng.uniform(0.05, 0.45)),
+            'notional_capacity': int(rng.integers(10_000, 100_000)),
+            'funding_rate': float(rng.uniform(-0.002, 0.002)),
+            'connections': [names[j] for j in rng.choice(
+                [j for j in range(num_dexes) if j != i], degree, replace=False)],
+        }
+        for i, name in enumerate(names)
+    }
+    return router
+
+
+def _exhaustive_route(router: TopologyRouter, start: str, end: str, trade_size: float) -> Dict:
+    """find_optimal_route over every path (pre-index behaviour)"""
+    paths = router._find_all_paths(start, end)
+    if not paths:
+        return None
+    return max((router.calculate_route_score(path, trade_size) for path in paths),
+               key=lambda route: route['fry_per_dollar'])
+
+
+def benchmark_path_index(num_dexes: int = 100, degree: int = 16, num_queries: int = 200):
+    """Indexed k-best lookup against exhaustive DFS, then incremental refresh"""
+    print(f"\n{BOLD}Path Index @ {num_dexes} DEXes x {degree} connections, k={PATH_INDEX_K}{RESET}")
+    print("-" * 70)
+
+    router = build_router(num_dexes, degree)
+    rng = np.random.default_rng(13)
+    names = list(router.dex_network)
+    queries = [(names[a], names[b], float(rng.uniform(5_000, 100_000)))
+               for a, b in rng.integers(num_dexes, size=(num_queries, 2))]
+
+    start = time.perf_counter()
+    expected = [_exhaustive_route(router, a, b, size) for a, b, size in queries]
+    dfs_ms = (time.perf_counter() - start) / num_queries * 1e3
+
+    start = time.perf_counter()
+    router.path_index.precompute()
+    precompute_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    found = [router.find_optimal_route(a, b, size) for a, b, size in queries]
+    index_ms = (time.perf_counter() - start) / num_queries * 1e3
+
+    ratios = [f['fry_per_dollar'] / e['fry_per_dollar'] for f, e in zip(found, expected) if e]
+    exact = sum(f['path'] == e['path'] for f, e in zip(found, expected) if e)
+
+    # Incremental refresh: toggle random connections, re-fill only what was dropped
+    pairs = len(router.path_index)
+    refresh_ms, dropped = [], []
+    for _ in range(20):
+        a, b = rng.choice(num_dexes, 2, replace=False)
+        start = time.perf_counter()
+        if router.graph.has_edge(a, b):
+            router.disconnect(names[a], names[b])
+        else:
+            router.connect(names[a], names[b])
+        dropped.append(pairs - len(router.path_index))
+        router.path_index.precompute()
+        refresh_ms.append((time.perf_counter() - start) * 1e3)
+
+    print(f"  Exhaustive DFS:         {dfs_ms:10.3f} ms/query")
+    print(f"  Indexed k-best:         {FRY_GREEN}{index_ms:10.3f} ms/query{RESET}")
+    print(f"  Speedup:                {FRY_RED}{dfs_ms / index_ms:10.1f}x{RESET}")
+    print(f"  Same path as DFS:       {exact:6d}/{len(ratios)}"
+          f" (worst FRY/$ ratio {min(ratios):.4f})")
+    print(f"  Full precompute:        {precompute_ms:10.1f} ms ({pairs:,} pairs)")
+    print(f"  Incremental refresh:    {np.mean(refresh_ms):10.1f} ms"
+          f" ({np.mean(dropped):.0f} pairs recomputed avg)")
+
+    return {
+        'dfs_ms': dfs_ms,
+        'index_ms': index_ms,
+        'exact_paths': exact,
+        'worst_ratio': min(ratios),
+        'precompute_ms': precompute_ms,
+        'refresh_ms': float(np.mean(refresh_ms)),
+    }
+
+
+def _loop_optimal_zone(surface: MintingSurface, efficiency_range, notional_range,
+                       resolution: int) -> float:
+    """Scalar nested-loop grid search (pre-vectorization behaviour)"""
+    best = -np.inf
+    for eff in np.linspace(efficiency_range[0], efficiency_range[1], resolution):
+        for notional in np.linspace(notional_range[0], notional_range[1], resolution):
+            best = max(best, surface.calculate_gradient(eff, notional))
+    return best
+
+
+def benchmark_minting_surface():
+    """Optimum search latency and quality across grid resolutions"""
+    # Calibrated surface peaks at a corner; a negative base rate moves the
+    # peak into the interior, where grid resolution matters
+    interior = MintingSurface()
+    interior.base_minting_rate = -1.4
+    cases = [
+        ("calibrated", MintingSurface(), (0.05, 0.45), (0.1, 10.0)),
+        ("interior peak", interior, (0.05, 0.45), (0.1, 300.0)),
+    ]
+
+    def timed(fn, repeats: int):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            value = fn()
+        return value, (time.perf_counter() - start) / repeats * 1e3
+
+    results = {}
+    for label, surface, efficiency_range, notional_range in cases:
+        print(f"\n{BOLD}Minting Surface Optimum Search ({label}){RESET}")
+        print("-" * 70)
+
+        optimum, analytic_ms = timed(
+            lambda: surface.find_optimal_zone(efficiency_range, notional_range)['dy_dx'], 1_000)
+
+        for resolution, repeats in ((20, 50), (200, 1)):
+            value, ms = timed(lambda: _loop_optimal_zone(surface, efficiency_range, notional_range,
+                                                         resolution), repeats)
+            print(f"  Loop {resolution:4d}x{resolution:<4d}          {ms:10.3f} ms"
+                  f"   gap {optimum - value:.2e}")
+            results[f'{label}_loop_ms_{resolution}'] = ms
+
+        for resolution, repeats in ((20, 1_000), (200, 100), (2000, 3)):
+            value, ms = timed(lambda: float(surface.gradient_grid(efficiency_range, notional_range,
+                                                                  resolution)[2].max()), repeats)
+            print(f"  Vectorized {resolution:4d}x{resolution:<4d}    {ms:10.3f} ms"
+                  f"   gap {optimum - value:.2e}")
+            results[f'{label}_grid_ms_{resolution}'] = ms
+
+        value, ms = timed(lambda: surface.find_optimal_zone(efficiency_range, notional_range,
+                                                            resolution=20)['dy_dx'], 200)
+        print(f"  Refined 20x20 grid:     {ms:10.3f} ms   gap {optimum - value:.2e}")
+        print(f"  Closed form:            {FRY_GREEN}{analytic_ms:10.3f} ms{RESET}   (exact)")
+        results[f'{label}_refined_ms'] = ms
+        results[f'{label}_analytic_ms'] = analytic_ms
+
+    return results
+
+
+def _trial_factorize(n: int) -> List[int]:
+    """Trial division (pre-service behaviour)"""
+    factors = []
+    d = 2
+    while d * d <= n:
+        while n % d == 0:
+            factors.append(d)
+            n //= d
+        d += 1
+    if n > 1:
+        factors.append(n)
+    return factors
+
+
+def _trial_bonus(trade_size: int, capacity: int) -> float:
+    """_calculate_number_theory_bonus with trial division"""
+    gcd_bonus = gcd(trade_size, capacity) / min(trade_size, capacity)
+    trade_primes = set(_trial_factorize(trade_size))
+    capacity_primes = set(_trial_factorize(capacity))
+    prime_overlap = len(trade_primes & capacity_primes) / max(len(trade_primes), 1)
+    return 1.0 + (0.15 * gcd_bonus + 0.15 * prime_overlap)
+
+
+def benchmark_number_theory(num_bonuses: int = 20_000, num_large: int = 20):
+    """Number theory bonus and large-notional factorization latency"""
+    print(f"\n{BOLD}Number Theory Service{RESET}")
+    print("-" * 70)
+
+    router = TopologyRouter()
+    capacities = [dex['notional_capacity'] for dex in router.dex_network.values()]
+    rng = np.random.default_rng(17)
+    # Hop sizes up to $10M; federated clients keep re-quoting a few thousand round sizes
+    quoted = rng.integers(1, 200_000, 2_000) * 50
+    sizes = rng.choice(quoted, num_bonuses).tolist()
+    pairs = [(size, capacities[i % len(capacities)]) for i, size in enumerate(sizes)]
+
+    start = time.perf_counter()
+    expected = [_trial_bonus(size, capacity) for size, capacity in pairs]
+    trial_us = (time.perf_counter() - start) / num_bonuses * 1e6
+
+    start = time.perf_counter()
+    service = configure()
+    sieve_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    found = [router._calculate_number_theory_bonus(size, capacity) for size, capacity in pairs]
+    service_us = (time.perf_counter() - start) / num_bonuses * 1e6
+    assert found == expected
+
+    # Large notionals: products of two ~1e6 primes (trial division's worst case)
+    primes = [p for p in range(1_000_003, 1_010_000, 2) if len(_trial_factorize(p)) == 1]
+    large = [primes[i] * primes[-1 - i] for i in range(num_large)]
+
+    start = time.perf_counter()
+    expected = [_trial_factorize(n) for n in large]
+    trial_large_ms = (time.perf_counter() - start) / num_large * 1e3
+
+    start = time.perf_counter()
+    found = [service.prime_factorize(n) for n in large]
+    rho_large_ms = (time.perf_counter() - start) / num_large * 1e3
+    assert found == expected
+
+    print(f"  Sieve build (≤{service.sieve_limit:,}): {sieve_ms:6.1f} ms")
+    print(f"  Bonus, trial division:  {trial_us:10.2f} µs")
+    print(f"  Bonus, shared service:  {FRY_GREEN}{service_us:10.2f} µs{RESET}")
+    print(f"  Speedup:                {FRY_RED}{trial_us / service_us:10.1f}x{RESET}")
+    print(f"  ~1e12 semiprime, trial: {trial_large_ms:10.2f} ms")
+    print(f"  ~1e12 semiprime, rho:   {FRY_GREEN}{rho_large_ms:10.2f} ms{RESET}")
+
+    return {
+        'sieve_ms': sieve_ms,
+        'trial_bonus_us': trial_us,
+        'service_bonus_us': service_us,
+        'trial_large_ms': trial_large_ms,
+        'rho_large_ms': rho_large_ms,
+    }
+
+
+def benchmark_route_cache(num_requests: int = 20_000, update_every: int = 5_000):
+    """quote_route vs find_optimal_route under repeated requests"""
+    print(f"\n{BOLD}Route Cache @ {num_requests:,} requests{RESET}")
+    print("-" * 70)
+
+    router = build_router(30, degree=6)
+    rng = np.random.default_rng(19)
+    names = list(router.dex_network)
+    # Clients favour a handful of venue pairs and round trade sizes
+    pairs = [tuple(rng.choice(names, 2, replace=False)) for _ in range(10)]
+    sizes = [1_000 * int(k) for k in rng.integers(1, 100, 20)]
+    requests = [(*pairs[int(rng.integers(len(pairs)))], float(sizes[int(rng.integers(len(sizes)))]))
+                for _ in range(num_requests)]
+
+    def run(route_fn) -> List:
+        routes = []
+        for i, (start_dex, end_dex, size) in enumerate(requests):
+            if i % update_every == 0:
+                dex = names[(i // update_every) % len(names)]
+                funding_rate = router.graph.funding_rate[router.graph.ids[dex]]
+                router.update_dex(dex, funding_rate=funding_rate * 0.99)
+            routes.append(route_fn(start_dex, end_dex, size))
+        return routes
+
+    original = router.dex_network
+    start = time.perf_counter()
+    expected = run(router.find_optimal_route)
+    uncached_us = (time.perf_counter() - start) / num_requests * 1e6
+
+    router.dex_network = original
+    start = time.perf_counter()
+    found = run(router.quote_route)
+    cached_us = (time.perf_counter() - start) / num_requests * 1e6
+
+    stats = router.route_cache.stats()
+    mismatches = sum(f != e for f, e in zip(found, expected))
+
+    print(f"  find_optimal_route:     {uncached_us:10.1f} µs/request")
+    print(f"  quote_route:            {FRY_GREEN}{cached_us:10.1f} µs/request{RESET}")
+    print(f"  Speedup:                {FRY_RED}{uncached_us / cached_us:10.1f}x{RESET}")
+    print(f"  Hit rate:               {stats['hit_rate']:10.1%}"
+          f" ({stats['size']:,} entries, {stats['evictions']} evictions)")
+    print(f"  Mismatched routes:      {mismatches:10d}")
+
+    return {
+        'uncached_us': uncached_us,
+        'cached_us': cached_us,
+        'hit_rate': stats['hit_rate'],
+        'mismatches': mismatches,
+    }
+
+
+class _LegacyAgent(TopologyAwareAgentB):
+    """Unbounded list history with np.mean over all routes (pre-streaming)"""
+
+    def __init__(self):
+        super().__init__()
+        self.route_history = []
+
+    def _record_route(self, route: Dict):
+        self.route_history.append(route)
+        self.performance_metrics['total_routes'] += 1
+        self.performance_metrics['total_fry_from_topology'] += route['total_fry']
+        self.performance_metrics['avg_gradient'] = np.mean([
+            r['avg_gradient'] for r in self.route_history
+        ])
+
+
+def benchmark_agent_history(num_routes: int = 50_000, history_size: int = 5_000):
+    """Per-route bookkeeping cost and memory as the history grows"""
+    print(f"\n{BOLD}Agent B History @ {num_routes:,} routes (history_size={history_size:,}){RESET}")
+    print("-" * 70)
+
+    logging.getLogger("topology_routing_engine").setLevel(logging.WARNING)
+    rng = np.random.default_rng(23)
+    routes = [TopologyRouter().find_optimal_route('dYdX', 'GMX', float(size))
+              for size in rng.integers(1_000, 90_000, 500)]
+    routes = [dict(routes[i % len(routes)]) for i in range(num_routes)]
+    spill_path = os.path.join(tempfile.mkdtemp(), "route_history.ndjson")
+
+    def run(agent: TopologyAwareAgentB) -> List[float]:
+        window_us = []
+        start = time.perf_counter()
+        for i, route in enumerate(routes, 1):
+            agent._record_route(route)
+            if i % 10_000 == 0:
+                window_us.append((time.perf_counter() - start) / 10_000 * 1e6)
+                start = time.perf_counter()
+        return window_us
+
+    legacy, streaming = _LegacyAgent(), TopologyAwareAgentB(history_size, spill_path)
+    legacy_us = run(legacy)
+
+    streaming_us = run(streaming)
+
+    start = time.perf_counter()
+    exported = len(streaming.get_topology_training_data())
+    export_ms = (time.perf_counter() - start) * 1e3
+    streaming.close()
+    os.remove(spill_path)
+
+    drift = abs(streaming.performance_metrics['avg_gradient']
+                - legacy.performance_metrics['avg_gradient'])
+
+    print(f"  Per route, full list:   " + " → ".join(f"{us:.1f}" for us in legacy_us) + " µs")
+    print(f"  Per route, streaming:   {FRY_GREEN}" + " → ".join(f"{us:.1f}" for us in streaming_us)
+          + f" µs{RESET}")
+    print(f"  In-memory routes:       {len(legacy.route_history):10,} → {len(streaming.route_history):,}"
+          f" ({streaming.spilled_routes:,} spilled to disk)")
+    print(f"  Training export:        {exported:10,} routes in {export_ms:.0f} ms")
+    print(f"  avg_gradient drift:     {drift:10.2e}")
+
+    return {
+        'legacy_us': legacy_us,
+        'streaming_us': streaming_us,
+        'exported': exported,
+        'drift': drift,
+    }
+
+
+def benchmark_feature_batch(num_routes: int = 1_000_000, legacy_routes: int = 50_000):
+    """Batch float32 feature matrix vs per-route feature vectors"""
+    print(f"\n{BOLD}Topology Features @ {num_routes:,} routes{RESET}")
+    print("-" * 70)
+
+    router = build_router(100, degree=8)
+    rng = np.random.default_rng(29)
+    names = list(router.dex_network)
+    distinct = [router.find_optimal_route(names[a], names[b], float(size))
+                for a, b, size in zip(rng.integers(100, size=500), rng.integers(100, size=500),
+                                      rng.integers(1_000, 100_000, 500))]
+    routes = [distinct[i] for i in rng.integers(len(distinct), size=num_routes)]
+
+    start = time.perf_counter()
+    expected = np.array([router.get_topology_features(route) for route in routes[:legacy_routes]])
+    legacy_rate = legacy_routes / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    features = router.get_topology_features_batch(routes)
+    batch_s = time.perf_counter() - start
+
+    identical = bool(np.array_equal(features[:legacy_routes], expected))
+
+    print(f"  Per-route vectors:      {legacy_rate:10,.0f} routes/s")
+    print(f"  Batch matrix:           {FRY_GREEN}{num_routes / batch_s:10,.0f} routes/s{RESET}"
+          f" ({batch_s * 1e3:.0f} ms, {features.nbytes / 1e6:.0f} MB {features.dtype})")
+    print(f"  Speedup:                {FRY_RED}{num_routes / batch_s / legacy_rate:10.1f}x{RESET}")
+    print(f"  Identical rows:         {str(identical):>10}")
+
+    return {
+        'legacy_routes_per_s': legacy_rate,
+        'batch_routes_per_s': num_routes / batch_s,
+        'identical': identical,
+    }
+
+
+def write_topology_config(path: str, num_venues: int = 50, num_assets: int = 10,
+                          degree: int = 8, seed: int = 31):
+    """Venue/asset node config ('Venue-i:ASSET') with random connections"""
+    rng = np.random.default_rng(seed)
+    names = [f"Venue-{v}:ASSET-{a}" for v in range(num_venues) for a in range(num_assets)]
+    dexes = {
+        name: {
+            'efficiency': float(rng.uniform(0.05, 0.45)),
+            'notional_capacity': int(rng.integers(10_000, 100_000)),
+            'funding_rate': float(rng.uniform(-0.002, 0.002)),
+            'connections': [names[j] for j in rng.choice(len(names), degree, replace=False) if j != i],
+        }
+        for i, name in enumerate(names)
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'dexes': dexes}, f)
+    return names
+
+
+def benchmark_graph_config(num_venues: int = 50, num_assets: int = 10, num_queries: int = 200):
+    """Config load, query latency and incremental edge updates at 500 nodes"""
+    num_nodes = num_venues * num_assets
+    print(f"\n{BOLD}Config Graph @ {num_nodes} venue/asset nodes{RESET}")
+    print("-" * 70)
+
+    path = os.path.join(tempfile.mkdtemp(), "topology.json")
+    names = write_topology_config(path, num_venues, num_assets)
+
+    start = time.perf_counter()
+    router = TopologyRouter(config_path=path)
+    load_ms = (time.perf_counter() - start) * 1e3
+    os.remove(path)
+
+    rng = np.random.default_rng(37)
+    queries = [(names[a], names[b], float(rng.uniform(5_000, 100_000)))
+               for a, b in rng.integers(num_nodes, size=(num_queries, 2))]
+
+    start = time.perf_counter()
+    for a, b, size in queries:
+        router.find_optimal_route(a, b, size)
+    cold_ms = (time.perf_counter() - start) / num_queries * 1e3
+
+    start = time.perf_counter()
+    for a, b, size in queries:
+        router.find_optimal_route(a, b, size)
+    warm_ms = (time.perf_counter() - start) / num_queries * 1e3
+
+    update_us = []
+    for _ in range(200):
+        a, b = rng.choice(num_nodes, 2, replace=False)
+        start = time.perf_counter()
+        if router.graph.has_edge(a, b):
+            router.disconnect(names[a], names[b])
+        else:
+            router.connect(names[a], names[b])
+        update_us.append((time.perf_counter() - start) * 1e6)
+
+    cached_pairs = len(router.path_index)
+    network = router.dex_network
+    start = time.perf_counter()
+    router.dex_network = network
+    rebuild_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"  Config load:            {FRY_GREEN}{load_ms:10.1f} ms{RESET}"
+          f" ({router.graph.out_edges.num_edges:,} edges)")
+    print(f"  Query (cold pair):      {cold_ms:10.2f} ms")
+    print(f"  Query (cached paths):   {FRY_GREEN}{warm_ms:10.2f} ms{RESET}")
+    print(f"  Edge update:            {np.mean(update_us):10.1f} µs avg"
+          f" ({cached_pairs:,} of {num_queries} pairs still cached)")
+    print(f"  Full graph rebuild:     {rebuild_ms:10.1f} ms")
+
+    return {
+        'load_ms': load_ms,
+        'cold_query_ms': cold_ms,
+        'warm_query_ms': warm_ms,
+        'edge_update_us': float(np.mean(update_us)),
+        'rebuild_ms': rebuild_ms,
+    }
+
+
+def benchmark_robust_scoring(num_dexes: int = 100, degree: int = 16, num_queries: int = 200,
+                             holdout_scenarios: int = 20_000):
+    """Robust route choice vs point estimates, judged on held-out scenarios"""
+    print(f"\n{BOLD}Robust Scoring @ {num_dexes} DEXes, {num_queries} quotes{RESET}")
+    print("-" * 70)
+
+    router = build_router(num_dexes, degree, seed=41)
+    rng = np.random.default_rng(43)
+    names = list(router.graph.names)
+    queries = [(names[a], names[b], float(rng.uniform(5_000, 100_000)))
+               for a, b in rng.choice(num_dexes, size=(num_queries, 2))
+               if a != b]
+
+    # Fill the path index so both timings measure scoring only
+    for a, b, size in queries:
+        router.find_optimal_route(a, b, size)
+
+    point_routes, robust_routes = [], []
+    start = time.perf_counter()
+    for a, b, size in queries:
+        point_routes.append(router.find_optimal_route(a, b, size))
+    point_ms = (time.perf_counter() - start) / len(queries) * 1e3
+
+    robust_ms = []
+    for a, b, size in queries:
+        start = time.perf_counter()
+        robust_routes.append(router.find_robust_route(a, b, size))
+        robust_ms.append((time.perf_counter() - start) * 1e3)
+
+    # Judge both choices on scenarios neither one was picked with
+    flips, point_tail, robust_tail = 0, 0.0, 0.0
+    for (a, b, size), point, robust in zip(queries, point_routes, robust_routes):
+        if point is None:
+            continue
+        holdout = {
+            tuple(route['path']): route['tail_fry']
+            for route in router.score_routes_robust(a, b, size, num_scenarios=holdout_scenarios,
+                                                    latency_budget_ms=None, seed=97)
+        }
+        flips += point['path'] != robust['path']
+        point_tail += holdout[tuple(point['path'])]
+        robust_tail += holdout[tuple(robust['path'])]
+
+    scenarios = np.mean([route['scenarios'] for route in robust_routes if route])
+    print(f"  Point estimate:         {point_ms:10.2f} ms/quote")
+    print(f"  Robust (Monte Carlo):   {FRY_GREEN}{np.mean(robust_ms):10.2f} ms/quote{RESET}"
+          f" (p99 {np.percentile(robust_ms, 99):.2f} ms, {scenarios:,.0f} scenarios avg)")
+    print(f"  Route flips:            {flips:10d} / {len(queries)}")
+    print(f"  Held-out 5% tail FRY:   {FRY_RED}{robust_tail / point_tail - 1:+10.2%}{RESET}"
+          f" vs point-estimate routes")
+
+    return {
+        'point_ms': point_ms,
+        'robust_ms': float(np.mean(robust_ms)),
+        'robust_p99_ms': float(np.percentile(robust_ms, 99)),
+        'flips': flips,
+        'tail_gain': robust_tail / point_tail - 1,
+    }
+
+
+def main():
+    print(f"\n{FRY_RED}{BOLD}{'='*70}{RESET}")
+    print(f"{FRY_RED}{BOLD}FRY Topology Routing - Benchmarks{RESET}")
+    print(f"{FRY_RED}{BOLD}{'='*70}{RESET}")
+
+    benchmark_path_index()
+    benchmark_minting_surface()
+    benchmark_number_theory()
+    benchmark_route_cache()
+    benchmark_agent_history()
+    benchmark_feature_batch()
+    benchmark_graph_config()
+    benchmark_robust_scoring()
+
+    print(f"\n{FRY_RED}{BOLD}{'='*70}{RESET}\n")
+
+
+if __name__ == "__main__":
+    main()
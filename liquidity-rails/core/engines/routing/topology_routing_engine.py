@@ -13,6 +13,14 @@ Key Features:
 2. Topological path optimization across DEX network
 3. Number theory-enhanced route decomposition
 4. Federated learning integration for distributed optimization
+5. Precomputed k-best path index with incremental refresh
+6. Vectorized minting surface with closed-form optimum search
+7. Sieve-backed shared factorization cache for number theory bonuses
+8. LRU + TTL route cache keyed by topology version
+9. O(1) streaming route metrics with bounded, disk-spilling route history
+10. Batch topology feature extraction into float32 matrices
+11. Config-driven DEX graph with CSR adjacency and integer node ids
+12. Monte Carlo robust route scoring under funding/efficiency noise
 
 Based on the FRY v3 topology showing:
 - dYdX (16%), Aster (12%), Hyperliquid, GMX (40%)
@@ -21,25 +29,79 @@ Based on the FRY v3 topology showing:
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from collections import defaultdict
+from typing import Dict, List, Tuple, Optional, Union
+from collections import defaultdict, deque, OrderedDict
+from itertools import chain
+from operator import itemgetter
+import heapq
+import json
 import logging
+import os
+import sys
+import threading
+import time
+
+from funding_scenarios import (EFFICIENCY_NOISE_STD, FUNDING_NOISE_STD, SCENARIO_COUNT,
+                               SCENARIO_LATENCY_BUDGET_MS, SCENARIO_SEED, TAIL_QUANTILE,
+                               funding_drag, monte_carlo_fry)
+
+try:
+    from number_theory_service import factor_set
+except ImportError:  # Run from routing/: the shared service lives in core/engines
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from number_theory_service import factor_set
 
 logger = logging.getLogger(__name__)
 
+# Path search
+MAX_ROUTE_HOPS = 4   # Max DEXes on a route (including start and end)
+PATH_INDEX_K = 8     # Candidate paths kept per (start, end) pair
+
+# Route cache
+ROUTE_CACHE_SIZE = 4096
+ROUTE_CACHE_TTL_SECONDS = 60.0
+ROUTE_CACHE_BUCKET_USD = 1.0
+
+# Topology feature vector (see get_topology_features)
+NUM_TOPOLOGY_FEATURES = 10
+_ROUTE_SCALARS = itemgetter('total_gradient', 'avg_gradient', 'route_efficiency',
+                            'fry_per_dollar', 'total_fry')
 
-def prime_factorize(n: int) -> List[int]:
-    """Decompose notional into prime factors for optimal sub-routing"""
-    factors = []
-    d = 2
-    while d * d <= n:
-        while n % d == 0:
-            factors.append(d)
-            n //= d
-        d += 1
-    if n > 1:
-        factors.append(n)
-    return factors
+# Agent B route history (recent routes kept in memory)
+ROUTE_HISTORY_SIZE = 10_000
+
+# Minting surface grid search (used when calculate_gradient is overridden)
+SURFACE_GRID_RESOLUTION = 20
+SURFACE_REFINEMENTS = 4
+
+
+# DEX network from visualization
+DEFAULT_DEX_NETWORK = {
+    'dYdX': {
+        'efficiency': 0.16,
+        'notional_capacity': 50000,  # $50K capacity
+        'funding_rate': -0.0015,
+        'connections': ['Aster', 'Hyperliquid']
+    },
+    'Aster': {
+        'efficiency': 0.12,
+        'notional_capacity': 30000,
+        'funding_rate': -0.0012,
+        'connections': ['dYdX', 'Hyperliquid']
+    },
+    'Hyperliquid': {
+        'efficiency': 0.25,  # Central hub
+        'notional_capacity': 80000,
+        'funding_rate': 0.0018,
+        'connections': ['dYdX', 'Aster', 'GMX']
+    },
+    'GMX': {
+        'efficiency': 0.40,  # Highest efficiency
+        'notional_capacity': 40000,
+        'funding_rate': 0.0020,
+        'connections': ['Hyperliquid']
+    }
+}
 
 
 def gcd(a: int, b: int) -> int:
@@ -64,16 +126,20 @@ class MintingSurface:
         self.notional_weight = 0.8    # Swap notional impact
         self.gradient_threshold = 1.5 # Minimum dy/dx for route selection
         
-    def calculate_gradient(self, hedge_efficiency: float, swap_notional: float) -> float:
+    def calculate_gradient(self, hedge_efficiency: Union[float, np.ndarray],
+                           swap_notional: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
         Calculate dy/dx gradient at point on minting surface.
         
+        Inputs may be scalars or broadcastable NumPy arrays.
+        
         Args:
             hedge_efficiency: 0.0 to 1.0 (e.g., 0.40 for GMX's 40%)
             swap_notional: In $10K units (e.g., 0.5 for $5K)
         
         Returns:
-            dy/dx gradient value (higher = better minting)
+            dy/dx gradient value (higher = better minting), elementwise
+            for array inputs
         """
         # Normalize inputs
         eff_norm = hedge_efficiency
@@ -94,31 +160,613 @@ class MintingSurface:
         
         return dy_dx
     
+    def gradient_grid(self, efficiency_range: Tuple[float, float],
+                      notional_range: Tuple[float, float],
+                      resolution: int = SURFACE_GRID_RESOLUTION) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate dy/dx on a resolution × resolution grid in one pass.
+        
+        Returns:
+            (efficiencies, notionals, gradients[efficiency, notional])
+        """
+        efficiencies = np.linspace(efficiency_range[0], efficiency_range[1], resolution)
+        notionals = np.linspace(notional_range[0], notional_range[1], resolution)
+        gradients = self.calculate_gradient(efficiencies[:, None], notionals[None, :])
+        return efficiencies, notionals, gradients
+    
     def find_optimal_zone(self, efficiency_range: Tuple[float, float], 
-                         notional_range: Tuple[float, float]) -> Dict:
+                         notional_range: Tuple[float, float],
+                         resolution: Optional[int] = None) -> Dict:
         """
         Find optimal zone on minting surface within given ranges.
         
+        The built-in surface is maximized in closed form. A subclass that
+        overrides calculate_gradient (or an explicit resolution) gets a
+        vectorized grid search refined around the best cell.
+        
         Returns point with maximum dy/dx gradient.
         """
-        best_gradient = -np.inf
-        best_point = None
+        if resolution is None and type(self).calculate_gradient is MintingSurface.calculate_gradient:
+            eff, notional = self._analytic_optimum(efficiency_range, notional_range)
+        else:
+            eff, notional = self._grid_optimum(efficiency_range, notional_range,
+                                               resolution or SURFACE_GRID_RESOLUTION)
         
-        # Grid search over parameter space
-        for eff in np.linspace(efficiency_range[0], efficiency_range[1], 20):
-            for notional in np.linspace(notional_range[0], notional_range[1], 20):
-                gradient = self.calculate_gradient(eff, notional)
-                
-                if gradient > best_gradient:
-                    best_gradient = gradient
-                    best_point = (eff, notional)
+        best_gradient = float(self.calculate_gradient(eff, notional))
         
         return {
-            'hedge_efficiency': best_point[0],
-            'swap_notional': best_point[1],
+            'hedge_efficiency': eff,
+            'swap_notional': notional,
             'dy_dx': best_gradient,
             'fry_multiplier': 1.0 + (best_gradient / self.base_minting_rate)
         }
+    
+    def _analytic_optimum(self, efficiency_range: Tuple[float, float],
+                          notional_range: Tuple[float, float]) -> Tuple[float, float]:
+        """
+        Exact maximizer of the built-in surface.
+        
+        dy/dx = w_e·b·(1 + w_e·e)·exp(-n/200) + w_n·(1 - n/100) is monotone
+        in efficiency (slope sign = sign of w_e²·b), so e* is a range endpoint.
+        Along notional it is A·exp(-n/200) + linear: convex for A >= 0 (max
+        at an endpoint) and concave for A < 0 with a stationary point at
+        n = -200·ln(-2·w_n / A).
+        """
+        e_lo, e_hi = efficiency_range
+        n_lo, n_hi = notional_range
+        rising = self.base_minting_rate > 0 and self.efficiency_weight != 0
+        eff = e_hi if rising else e_lo
+        
+        candidates = [n_lo, n_hi]
+        A = self.efficiency_weight * self.base_minting_rate * (1 + self.efficiency_weight * eff)
+        if A < 0 and self.notional_weight > 0:
+            stationary = -200.0 * np.log(-2.0 * self.notional_weight / A)
+            if n_lo < stationary < n_hi:
+                candidates.append(float(stationary))
+        
+        # First maximum wins, matching a grid scan from the low end
+        values = [self.calculate_gradient(eff, n) for n in candidates]
+        return float(eff), float(candidates[int(np.argmax(values))])
+    
+    def _grid_optimum(self, efficiency_range: Tuple[float, float],
+                      notional_range: Tuple[float, float],
+                      resolution: int) -> Tuple[float, float]:
+        """Vectorized grid search, re-gridding around the best cell"""
+        (e_lo, e_hi), (n_lo, n_hi) = efficiency_range, notional_range
+        best = (-np.inf, e_lo, n_lo)
+        
+        for _ in range(SURFACE_REFINEMENTS + 1):
+            efficiencies, notionals, gradients = self.gradient_grid((e_lo, e_hi), (n_lo, n_hi), resolution)
+            i, j = np.unravel_index(int(np.argmax(gradients)), gradients.shape)
+            if gradients[i, j] > best[0]:
+                best = (float(gradients[i, j]), float(efficiencies[i]), float(notionals[j]))
+            
+            # Zoom to the cells either side of the best point
+            e_lo, e_hi = efficiencies[max(i - 1, 0)], efficiencies[min(i + 1, resolution - 1)]
+            n_lo, n_hi = notionals[max(j - 1, 0)], notionals[min(j + 1, resolution - 1)]
+        
+        return best[1], best[2]
+
+
+class CSRAdjacency:
+    """
+    Gapped CSR adjacency over integer node ids.
+    
+    Row u is indices[start[u] : start[u] + degree[u]] with capacity[u]
+    slots reserved, so inserting an edge is O(degree) unless the row is
+    full, in which case only that row moves to the end of the buffer
+    (doubling its capacity). The buffer is compacted once more than half of
+    it is dead space. Neighbor order is insertion order.
+    """
+    
+    def __init__(self, num_nodes: int = 0):
+        self.start = np.zeros(num_nodes, dtype=np.int64)
+        self.degree = np.zeros(num_nodes, dtype=np.int64)
+        self.capacity = np.zeros(num_nodes, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.used = 0
+    
+    @classmethod
+    def from_edges(cls, num_nodes: int, src: np.ndarray, dst: np.ndarray) -> 'CSRAdjacency':
+        """Bulk build (edges of each row keep their input order)"""
+        adjacency = cls(num_nodes)
+        order = np.argsort(src, kind='stable')
+        counts = np.bincount(src, minlength=num_nodes).astype(np.int64)
+        adjacency.start[1:] = np.cumsum(counts)[:-1]
+        adjacency.degree[:] = counts
+        adjacency.capacity[:] = counts
+        adjacency.indices = dst[order].astype(np.int32)
+        adjacency.used = len(src)
+        return adjacency
+    
+    @property
+    def num_edges(self) -> int:
+        return int(self.degree.sum())
+    
+    def row(self, u: int) -> np.ndarray:
+        start = self.start[u]
+        return self.indices[start:start + self.degree[u]]
+    
+    def gather(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """All edges leaving `nodes` as (src, dst) arrays, rows in node order"""
+        degree = self.degree[nodes]
+        total = int(degree.sum())
+        row_offsets = np.repeat(self.start[nodes] - (np.cumsum(degree) - degree), degree)
+        return np.repeat(nodes, degree), self.indices[row_offsets + np.arange(total)]
+    
+    def add_node(self):
+        self.start = np.append(self.start, self.used)
+        self.degree = np.append(self.degree, 0)
+        self.capacity = np.append(self.capacity, 0)
+    
+    def insert(self, u: int, v: int) -> bool:
+        """Append v to row u (False if already present)"""
+        if v in self.row(u):
+            return False
+        if self.degree[u] == self.capacity[u]:
+            self._relocate(u, max(4, 2 * int(self.capacity[u])))
+        self.indices[self.start[u] + self.degree[u]] = v
+        self.degree[u] += 1
+        return True
+    
+    def delete(self, u: int, v: int) -> bool:
+        """Remove v from row u, keeping the order of the rest"""
+        row = self.row(u)
+        hits = np.flatnonzero(row == v)
+        if len(hits) == 0:
+            return False
+        row[hits[0]:-1] = row[hits[0] + 1:].copy()
+        self.degree[u] -= 1
+        return True
+    
+    def _relocate(self, u: int, capacity: int):
+        if self.used + capacity > len(self.indices):
+            if self.used - self.num_edges > self.used // 2:
+                self._compact()
+            if self.used + capacity > len(self.indices):
+                grown = np.zeros(max(2 * len(self.indices), self.used + capacity), dtype=np.int32)
+                grown[:self.used] = self.indices[:self.used]
+                self.indices = grown
+        
+        start = self.used
+        self.indices[start:start + self.degree[u]] = self.row(u)
+        self.start[u] = start
+        self.capacity[u] = capacity
+        self.used += capacity
+    
+    def _compact(self):
+        """Rewrite rows back to back, keeping each row's capacity"""
+        indices = np.zeros(len(self.indices), dtype=np.int32)
+        position = 0
+        for u in range(len(self.start)):
+            indices[position:position + self.degree[u]] = self.row(u)
+            self.start[u] = position
+            position += self.capacity[u]
+        self.indices = indices
+        self.used = position
+
+
+class DexGraph:
+    """
+    DEX network as integer node ids, attribute arrays and CSR adjacency.
+    
+    Nodes can be venues or venue/asset pairs (e.g. 'GMX:BTC'); names are
+    only used at the API boundary. Forward and reverse adjacency are both
+    kept so paths can be searched from either end.
+    """
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.efficiency = np.zeros(0, dtype=np.float64)
+        self.notional_capacity = np.zeros(0, dtype=np.int64)
+        self.funding_rate = np.zeros(0, dtype=np.float64)
+        self.out_edges = CSRAdjacency()
+        self.in_edges = CSRAdjacency()
+    
+    @classmethod
+    def from_network(cls, dex_network: Dict[str, Dict]) -> 'DexGraph':
+        """
+        Build from a dex_network-style mapping.
+        
+        Args:
+            dex_network: name -> {efficiency, notional_capacity,
+                funding_rate, connections}; connections to unknown DEXes
+                are skipped
+        """
+        graph = cls()
+        graph.names = list(dex_network)
+        graph.ids = {name: i for i, name in enumerate(graph.names)}
+        dexes = list(dex_network.values())
+        graph.efficiency = np.array([dex['efficiency'] for dex in dexes], dtype=np.float64)
+        graph.notional_capacity = np.array([dex['notional_capacity'] for dex in dexes], dtype=np.int64)
+        graph.funding_rate = np.array([dex['funding_rate'] for dex in dexes], dtype=np.float64)
+        
+        edges = dict.fromkeys(
+            (u, graph.ids[neighbor])
+            for u, dex in enumerate(dexes)
+            for neighbor in dex.get('connections', [])
+            if neighbor in graph.ids and graph.ids[neighbor] != u
+        )
+        skipped = sum(neighbor not in graph.ids for dex in dexes for neighbor in dex.get('connections', []))
+        if skipped:
+            logger.warning(f"Skipped {skipped} connections to unknown DEXes")
+        
+        edge_array = np.array(list(edges), dtype=np.int64).reshape(-1, 2)
+        graph.out_edges = CSRAdjacency.from_edges(len(dexes), edge_array[:, 0], edge_array[:, 1])
+        graph.in_edges = CSRAdjacency.from_edges(len(dexes), edge_array[:, 1], edge_array[:, 0])
+        return graph
+    
+    @classmethod
+    def from_config(cls, path: str) -> 'DexGraph':
+        """
+        Load a JSON topology config.
+        
+        Format: {"dexes": {name: {"efficiency", "notional_capacity",
+        "funding_rate", "connections": [names]}}} (the top-level "dexes"
+        wrapper is optional).
+        """
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls.from_network(config.get('dexes', config))
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def to_network(self) -> Dict[str, Dict]:
+        """dex_network-style snapshot (a copy; edits do not flow back)"""
+        return {
+            name: {
+                'efficiency': float(self.efficiency[i]),
+                'notional_capacity': int(self.notional_capacity[i]),
+                'funding_rate': float(self.funding_rate[i]),
+                'connections': [self.names[v] for v in self.out_edges.row(i).tolist()],
+            }
+            for i, name in enumerate(self.names)
+        }
+    
+    def entry_costs(self) -> np.ndarray:
+        """Cost of entering each DEX (2 - efficiency, strictly positive)"""
+        return 2.0 - self.efficiency
+    
+    def add_node(self, name: str, efficiency: float, notional_capacity: int,
+                 funding_rate: float) -> int:
+        if name in self.ids:
+            raise ValueError(f"DEX {name} already exists")
+        
+        node = len(self.names)
+        self.names.append(name)
+        self.ids[name] = node
+        self.efficiency = np.append(self.efficiency, efficiency)
+        self.notional_capacity = np.append(self.notional_capacity, int(notional_capacity))
+        self.funding_rate = np.append(self.funding_rate, funding_rate)
+        self.out_edges.add_node()
+        self.in_edges.add_node()
+        return node
+    
+    def has_edge(self, u: int, v: int) -> bool:
+        return bool(v in self.out_edges.row(u))
+    
+    def add_edge(self, u: int, v: int) -> bool:
+        if u == v or not self.out_edges.insert(u, v):
+            return False
+        self.in_edges.insert(v, u)
+        return True
+    
+    def remove_edge(self, u: int, v: int) -> bool:
+        if not self.out_edges.delete(u, v):
+            return False
+        self.in_edges.delete(v, u)
+        return True
+
+
+class PathIndex:
+    """
+    k-best simple path table over a DexGraph.
+    
+    Entering a DEX costs 2 - efficiency, so paths rank by hop count first
+    and venue efficiency second. The k cheapest simple paths of each
+    (start, end) pair of node ids are found with Yen's algorithm on first
+    request and kept until a topology change can affect them:
+    
+    - removing an edge or raising a DEX's entry cost drops pairs whose
+      paths use it
+    - adding an edge (u, v) or lowering v's entry cost drops pairs (s, t)
+      that can reach it within the hop limit and either hold fewer than k
+      paths or whose worst path costs more than d(s, u) + w(u, v) + d(v, t),
+      the cheapest any path through the edge can be
+    """
+    
+    def __init__(self, graph: DexGraph, k: int = PATH_INDEX_K,
+                 max_hops: int = MAX_ROUTE_HOPS):
+        self.graph = graph
+        self.k = k
+        self.max_hops = max_hops
+        self.version = 0
+        self.rebuild()
+    
+    def rebuild(self):
+        """Drop every cached pair"""
+        # (start, end) -> (paths, costs), both in ascending cost order
+        self._pairs: Dict[Tuple[int, int], Tuple[List[Tuple[int, ...]], List[float]]] = {}
+        self.version += 1
+    
+    def __len__(self) -> int:
+        return len(self._pairs)
+    
+    def paths(self, s: int, t: int) -> List[Tuple[int, ...]]:
+        """
+        k best simple paths from node s to node t.
+        
+        Returns:
+            Node id paths in ascending cost order (empty if unreachable)
+        """
+        entry = self._pairs.get((s, t))
+        if entry is None:
+            entry = self._pairs[(s, t)] = self._k_shortest_paths(s, t)
+        return entry[0]
+    
+    def precompute(self):
+        """Fill the table for every (start, end) pair"""
+        for s in range(len(self.graph)):
+            for t in range(len(self.graph)):
+                if (s, t) not in self._pairs:
+                    self._pairs[(s, t)] = self._k_shortest_paths(s, t)
+    
+    def node_added(self):
+        """An unconnected DEX was added (no cached pair can change)"""
+        self.version += 1
+    
+    def edge_added(self, u: int, v: int):
+        self._invalidate_shortcut(u, v)
+        self.version += 1
+    
+    def edge_removed(self, u: int, v: int):
+        self._invalidate_paths(lambda path: any(a == u and b == v for a, b in zip(path, path[1:])))
+        self.version += 1
+    
+    def node_reweighted(self, v: int, old_cost: float, new_cost: float):
+        """Entry cost of v changed (its efficiency was updated)"""
+        if new_cost != old_cost:
+            self._invalidate_paths(lambda path: v in path[1:])
+            if new_cost < old_cost:
+                for u in self.graph.in_edges.row(v).tolist():
+                    self._invalidate_shortcut(u, v)
+        self.version += 1
+    
+    def _invalidate_paths(self, uses):
+        stale = [pair for pair, (paths, _) in self._pairs.items() if any(map(uses, paths))]
+        for pair in stale:
+            del self._pairs[pair]
+    
+    def _invalidate_shortcut(self, u: int, v: int):
+        max_edges = self.max_hops - 1
+        hops_to_u = self._hops(u, self.graph.in_edges, max_edges - 1)
+        hops_from_v = self._hops(v, self.graph.out_edges, max_edges - 1)
+        reachable = [pair for pair in self._pairs
+                     if hops_to_u[pair[0]] + 1 + hops_from_v[pair[1]] <= max_edges]
+        if not reachable:
+            return
+        
+        to_u = self._distances(u, forward=False, limit=max_edges - 1)
+        from_v = self._distances(v, forward=True, limit=max_edges - 1)
+        weight = self.graph.entry_costs()[v]
+        
+        stale = []
+        for s, t in reachable:
+            paths, costs = self._pairs[(s, t)]
+            if len(paths) < self.k or costs[-1] > to_u[s] + weight + from_v[t]:
+                stale.append((s, t))
+        for pair in stale:
+            del self._pairs[pair]
+    
+    def _hops(self, source: int, adjacency: CSRAdjacency, limit: int) -> np.ndarray:
+        """BFS hop counts from source up to limit (limit + 1 = beyond)"""
+        hops = np.full(len(self.graph), limit + 1, dtype=np.int64)
+        hops[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        for h in range(1, limit + 1):
+            _, reached = adjacency.gather(frontier)
+            frontier = np.unique(reached[hops[reached] > limit])
+            if len(frontier) == 0:
+                break
+            hops[frontier] = h
+        return hops
+    
+    def _distances(self, source: int, forward: bool, limit: int) -> np.ndarray:
+        """
+        Cheapest cost from source (forward) or to source (reverse) using at
+        most limit edges, by frontier-only Bellman-Ford.
+        
+        Edge u → v costs v's entry cost in both directions. The hop bound
+        only raises distances, so they remain lower bounds for any path
+        that fits within max_hops.
+        """
+        costs = self.graph.entry_costs()
+        adjacency = self.graph.out_edges if forward else self.graph.in_edges
+        dist = np.full(len(self.graph), np.inf)
+        dist[source] = 0.0
+        frontier = np.array([source], dtype=np.int64)
+        for _ in range(limit):
+            src, dst = adjacency.gather(frontier)
+            cost = dist[src] + (costs[dst] if forward else costs[src])
+            improved = cost < dist[dst]
+            if not improved.any():
+                break
+            np.minimum.at(dist, dst[improved], cost[improved])
+            frontier = np.unique(dst[improved])
+        return dist
+    
+    def _shortest_path(self, source: int, target: int, max_edges: int,
+                       banned_nodes: np.ndarray, banned_edges: set,
+                       hops_to_target: np.ndarray) -> Optional[Tuple[float, List[int]]]:
+        """
+        Cheapest path using at most max_edges edges (layered relaxation).
+        
+        Each layer relaxes every edge out of the previous frontier in one
+        vectorized pass. A node reached with more edges and no lower cost
+        than an earlier layer is dropped, which keeps every surviving path
+        simple. Nodes that cannot reach the target in the remaining hops
+        are skipped.
+        """
+        n = len(self.graph)
+        costs = self.graph.entry_costs()
+        best = np.full(n, np.inf)
+        best[source] = 0.0
+        
+        layer_cost = np.full(n, np.inf)
+        layer_cost[source] = 0.0
+        layers = [(layer_cost, np.full(n, -1, dtype=np.int64))]
+        frontier = np.array([source], dtype=np.int64)
+        
+        for h in range(max_edges):
+            src, dst = self.graph.out_edges.gather(frontier)
+            cost = layers[-1][0][src] + costs[dst]
+            keep = (hops_to_target[dst] <= max_edges - h - 1) & ~banned_nodes[dst] & (cost < best[dst])
+            if banned_edges:
+                keep &= ~np.isin(src * n + dst, list(banned_edges))
+            src, dst, cost = src[keep], dst[keep], cost[keep]
+            if len(dst) == 0:
+                break
+            
+            # Cheapest edge into each node (first in row order on ties)
+            order = np.lexsort((cost, dst))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = dst[order][1:] != dst[order][:-1]
+            chosen = order[first]
+            
+            layer_cost = np.full(n, np.inf)
+            layer_pred = np.full(n, -1, dtype=np.int64)
+            layer_cost[dst[chosen]] = cost[chosen]
+            layer_pred[dst[chosen]] = src[chosen]
+            layers.append((layer_cost, layer_pred))
+            
+            frontier = dst[chosen]
+            best[frontier] = cost[chosen]
+        
+        found = [(reached[target], h) for h, (reached, _) in enumerate(layers)
+                 if reached[target] < np.inf]
+        if not found:
+            return None
+        
+        cost, h = min(found)
+        path = [target]
+        while h > 0:
+            path.append(int(layers[h][1][path[-1]]))
+            h -= 1
+        return float(cost), path[::-1]
+    
+    def _k_shortest_paths(self, s: int, t: int) -> Tuple[List[Tuple[int, ...]], List[float]]:
+        """Yen's algorithm, bounded to max_hops nodes per path"""
+        max_edges = self.max_hops - 1
+        costs = self.graph.entry_costs()
+        hops_to_t = self._hops(t, self.graph.in_edges, max_edges)
+        no_nodes = np.zeros(len(self.graph), dtype=bool)
+        
+        first = self._shortest_path(s, t, max_edges, no_nodes, set(), hops_to_t)
+        if first is None:
+            return [], []
+        
+        paths = [tuple(first[1])]
+        path_costs = [first[0]]
+        candidates = []
+        seen = {paths[0]}
+        n = len(self.graph)
+        
+        while len(paths) < self.k:
+            last = paths[-1]
+            for i in range(len(last) - 1):
+                root = last[:i + 1]
+                banned_edges = {path[i] * n + path[i + 1] for path in paths
+                                if len(path) > i + 1 and path[:i + 1] == root}
+                banned_nodes = no_nodes.copy()
+                banned_nodes[list(root[:-1])] = True
+                spur = self._shortest_path(last[i], t, max_edges - i,
+                                           banned_nodes, banned_edges, hops_to_t)
+                if spur is None:
+                    continue
+                
+                path = root[:-1] + tuple(spur[1])
+                if path not in seen:
+                    root_cost = float(sum(costs[list(root[1:])])) if i else 0.0
+                    seen.add(path)
+                    heapq.heappush(candidates, (root_cost + spur[0], path))
+            
+            if not candidates:
+                break
+            cost, path = heapq.heappop(candidates)
+            paths.append(path)
+            path_costs.append(cost)
+        
+        return paths, path_costs
+
+
+class RouteCache:
+    """
+    LRU cache of scored routes with a time-to-live.
+    
+    Keys are (start, end, trade-size bucket, route_type, topology version),
+    so any topology or DEX parameter change makes older entries unreachable;
+    they age out through LRU eviction or the TTL.
+    """
+    
+    def __init__(self, max_size: int = ROUTE_CACHE_SIZE, ttl_seconds: float = ROUTE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Tuple, Tuple[float, Optional[Dict]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Tuple) -> Tuple[bool, Optional[Dict]]:
+        """Return (found, route) for key"""
+        with self._lock:
+            entry = self._entries.get(key)
+            
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                
+                del self._entries[key]
+                self.expirations += 1
+            
+            self.misses += 1
+            return False, None
+    
+    def put(self, key: Tuple, route: Optional[Dict]):
+        """Store route for key, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, route)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0
+        }
 
 
 class TopologyRouter:
@@ -126,42 +774,87 @@ class TopologyRouter:
     Network topology router for cross-DEX swap optimization.
     
     Implements the FRY v3 network topology with:
-    - DEX nodes (dYdX, Aster, Hyperliquid, GMX)
+    - DEX nodes (dYdX, Aster, Hyperliquid, GMX), or any topology loaded
+      from a config file
     - Trade routes (efficiency-optimized, funding-optimized)
     - Minting surface integration
+    
+    The network lives in a DexGraph (integer ids, attribute arrays, CSR
+    adjacency); path search, scoring and feature extraction run on ids.
     """
     
-    def __init__(self):
-        # DEX network from visualization
-        self.dex_network = {
-            'dYdX': {
-                'efficiency': 0.16,
-                'notional_capacity': 50000,  # $50K capacity
-                'funding_rate': -0.0015,
-                'connections': ['Aster', 'Hyperliquid']
-            },
-            'Aster': {
-                'efficiency': 0.12,
-                'notional_capacity': 30000,
-                'funding_rate': -0.0012,
-                'connections': ['dYdX', 'Hyperliquid']
-            },
-            'Hyperliquid': {
-                'efficiency': 0.25,  # Central hub
-                'notional_capacity': 80000,
-                'funding_rate': 0.0018,
-                'connections': ['dYdX', 'Aster', 'GMX']
-            },
-            'GMX': {
-                'efficiency': 0.40,  # Highest efficiency
-                'notional_capacity': 40000,
-                'funding_rate': 0.0020,
-                'connections': ['Hyperliquid']
-            }
-        }
+    def __init__(self, config_path: Optional[str] = None):
+        """
+        Args:
+            config_path: JSON topology config (see DexGraph.from_config);
+                defaults to the FRY v3 DEX network
+        """
+        if config_path:
+            self.graph = DexGraph.from_config(config_path)
+        else:
+            self.graph = DexGraph.from_network(DEFAULT_DEX_NETWORK)
         
         self.minting_surface = MintingSurface()
-        self.route_cache = {}
+        self.route_cache = RouteCache()
+        self.route_bucket_usd = ROUTE_CACHE_BUCKET_USD
+        self.path_index = PathIndex(self.graph)
+    
+    @property
+    def topology_version(self) -> int:
+        return self.path_index.version
+    
+    @property
+    def dex_network(self) -> Dict[str, Dict]:
+        """Snapshot of the network as name -> parameters (edits do not flow back)"""
+        return self.graph.to_network()
+    
+    @dex_network.setter
+    def dex_network(self, dex_network: Dict[str, Dict]):
+        self.graph = DexGraph.from_network(dex_network)
+        self.path_index.graph = self.graph
+        self.path_index.rebuild()
+    
+    def add_dex(self, name: str, efficiency: float, notional_capacity: int,
+                funding_rate: float, connections: List[str] = None):
+        """Add a DEX node and its outgoing connections"""
+        self.graph.add_node(name, efficiency, notional_capacity, funding_rate)
+        self.path_index.node_added()
+        for neighbor in connections or []:
+            self.connect(name, neighbor)
+    
+    def connect(self, from_dex: str, to_dex: str):
+        """Add a one-way connection (call twice for a two-way link)"""
+        u, v = self.graph.ids[from_dex], self.graph.ids[to_dex]
+        if self.graph.add_edge(u, v):
+            self.path_index.edge_added(u, v)
+    
+    def disconnect(self, from_dex: str, to_dex: str):
+        """Remove a one-way connection"""
+        u, v = self.graph.ids[from_dex], self.graph.ids[to_dex]
+        if self.graph.remove_edge(u, v):
+            self.path_index.edge_removed(u, v)
+    
+    def update_dex(self, name: str, **params):
+        """
+        Update DEX parameters (efficiency, notional_capacity, funding_rate).
+        
+        Use connect/disconnect to change connections.
+        """
+        if 'connections' in params:
+            raise ValueError("Use connect/disconnect to change connections")
+        unknown = set(params) - {'efficiency', 'notional_capacity', 'funding_rate'}
+        if unknown:
+            raise ValueError(f"Unknown DEX parameters: {sorted(unknown)}")
+        
+        node = self.graph.ids[name]
+        old_cost = self.graph.entry_costs()[node]
+        for param, value in params.items():
+            getattr(self.graph, param)[node] = value
+        self.path_index.node_reweighted(node, old_cost, self.graph.entry_costs()[node])
+    
+    def refresh_topology(self):
+        """Drop every cached path (full index rebuild)"""
+        self.path_index.rebuild()
         
     def calculate_route_score(self, path: List[str], trade_size: float) -> Dict:
         """
@@ -174,28 +867,29 @@ class TopologyRouter:
         Returns:
             Route score with FRY minting estimate
         """
+        return self._score_path([self.graph.ids[dex_name] for dex_name in path], trade_size)
+    
+    def _score_path(self, nodes: List[int], trade_size: float) -> Dict:
+        """calculate_route_score on node ids"""
         total_gradient = 0.0
         total_fry = 0.0
         route_efficiency = 1.0
         
+        # Allocate trade size proportionally
+        hop_size = trade_size / len(nodes)
+        swap_notional = hop_size / 10000  # Convert to $10K units
+        
+        # Minting gradients for every hop in one surface evaluation
+        efficiencies = self.graph.efficiency[nodes]
+        gradients = self.minting_surface.calculate_gradient(efficiencies, swap_notional).tolist()
+        capacities = self.graph.notional_capacity[nodes].tolist()
+        
         # Calculate per-hop metrics
-        for i, dex_name in enumerate(path):
-            dex = self.dex_network[dex_name]
-            
-            # Allocate trade size proportionally
-            hop_size = trade_size / len(path)
-            swap_notional = hop_size / 10000  # Convert to $10K units
-            
-            # Calculate minting gradient at this point
-            gradient = self.minting_surface.calculate_gradient(
-                dex['efficiency'],
-                swap_notional
-            )
-            
+        for efficiency, capacity, gradient in zip(efficiencies.tolist(), capacities, gradients):
             # Number theory optimization
             nt_bonus = self._calculate_number_theory_bonus(
                 int(hop_size),
-                dex['notional_capacity']
+                capacity
             )
             
             # FRY minting for this hop
@@ -203,12 +897,12 @@ class TopologyRouter:
             
             total_gradient += gradient
             total_fry += hop_fry
-            route_efficiency *= dex['efficiency']
+            route_efficiency *= efficiency
         
         return {
-            'path': path,
+            'path': [self.graph.names[node] for node in nodes],
             'total_gradient': total_gradient,
-            'avg_gradient': total_gradient / len(path),
+            'avg_gradient': total_gradient / len(nodes),
             'total_fry': total_fry,
             'route_efficiency': route_efficiency,
             'fry_per_dollar': total_fry / trade_size
@@ -224,9 +918,9 @@ class TopologyRouter:
         optimal_size = gcd(trade_size, capacity)
         gcd_bonus = optimal_size / min(trade_size, capacity)
         
-        # Prime factorization alignment
-        trade_primes = set(prime_factorize(trade_size))
-        capacity_primes = set(prime_factorize(capacity))
+        # Prime factorization alignment (capacities are pinned in the shared cache)
+        trade_primes = factor_set(trade_size)
+        capacity_primes = factor_set(capacity, pin=True)
         prime_overlap = len(trade_primes & capacity_primes) / max(len(trade_primes), 1)
         
         # Combined bonus (10-30% improvement)
@@ -237,7 +931,14 @@ class TopologyRouter:
     def find_optimal_route(self, start_dex: str, end_dex: str, 
                           trade_size: float, route_type: str = 'efficiency') -> Dict:
         """
-        Find optimal route through DEX network.
+        Find the best route among the path index's candidates.
+        
+        Only the path_index.k (PATH_INDEX_K) cheapest paths by the
+        2 - efficiency entry cost proxy are scored, so the result is the
+        best of those k candidates, not necessarily of every path: on the
+        default network it agrees with the exhaustive search for most
+        queries and stays within a few percent of its FRY/$. A larger k
+        (or scoring _find_all_paths) gives the exhaustive answer.
         
         Args:
             start_dex: Starting DEX
@@ -246,10 +947,14 @@ class TopologyRouter:
             route_type: 'efficiency' or 'funding'
         
         Returns:
-            Optimal route with minting estimates
+            Best candidate route with minting estimates
         """
-        # BFS to find all paths
-        all_paths = self._find_all_paths(start_dex, end_dex)
+        s, t = self.graph.ids.get(start_dex), self.graph.ids.get(end_dex)
+        if s is None or t is None:
+            return None
+        
+        # k best candidate paths from the index
+        all_paths = self.path_index.paths(s, t)
         
         if not all_paths:
             return None
@@ -257,7 +962,7 @@ class TopologyRouter:
         # Score each path
         scored_routes = []
         for path in all_paths:
-            score = self.calculate_route_score(path, trade_size)
+            score = self._score_path(list(path), trade_size)
             scored_routes.append(score)
         
         # Select best route based on type
@@ -270,9 +975,142 @@ class TopologyRouter:
         
         return best_route
     
+    def quote_route(self, start_dex: str, end_dex: str,
+                    trade_size: float, route_type: str = 'efficiency') -> Dict:
+        """
+        Cached find_optimal_route.
+        
+        The trade size is rounded to `route_bucket_usd` and the route is
+        scored for the rounded size, so every request in a bucket gets the
+        same answer. Entries live for the cache TTL or until the topology
+        version changes. Returned routes are shared between callers and must
+        not be mutated.
+        
+        Returns:
+            Optimal route for the bucketed size (None if unreachable)
+        """
+        bucket = max(round(trade_size / self.route_bucket_usd), 1)
+        key = (start_dex, end_dex, bucket, route_type, self.topology_version)
+        
+        found, route = self.route_cache.get(key)
+        if not found:
+            route = self.find_optimal_route(start_dex, end_dex,
+                                            bucket * self.route_bucket_usd, route_type)
+            self.route_cache.put(key, route)
+        
+        return route
+    
+    def score_routes_robust(self, start_dex: str, end_dex: str, trade_size: float,
+                            num_scenarios: int = SCENARIO_COUNT,
+                            tail_quantile: float = TAIL_QUANTILE,
+                            latency_budget_ms: Optional[float] = SCENARIO_LATENCY_BUDGET_MS,
+                            funding_std: float = FUNDING_NOISE_STD,
+                            efficiency_std: float = EFFICIENCY_NOISE_STD,
+                            seed: Optional[int] = SCENARIO_SEED) -> List[Dict]:
+        """
+        Score the candidate paths across sampled funding/efficiency scenarios.
+        
+        Each scenario perturbs every DEX's funding rate and efficiency on the
+        candidate paths (see funding_scenarios) and re-scores all paths in
+        one vectorized pass. Hop FRY is charged for the DEX's funding
+        exposure, so unlike total_fry the scenario FRY depends on funding.
+        
+        Args:
+            start_dex: Starting DEX
+            end_dex: Ending DEX
+            trade_size: Trade size in USD
+            num_scenarios: Scenarios to draw when the latency budget allows
+            tail_quantile: Lower FRY quantile reported as tail risk
+            latency_budget_ms: Budget for the whole call; scenarios are drawn
+                until it would be overrun (None = unbounded, and reproducible
+                for a fixed seed)
+            funding_std: Funding rate noise (absolute)
+            efficiency_std: Efficiency noise (relative)
+            seed: RNG seed (None for fresh entropy)
+        
+        Returns:
+            Route scores with 'expected_fry', 'fry_std', 'tail_fry' and
+            their per-dollar values, best tail first (empty if unreachable)
+        """
+        start = time.perf_counter()
+        s, t = self.graph.ids.get(start_dex), self.graph.ids.get(end_dex)
+        if s is None or t is None:
+            return []
+        
+        paths = self.path_index.paths(s, t)
+        if not paths:
+            return []
+        
+        routes = [self._score_path(list(path), trade_size) for path in paths]
+        
+        # Paths as padded slots into the distinct DEXes they visit
+        nodes = np.unique(np.fromiter(chain.from_iterable(paths), dtype=np.int64))
+        lengths = np.array([len(path) for path in paths])
+        slots = np.zeros((len(paths), lengths.max()), dtype=np.int64)
+        hop_base = np.zeros(slots.shape)
+        
+        hop_sizes = trade_size / lengths
+        capacities = self.graph.notional_capacity
+        for i, path in enumerate(paths):
+            slots[i, :len(path)] = np.searchsorted(nodes, path)
+            hop_base[i, :len(path)] = [
+                self._calculate_number_theory_bonus(int(hop_sizes[i]), int(capacities[node]))
+                for node in path
+            ]
+        
+        # Scenario-independent part of hop FRY (zero on padding)
+        hop_base *= (hop_sizes * self.minting_surface.base_minting_rate)[:, None]
+        swap_notional = (hop_sizes / 10000)[:, None]
+        
+        def score_chunk(funding: np.ndarray, efficiency: np.ndarray) -> np.ndarray:
+            efficiency = np.minimum(efficiency, 1.0)[:, slots]
+            gradients = self.minting_surface.calculate_gradient(efficiency, swap_notional)
+            return ((1 + gradients) * funding_drag(funding[:, slots]) * hop_base).sum(axis=2)
+        
+        scores = monte_carlo_fry(
+            score_chunk, self.graph.funding_rate[nodes], self.graph.efficiency[nodes],
+            num_scenarios, tail_quantile, latency_budget_ms,
+            funding_std, efficiency_std, seed, start_time=start
+        )
+        
+        for route, expected, std, tail in zip(routes, scores['expected'].tolist(),
+                                              scores['std'].tolist(), scores['tail'].tolist()):
+            route.update({
+                'expected_fry': expected,
+                'fry_std': std,
+                'tail_fry': tail,
+                'expected_fry_per_dollar': expected / trade_size,
+                'tail_fry_per_dollar': tail / trade_size,
+                'scenarios': scores['scenarios']
+            })
+        
+        routes.sort(key=lambda x: x['tail_fry'], reverse=True)
+        return routes
+    
+    def find_robust_route(self, start_dex: str, end_dex: str, trade_size: float,
+                          objective: str = 'tail', **scenario_params) -> Optional[Dict]:
+        """
+        Best route under funding/efficiency noise (see score_routes_robust).
+        
+        Args:
+            objective: 'tail' (maximize the tail FRY quantile) or 'expected'
+            **scenario_params: Passed through to score_routes_robust
+        
+        Returns:
+            Robust route score (None if unreachable)
+        """
+        if objective not in ('tail', 'expected'):
+            raise ValueError(f"Unknown objective '{objective}' (expected 'tail' or 'expected')")
+        
+        routes = self.score_routes_robust(start_dex, end_dex, trade_size, **scenario_params)
+        if not routes:
+            return None
+        
+        return max(routes, key=lambda x: x[f'{objective}_fry'])
+    
     def _find_all_paths(self, start: str, end: str, 
-                       path: List[str] = None, max_hops: int = 4) -> List[List[str]]:
-        """Find all paths between two DEXes (BFS with max hops)"""
+                       path: List[str] = None, max_hops: int = MAX_ROUTE_HOPS) -> List[List[str]]:
+        """Find all paths between two DEXes (exhaustive DFS with max hops)"""
         if path is None:
             path = []
         
@@ -284,11 +1122,12 @@ class TopologyRouter:
         if len(path) >= max_hops:
             return []
         
-        if start not in self.dex_network:
+        if start not in self.graph.ids:
             return []
         
         paths = []
-        for node in self.dex_network[start]['connections']:
+        for node in self.graph.out_edges.row(self.graph.ids[start]).tolist():
+            node = self.graph.names[node]
             if node not in path:  # Avoid cycles
                 newpaths = self._find_all_paths(node, end, path, max_hops)
                 paths.extend(newpaths)
@@ -304,20 +1143,86 @@ class TopologyRouter:
         if not route:
             return np.zeros(10)
         
+        nodes = [self.graph.ids[dex] for dex in route['path']]
+        efficiencies = self.graph.efficiency[nodes]
+        
         features = [
             route['total_gradient'],
             route['avg_gradient'],
             route['route_efficiency'],
             route['fry_per_dollar'],
             len(route['path']),  # Path length
-            np.mean([self.dex_network[dex]['efficiency'] for dex in route['path']]),
-            np.std([self.dex_network[dex]['efficiency'] for dex in route['path']]),
-            np.mean([abs(self.dex_network[dex]['funding_rate']) for dex in route['path']]),
+            np.mean(efficiencies),
+            np.std(efficiencies),
+            np.mean(np.abs(self.graph.funding_rate[nodes])),
             route['total_fry'] / 10000,  # Normalized FRY
             1.0 if 'GMX' in route['path'] else 0.0,  # GMX bonus (40% efficiency)
         ]
         
         return np.array(features, dtype=np.float32)
+    
+    def get_topology_features_batch(self, routes: List[Dict]) -> np.ndarray:
+        """
+        Topology features for many routes as one contiguous float32 matrix.
+        
+        Row i equals get_topology_features(routes[i]); empty routes give a
+        zero row. Per-path statistics are segment reductions of the graph's
+        attribute arrays over one flattened array of DEX ids, so no per-row
+        vectors are allocated.
+        
+        Returns:
+            (len(routes), NUM_TOPOLOGY_FEATURES) float32 array
+        """
+        features = np.zeros((len(routes), NUM_TOPOLOGY_FEATURES), dtype=np.float32)
+        rows = [i for i, route in enumerate(routes) if route]
+        if not rows:
+            return features
+        routes = [routes[i] for i in rows]
+        
+        scalars = np.fromiter(chain.from_iterable(map(_ROUTE_SCALARS, routes)),
+                              dtype=np.float64, count=5 * len(routes)).reshape(-1, 5)
+        paths = list(map(itemgetter('path'), routes))
+        dex_ids = np.fromiter(map(self.graph.ids.__getitem__, chain.from_iterable(paths)),
+                              dtype=np.int64)
+        lengths = np.fromiter(map(len, paths), dtype=np.int64, count=len(paths))
+        starts = np.concatenate(([0], np.cumsum(lengths[:-1])))
+        
+        eff = self.graph.efficiency[dex_ids]
+        eff_mean = np.add.reduceat(eff, starts) / lengths
+        deviation = eff - np.repeat(eff_mean, lengths)
+        
+        block = np.empty((len(routes), NUM_TOPOLOGY_FEATURES), dtype=np.float64)
+        block[:, :4] = scalars[:, :4]
+        block[:, 4] = lengths
+        block[:, 5] = eff_mean
+        block[:, 6] = np.sqrt(np.add.reduceat(deviation * deviation, starts) / lengths)
+        block[:, 7] = np.add.reduceat(np.abs(self.graph.funding_rate[dex_ids]), starts) / lengths
+        block[:, 8] = scalars[:, 4] / 10000
+        gmx = self.graph.ids.get('GMX', -1)
+        block[:, 9] = np.maximum.reduceat(dex_ids == gmx, starts)
+        
+        features[rows] = block
+        return features
+
+
+class RunningStats:
+    """Streaming count / mean / variance (Welford's algorithm)"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+    
+    @property
+    def variance(self) -> float:
+        """Population variance (0 before two samples)"""
+        return self._m2 / self.count if self.count > 1 else 0.0
 
 
 class TopologyAwareAgentB:
@@ -327,12 +1232,26 @@ class TopologyAwareAgentB:
     Integrates minting surface optimization with existing Agent B logic.
     """
     
-    def __init__(self):
+    def __init__(self, history_size: int = ROUTE_HISTORY_SIZE, spill_path: Optional[str] = None):
+        """
+        Args:
+            history_size: Recent routes kept in memory
+            spill_path: NDJSON file that receives routes pushed out of the
+                in-memory history (None drops them). Training data export
+                reads it back, so it covers every route; the file is
+                appended to, so a restarted client keeps its earlier history
+        """
         self.topology_router = TopologyRouter()
-        self.route_history = []
+        self.route_history = deque(maxlen=history_size)
+        self.spill_path = spill_path
+        self._spill_file = None
+        self.spilled_routes = 0
+        
+        self.gradient_stats = RunningStats()
         self.performance_metrics = {
             'total_routes': 0,
             'avg_gradient': 0.0,
+            'gradient_variance': 0.0,
             'total_fry_from_topology': 0.0,
         }
     
@@ -351,8 +1270,8 @@ class TopologyAwareAgentB:
         if preferred_dexes is None:
             preferred_dexes = ['dYdX', 'GMX']  # Default: low to high efficiency
         
-        # Find optimal route
-        route = self.topology_router.find_optimal_route(
+        # Find optimal route (cached across identical requests)
+        route = self.topology_router.quote_route(
             preferred_dexes[0],
             preferred_dexes[-1],
             trade_size,
@@ -360,12 +1279,7 @@ class TopologyAwareAgentB:
         )
         
         if route:
-            self.route_history.append(route)
-            self.performance_metrics['total_routes'] += 1
-            self.performance_metrics['total_fry_from_topology'] += route['total_fry']
-            self.performance_metrics['avg_gradient'] = np.mean([
-                r['avg_gradient'] for r in self.route_history
-            ])
+            self._record_route(route)
             
             logger.info(f"Topology route: {' → '.join(route['path'])} | "
                        f"FRY: {route['total_fry']:.2f} | "
@@ -373,21 +1287,63 @@ class TopologyAwareAgentB:
         
         return route
     
+    def _record_route(self, route: Dict):
+        """Append to history and update running metrics in O(1)"""
+        if len(self.route_history) == self.route_history.maxlen and self.spill_path:
+            self._spill(self.route_history[0])
+        self.route_history.append(route)
+        
+        self.gradient_stats.update(route['avg_gradient'])
+        self.performance_metrics['total_routes'] += 1
+        self.performance_metrics['total_fry_from_topology'] += route['total_fry']
+        self.performance_metrics['avg_gradient'] = self.gradient_stats.mean
+        self.performance_metrics['gradient_variance'] = self.gradient_stats.variance
+    
+    def _spill(self, route: Dict):
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a', encoding='utf-8')
+        self._spill_file.write(json.dumps(route, default=float) + '\n')
+        self.spilled_routes += 1
+    
+    def iter_route_history(self):
+        """Every recorded route, oldest first (spilled routes, then in-memory)"""
+        if self._spill_file is not None:
+            self._spill_file.flush()
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+        yield from list(self.route_history)
+    
+    def close(self):
+        """Close the spill file (history stays readable)"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+    
     def get_topology_training_data(self) -> List[Tuple[np.ndarray, float]]:
         """
         Generate training data for federated learning.
         
+        Covers the full route history, including routes spilled to disk.
+        
         Returns:
             List of (features, label) pairs where label is FRY minting efficiency
         """
-        training_data = []
-        
-        for route in self.route_history:
-            features = self.topology_router.get_topology_features(route)
-            label = route['fry_per_dollar']  # Target: FRY efficiency
-            training_data.append((features, label))
+        features, labels = self.get_topology_training_arrays()
+        return list(zip(features, labels.tolist()))
+    
+    def get_topology_training_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Training data as arrays for federated learning.
         
-        return training_data
+        Returns:
+            (features (n, NUM_TOPOLOGY_FEATURES) float32, FRY-per-dollar labels (n,))
+        """
+        routes = list(self.iter_route_history())
+        features = self.topology_router.get_topology_features_batch(routes)
+        labels = np.array([route['fry_per_dollar'] for route in routes], dtype=np.float64)
+        return features, labels
 
 
 if __name__ == "__main__":
@@ -20,8 +20,16 @@ Usage:
 import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import Dict, Tuple
+import os
 import random
+import sys
+
+try:
+    from number_theory_service import prime_factorize
+except ImportError:  # Run from visualization/: the shared service lives in core/engines
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from number_theory_service import prime_factorize
 
 plt.switch_backend('Agg')
 
@@ -39,20 +47,6 @@ RESET = "\033[0m"
 BOLD = "\033[1m"
 
 
-def prime_factorize(n: int) -> List[int]:
-    """Decompose notional into prime factors"""
-    factors = []
-    d = 2
-    while d * d <= n:
-        while n % d == 0:
-            factors.append(d)
-            n //= d
-        d += 1
-    if n > 1:
-        factors.append(n)
-    return factors
-
-
 def gcd(a: int, b: int) -> int:
     """Euclidean algorithm for GCD"""
     while b:
@@ -473,7 +473,7 @@ class FryboyClient(fl.client.NumPyClient):
             # Topology-specific metrics
             'topology_fry_bonus': self.local_metrics['topology_fry_bonus'],
             'avg_minting_gradient': self.local_metrics['avg_minting_gradient'],
-            'topology_routes_used': len(self.topology_agent.route_history),
+            'topology_routes_used': self.topology_agent.performance_metrics['total_routes'],
         }
         
         return metrics
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+FRY Wreckage Matching Test
+==========================
+
+Deterministic checks of the wreckage matching paths:
+1. Max-weight assignment vs brute force and vs the greedy fallback
+2. Partial-fill notional conservation (fills + residuals = collected)
+3. Settlement archive records round-trip (in memory and on disk)
+4. Incremental NDJSON export across engine restarts
+
+Run with core/engines/matching on the path:
+    PYTHONPATH=core/engines/matching python core/tests/test_fry_wreckage_matching.py
+"""
+
+import contextlib
+import io
+import itertools
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from fry_wreckage_matching_engine import (FRYWreckageMatchingEngine, WreckageEvent, EventTable,
+                                          PartialFillBook, SettlementArchive, max_weight_assignment)
+
+
+def make_event(dex, wreckage_type, asset, amount_usd, funding_exposure, timestamp=0.0):
+    """WreckageEvent with a fixed (not randomly drawn) funding exposure"""
+    event = WreckageEvent(dex, wreckage_type, asset, amount_usd, timestamp)
+    event.funding_exposure = funding_exposure
+    return event
+
+
+def random_events(count, seed, first_timestamp=0.0):
+    rng = np.random.default_rng(seed)
+    dexes = ["dYdX", "Hyperliquid", "Aster", "GMX", "Vertex"]
+    return [
+        make_event(dexes[i % 5], "funding_loss", ["BTC", "ETH"][i % 2],
+                   float(rng.uniform(100, 5000)), float(rng.uniform(-0.2, 0.2)), first_timestamp + i)
+        for i in range(count)
+    ]
+
+
+def quiet_engine(**kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return FRYWreckageMatchingEngine(**kwargs)
+
+
+def settle(events, **kwargs):
+    """Engine after collecting `events` and one match_wreckage call"""
+    mode = kwargs.pop('mode', None)
+    engine = quiet_engine(**kwargs)
+    for event in events:
+        engine.collect_wreckage(event)
+    engine.match_wreckage(mode)
+    return engine
+
+
+# Greedy takes the largest notional first and pairs it with its best
+# single partner, which strands the two small events on a poor hedge
+GREEDY_TRAP = [
+    ("dYdX", "short_liq", "BTC", 1000.0, 0.10),
+    ("Hyperliquid", "long_liq", "BTC", 1000.0, -0.05),
+    ("Aster", "long_liq", "BTC", 10.0, -0.10),
+    ("GMX", "short_liq", "BTC", 10.0, 0.05),
+]
+
+
+def test_max_weight_assignment_matches_brute_force():
+    """Hungarian assignment total equals the best of every permutation"""
+    rng = np.random.default_rng(7)
+    for n, m in [(1, 1), (2, 3), (3, 3), (4, 2), (5, 5)]:
+        weights = rng.uniform(0, 10, size=(n, m))
+        weights[rng.random((n, m)) < 0.3] = 0.0  # Missing edges
+
+        rows, cols = max_weight_assignment(weights)
+        assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+        assert (weights[rows, cols] > 0).all()
+
+        if n <= m:
+            best = max(sum(weights[i, j] for i, j in enumerate(perm))
+                       for perm in itertools.permutations(range(m), n))
+        else:
+            best = max(sum(weights[i, j] for j, i in enumerate(perm))
+                       for perm in itertools.permutations(range(n), m))
+        assert np.isclose(weights[rows, cols].sum(), best)
+
+
+def test_max_weight_beats_greedy():
+    """Exact max-weight mints at least as much FRY as greedy and first fit"""
+    events = lambda: [make_event(*fields) for fields in GREEDY_TRAP]
+    exact = settle(events(), mode="max_weight")
+    greedy = settle(events(), mode="max_weight", exact_limit=0)  # Every bucket side over the limit
+    first_fit = settle(events(), mode="first_fit")
+
+    assert exact.total_matched_pairs == 2
+    assert exact.total_fry_minted >= greedy.total_fry_minted
+    assert exact.total_fry_minted >= first_fit.total_fry_minted
+    # On this instance greedy pairs the two $1000 events and loses
+    assert exact.total_fry_minted > greedy.total_fry_minted * 1.2
+    assert set(exact.matched_pairs) == {(0, 2), (1, 3)}
+
+
+def test_partial_fill_book_residuals():
+    """Fills reduce remaining notional on both sides; leftovers rest in the book"""
+    table = EventTable()
+    book = PartialFillBook(table)
+    for event_id, fields in enumerate([
+        ("dYdX", "short_liq", "ETH", 300.0, 0.20),
+        ("Aster", "short_liq", "ETH", 200.0, 0.10),
+        ("GMX", "long_liq", "ETH", 450.0, -0.15),
+        ("dYdX", "long_liq", "ETH", 100.0, -0.05),
+    ]):
+        table.append(make_event(*fields), event_id)
+
+    assert book.fill(0) == [] and book.fill(1) == []
+    # Largest |funding| fills first: all of row 0, then 150 of row 1
+    assert book.fill(2) == [(0, 300.0), (1, 150.0)]
+    assert list(table.remaining_usd) == [0.0, 50.0, 0.0, 100.0]
+    # Row 3 (dYdX) can only fill against the Aster remainder
+    assert book.fill(3) == [(1, 50.0)]
+    assert list(table.remaining_usd) == [0.0, 0.0, 0.0, 50.0]
+    assert len(book) == 1
+
+
+def test_partial_fill_conserves_notional():
+    """Per event, filled notional plus minted residual equals the amount collected"""
+    events = random_events(200, seed=11)
+    engine = settle(events, mode="partial_fill")
+
+    settled = {}
+    for _, record in engine.archive.records():
+        if record['kind'] == 'pair':
+            for side in ('event1', 'event2'):
+                event_id = record[side]['event_id']
+                settled[event_id] = settled.get(event_id, 0.0) + record['notional']
+        else:
+            event_id = record['event']['event_id']
+            settled[event_id] = settled.get(event_id, 0.0) + record['notional']
+
+    assert sorted(settled) == list(range(len(events)))
+    for event in events:
+        assert np.isclose(settled[event.event_id], event.amount_usd)
+    assert np.isclose(sum(settled.values()), engine.total_wreckage_collected)
+    assert len(engine.events) == 0
+
+
+def test_archive_round_trip():
+    """Every settled event reads back with the fields it was collected with"""
+    events = [make_event(*fields, timestamp=float(i)) for i, fields in enumerate(GREEDY_TRAP + [
+        ("Vertex", "slippage", "SOL", 42.5, 0.0),
+        ("GMX", "adverse_fill", "ETH", 77.0, 0.03),
+    ])]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in (None, os.path.join(tmp, "archive.bin")):
+            engine = settle(events, archive_path=path)
+            records = [record for _, record in engine.archive.records()]
+
+            read_back = {}
+            for record in records:
+                for key in ('event1', 'event2', 'event'):
+                    if key in record:
+                        read_back[record[key]['event_id']] = record[key]
+            for event in events:
+                assert read_back[event.event_id] == {
+                    'event_id': event.event_id,
+                    'dex': event.dex,
+                    'type': event.wreckage_type,
+                    'asset': event.asset,
+                    'amount_usd': event.amount_usd,
+                    'timestamp': event.timestamp,
+                    'funding_exposure': event.funding_exposure,
+                }
+            assert engine.archive.records_written == len(records)
+            assert np.isclose(sum(record['fry_minted'] for record in records), engine.total_fry_minted)
+
+            # Resuming from any record offset yields the rest of the log
+            offsets = [offset for offset, _ in engine.archive.records()]
+            assert [record for _, record in engine.archive.records(offsets[1])] == records[2:]
+            engine.close()
+
+            if path is not None:
+                reopened = SettlementArchive(path)
+                assert reopened.records_written == len(records)
+                assert [record for _, record in reopened.records()] == records
+
+
+def exported_pairs(paths):
+    return [json.loads(line) for path in paths for line in open(path)]
+
+
+def export_quietly(engine, base_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine.export_matches(base_path)
+
+
+def test_export_resumes_across_restarts():
+    """Reopening the same archive file exports only what settled since the last run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_path = os.path.join(tmp, "archive.bin")
+        base_path = os.path.join(tmp, "matches")
+
+        engine = settle(random_events(300, seed=1), archive_path=archive_path)
+        first = export_quietly(engine, base_path)
+        engine.close()
+
+        # Restart on the same archive and settle more wreckage
+        engine = quiet_engine(archive_path=archive_path)
+        assert export_quietly(engine, base_path)['lines'] == 0
+        for event in random_events(300, seed=2, first_timestamp=300.0):
+            engine.collect_wreckage(event)
+        engine.match_wreckage()
+        second = export_quietly(engine, base_path)
+        engine.close()
+
+        assert first['archive_id'] == second['archive_id'] == engine.archive.archive_id
+        assert second['files'] == first['files']  # Appended to the same file
+        lines = exported_pairs(first['files'])
+        expected = [record for _, record in engine.archive.records() if record['kind'] == 'pair']
+        assert len(lines) == len(expected) == first['pairs'] + second['pairs']
+        assert [line['pair_id'] for line in lines] == list(range(len(lines)))
+        assert [(line['event1'], line['event2']) for line in lines] == \
+               [(record['event1'], record['event2']) for record in expected]
+
+
+def test_export_new_archive_starts_new_file():
+    """A checkpoint from another archive is never resumed against this one"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = os.path.join(tmp, "matches")
+        seen_files = []
+        for seed in range(3):  # Three fresh in-memory engines, one base path
+            engine = settle(random_events(600, seed=seed))
+            result = export_quietly(engine, base_path)
+            expected = sum(1 for _, record in engine.archive.records() if record['kind'] == 'pair')
+
+            assert result['pairs'] == expected > 0
+            assert len(exported_pairs(result['files'])) == expected
+            assert not set(result['files']) & set(seen_files)
+            seen_files.extend(result['files'])
+
+            with open(base_path + ".offset.json") as f:
+                assert json.load(f)['archive_id'] == engine.archive.archive_id
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print(f"\n🍟 {len(tests)} matching tests passed")
@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Liquidity Rails Test
+====================
+
+Deterministic checks of the liquidity rails engine:
+1. Batch routing vs per-event routing, for both split solvers
+2. Convex (water-filling) split cost vs the greedy split
+3. Reservations under concurrent threads, and rejected routes
+4. Incremental capital allocation vs a full recompute
+5. Binary snapshot round-trip, including a memory-mapped pool table
+6. Non-dominated Pareto frontier routes
+7. What-if overlays leave live state unchanged
+
+Run with core/engines/routing on the path:
+    PYTHONPATH=core/engines/routing python core/tests/test_liquidity_rails.py
+"""
+
+import itertools
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from liquidity_rails_engine import (SPLIT_SOLVERS, LiquidityPool, LiquidityRailsEngine, ReservationError,
+                                    water_fill_split)
+
+logging.getLogger('liquidity_rails_engine').setLevel(logging.ERROR)
+
+
+def rails_engine(extra_venues=4, seed=0):
+    """Default pools plus `extra_venues` random BTC/ETH/SOL venues"""
+    np.random.seed(seed)  # Default pools draw utilization from np.random
+    rng = np.random.default_rng(seed)
+    rails = LiquidityRailsEngine()
+    for v in range(extra_venues):
+        for asset in ("BTC", "ETH", "SOL"):
+            rails.add_pool(LiquidityPool(
+                venue=f"Venue{v}",
+                asset=asset,
+                depth_usd=float(rng.uniform(2_000_000, 40_000_000)),
+                spread_bps=float(rng.uniform(2.0, 5.0)),
+                funding_rate=float(rng.uniform(-0.002, 0.002)),
+                utilization=float(rng.uniform(0.3, 0.7))
+            ))
+    return rails
+
+
+def split_cost(depth, spread, fills, amount_usd):
+    """Total cost (bps of the amount) of a split, as _split_route prices it"""
+    used = fills > 0
+    per_pool = spread[used] + (fills[used] / depth[used]) ** 2 * 100
+    return float((per_pool * fills[used]).sum() / amount_usd)
+
+
+def pool_state(rails):
+    """Every active pool's (venue, asset) -> (depth, utilization, reserved)"""
+    table = rails.pool_table
+    return {
+        (table.venue_of(row), table.asset_of(row)):
+            (float(table.depth_usd[row]), float(table.utilization[row]), float(table.reserved_usd[row]))
+        for row in table.active_rows().tolist()
+    }
+
+
+def full_allocation(rails, total_capital):
+    """Allocation recomputed from every pool (no venue aggregates)"""
+    venue_scores = {}
+    for venue, pools in rails.liquidity_pools.items():
+        total_depth = sum(p.depth_usd for p in pools)
+        avg_utilization = np.mean([p.utilization for p in pools])
+        avg_funding = np.mean([abs(p.funding_rate) for p in pools])
+        venue_scores[venue] = total_depth * (1 - avg_utilization) / (1 + avg_funding * 100)
+    total_score = sum(venue_scores.values())
+    return {venue: score / total_score * total_capital for venue, score in venue_scores.items()}
+
+
+def test_batch_matches_single_routes():
+    """Each batch result is the route route_wreckage returns for that event"""
+    rails = rails_engine()
+    rng = np.random.default_rng(1)
+    amounts = np.exp(rng.uniform(np.log(10_000), np.log(150_000_000), size=120))
+    assets = rng.choice(["BTC", "ETH", "SOL", "DOGE"], size=len(amounts))
+
+    for solver in SPLIT_SOLVERS:
+        for max_hops in (1, 3):
+            batch = rails.route_wreckage_batch(amounts, assets, max_hops, solver)
+            assert len(batch) == len(amounts)
+            for amount, asset, route in zip(amounts.tolist(), assets.tolist(), batch):
+                single = rails.route_wreckage(amount, asset, max_hops, solver)
+                if single is None:
+                    assert route is None
+                    continue
+                assert [hop['venue'] for hop in route.hops] == [hop['venue'] for hop in single.hops]
+                assert np.allclose([hop['amount'] for hop in route.hops], [hop['amount'] for hop in single.hops])
+                assert np.isclose(route.total_cost_bps, single.total_cost_bps)
+                assert np.isclose(route.fry_minted, single.fry_minted)
+                assert len(route.hops) <= max_hops
+
+    assert all(route is None for route, asset in zip(batch, assets) if asset == "DOGE")
+
+
+def test_convex_split_no_costlier_than_greedy():
+    """Water-filling is the cost minimum: never above the greedy split of the same pools"""
+    rails = rails_engine()
+    rng = np.random.default_rng(2)
+
+    for asset in ("BTC", "ETH", "SOL"):
+        rows = rails.pool_index.candidates(asset)
+        depth, spread, available, _ = rails.pool_table.columns(np.array(rows, dtype=np.intp))
+        for amount in rng.uniform(0.05, 0.95, size=25) * available.sum():
+            greedy = rails._find_multi_hop_route(amount, asset, rows, max_hops=len(rows))
+            convex = rails._find_convex_split_route(amount, asset, rows, max_hops=len(rows))
+            assert convex is not None
+            assert np.isclose(sum(hop['amount'] for hop in convex.hops), amount)
+            if greedy is not None:
+                assert convex.total_cost_bps <= greedy.total_cost_bps + 1e-9
+
+            # KKT: equal marginal cost on every pool that is neither empty nor full
+            fills = water_fill_split(amount, depth, spread, available)
+            assert np.all(fills <= available + 1e-6)
+            open_pools = (fills > 1e-6) & (fills < available - 1e-6)
+            marginal = spread + 300 * (fills / depth) ** 2
+            if open_pools.sum() > 1:
+                assert np.ptp(marginal[open_pools]) < 1e-3
+            assert np.isclose(split_cost(depth, spread, fills, amount), convex.total_cost_bps)
+
+    # Batched amounts solve each row independently
+    amounts = rng.uniform(1e6, 2e7, size=8)
+    batched = water_fill_split(amounts, depth, spread, available, max_hops=3)
+    for amount, row in zip(amounts, batched):
+        assert np.allclose(row, water_fill_split(amount, depth, spread, available, max_hops=3))
+        assert np.count_nonzero(row) <= 3
+
+
+def test_concurrent_reservations_never_overbook():
+    """Threads racing for the same pools reserve at most what is available"""
+    rails = rails_engine()
+    before = pool_state(rails)
+    available = {key: depth * (1 - utilization) for key, (depth, utilization, _) in before.items()}
+    reservations, lock = [], threading.Lock()
+
+    def worker(seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(40):
+            asset = ["BTC", "ETH"][int(rng.integers(2))]
+            reservation = rails.route_and_reserve(float(rng.uniform(2e6, 3e7)), asset, retries=2)
+            if reservation is not None:
+                with lock:
+                    reservations.append(reservation)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    held = {}
+    for reservation in reservations:
+        for hop in reservation.route.hops:
+            key = (hop['venue'], reservation.route.asset)
+            held[key] = held.get(key, 0.0) + hop['amount']
+
+    after = pool_state(rails)
+    for key, (_, _, reserved) in after.items():
+        assert np.isclose(reserved, held.get(key, 0.0))
+        assert reserved <= available[key] + 1e-3
+    assert len(rails.reservations) == len(reservations) > 0
+    assert rails.reservation_conflicts > 0  # The race was real
+
+    for reservation in reservations:
+        rails.release_reservation(reservation)
+    released = pool_state(rails)
+    assert released.keys() == before.keys()
+    for key, (depth, utilization, reserved) in released.items():
+        assert (depth, utilization) == before[key][:2]
+        assert abs(reserved) < 1e-6  # Float residue of out-of-order holds only
+
+
+def test_rejected_routes_leave_pools_unchanged():
+    """Routes quoted against since-consumed liquidity raise ReservationError"""
+    rails = rails_engine()
+    route = rails.route_wreckage(20_000_000, "BTC")
+    stale = rails.route_wreckage(20_000_000, "BTC")
+
+    rails.execute_route(route)
+    after_first = pool_state(rails), rails.total_fry_minted, rails.total_wreckage_routed
+
+    for venue in {hop['venue'] for hop in stale.hops}:
+        rails.set_utilization(venue, "BTC", 0.99)
+    consumed = pool_state(rails), rails.total_fry_minted, rails.total_wreckage_routed
+    assert consumed[1:] == after_first[1:]
+
+    try:
+        rails.execute_route(stale)
+    except ReservationError:
+        pass
+    else:
+        raise AssertionError("execute_route overbooked a consumed pool")
+    try:
+        rails.reserve_route(stale)
+    except ReservationError:
+        pass
+    else:
+        raise AssertionError("reserve_route overbooked a consumed pool")
+
+    assert (pool_state(rails), rails.total_fry_minted, rails.total_wreckage_routed) == consumed
+    assert rails.reservations == {} and rails.reservation_conflicts == 2
+
+    # A closed reservation can't be committed again
+    reservation = rails.route_and_reserve(1_000_000, "ETH")
+    rails.commit_reservation(reservation)
+    try:
+        rails.commit_reservation(reservation)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("commit_reservation executed a reservation twice")
+
+
+def test_incremental_allocation_matches_full_recompute():
+    """Venue-aggregate allocation equals a from-scratch allocation as pools change and empty"""
+    rails = rails_engine()
+    rng = np.random.default_rng(3)
+    total = 10_000_000
+
+    def check():
+        allocation = rails.allocate_capital(total)
+        expected = full_allocation(rails, total)
+        assert sorted(allocation) == sorted(expected)
+        for venue, amount in expected.items():
+            assert np.isclose(allocation[venue], amount)
+        assert np.isclose(sum(allocation.values()), total)
+        return allocation
+
+    check()
+    for step in range(30):
+        venues = sorted(rails.liquidity_pools)
+        venue = venues[int(rng.integers(len(venues)))]
+        pools = rails.liquidity_pools[venue]
+        pool = pools[int(rng.integers(len(pools)))]
+        if step % 3 == 2:
+            rails.remove_pool(pool.venue, pool.asset)
+        else:
+            rails.set_utilization(pool.venue, pool.asset, float(rng.uniform(0.1, 0.9)))
+        check()
+
+    # Empty one venue completely: it drops out of the allocation
+    emptied = sorted(rails.liquidity_pools)[0]
+    for pool in list(rails.liquidity_pools[emptied]):
+        rails.remove_pool(pool.venue, pool.asset)
+    allocation = check()
+    assert emptied not in allocation
+
+    # Returned allocations are copies; a cached call repeats the last one
+    allocation["Nowhere"] = 1.0
+    assert rails.allocate_capital(total, use_cache=True) == {k: v for k, v in allocation.items() if k != "Nowhere"}
+
+
+def test_snapshot_round_trip():
+    """Pools, allocations and totals survive a snapshot, mapped or read"""
+    rails = rails_engine()
+    rails.execute_route(rails.route_wreckage(5_000_000, "ETH"))
+    rails.split_solver = 'convex'
+    rails.allocate_capital(1_000_000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rails.snap")
+        rails.save_snapshot(path)
+
+        for mmap in (True, False):
+            loaded = LiquidityRailsEngine()
+            loaded.load_snapshot(path, mmap=mmap)
+            assert pool_state(loaded) == pool_state(rails)
+            assert loaded.capital_allocations == rails.capital_allocations
+            assert loaded.total_fry_minted == rails.total_fry_minted
+            assert loaded.total_wreckage_routed == rails.total_wreckage_routed
+            assert loaded.split_solver == 'convex'
+            assert loaded.route_wreckage(3_000_000, "BTC") == rails.route_wreckage(3_000_000, "BTC")
+
+        # Warm start on a mapped table, then grow, shrink and write it
+        warm = LiquidityRailsEngine(snapshot_path=path)
+        expected = pool_state(rails)
+        for v in range(40):  # Enough rows to grow the mapped columns
+            warm.add_pool(LiquidityPool(f"New{v}", "SOL", 1_000_000 + v, 3.0, 0.001, 0.5))
+            expected[(f"New{v}", "SOL")] = (1_000_000.0 + v, 0.5, 0.0)
+        for venue, asset in [("GMX", "BTC"), ("Venue1", "SOL"), ("New7", "SOL")]:
+            warm.remove_pool(venue, asset)
+            del expected[(venue, asset)]
+        warm.set_utilization("dYdX", "ETH", 0.25)
+        expected[("dYdX", "ETH")] = expected[("dYdX", "ETH")][:1] + (0.25, 0.0)
+        assert pool_state(warm) == expected
+        assert warm.get_pool("GMX", "BTC") is None
+        assert pool_state(LiquidityRailsEngine(snapshot_path=path)) == pool_state(rails)  # File untouched
+
+        warm.save_snapshot(path)  # Over the file the columns are mapped from
+        assert pool_state(LiquidityRailsEngine(snapshot_path=path)) == expected
+        assert pool_state(warm) == expected
+
+        with open(path, 'r+b') as f:
+            f.write(b'NOPE')
+        try:
+            LiquidityRailsEngine(snapshot_path=path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("loaded a file without the snapshot magic")
+
+
+def grid_routes(rails, amount_usd, asset, max_hops, resolution):
+    """(cost, FRY) of every route filling the amount in 1/resolution steps"""
+    rows = rails.pool_index.candidates(asset, amount_usd * 0.1)
+    depth, spread, available, _ = rails.pool_table.columns(np.array(rows, dtype=np.intp))
+    venues = rails.pool_table.venue_names(np.array(rows, dtype=np.intp))
+    fills = amount_usd * np.arange(1, resolution + 1) / resolution
+
+    routes = []
+    for num_hops in range(1, max_hops + 1):
+        for pools in itertools.combinations(range(len(rows)), num_hops):
+            for cuts in itertools.combinations(range(1, resolution), num_hops - 1):
+                steps = np.diff((0,) + cuts + (resolution,))
+                fill = fills[steps - 1]
+                if (fill > available[list(pools)]).any():
+                    continue
+                cost = float(((spread[list(pools)] + (fill / depth[list(pools)]) ** 2 * 100)
+                              * fill / amount_usd).sum())
+                fry = rails._calculate_fry_minting(amount_usd, cost, num_hops=num_hops,
+                                                   venues=[venues[p] for p in pools])
+                routes.append((cost, fry))
+    return routes
+
+
+def test_pareto_frontier_non_dominated():
+    """No route on the fill grid beats a frontier route on both cost and FRY"""
+    rails = rails_engine(extra_venues=2)
+    resolution = 10
+    for asset, amount in [("BTC", 2_000_000), ("BTC", 60_000_000), ("ETH", 25_000_000), ("SOL", 10_000_000)]:
+        frontier = rails.pareto_routes(amount, asset, max_hops=3, resolution=resolution)
+        grid = grid_routes(rails, amount, asset, 3, resolution)
+        assert frontier and grid
+
+        for route in frontier:
+            assert 1 <= len(route.hops) <= 3
+            assert np.isclose(sum(hop['amount'] for hop in route.hops), amount)
+            assert any(np.isclose(route.total_cost_bps, cost) and np.isclose(route.fry_minted, fry)
+                       for cost, fry in grid)
+            assert not any(cost < route.total_cost_bps - 1e-9 and fry > route.fry_minted + 1e-6
+                           for cost, fry in grid)
+
+        costs = [route.total_cost_bps for route in frontier]
+        fry = [route.fry_minted for route in frontier]
+        assert costs == sorted(costs) and fry == sorted(fry)
+
+        # The cheapest and the highest-FRY grid routes are both on the frontier
+        assert np.isclose(costs[0], min(cost for cost, _ in grid))
+        assert np.isclose(fry[-1], max(f for _, f in grid))
+
+    assert rails.pareto_routes(1_000_000, "DOGE") == []
+
+
+def test_what_if_leaves_live_state_unchanged():
+    """Routing, reserving and pool changes in an overlay never reach the live engine"""
+    rails = rails_engine()
+    rails.allocate_capital(1_000_000)
+    live = (pool_state(rails), dict(rails.capital_allocations),
+            rails.total_fry_minted, rails.total_wreckage_routed)
+    quote = rails.route_wreckage(8_000_000, "BTC")
+
+    overlay = rails.what_if()
+    overlay.execute_route(overlay.route_wreckage(8_000_000, "BTC"))
+    held = overlay.route_and_reserve(4_000_000, "ETH")
+    overlay.set_utilization("Aster", "BTC", 0.95)
+    for change in (lambda: overlay.add_pool(LiquidityPool("Hypothetical", "BTC", 90_000_000, 1.0, 0.0, 0.1)),
+                   lambda: overlay.remove_pool("dYdX", "ETH")):
+        try:
+            change()
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("pool set changed through a what-if overlay")
+    overlay.allocate_capital(1_000_000)
+
+    assert held is not None and overlay.total_fry_minted > 0
+    assert pool_state(overlay) != live[0]
+    assert overlay.route_wreckage(8_000_000, "BTC") != quote
+    assert (pool_state(rails), rails.capital_allocations,
+            rails.total_fry_minted, rails.total_wreckage_routed) == live
+    assert rails.reservations == {} and rails.get_pool("Hypothetical", "BTC") is None
+    assert rails.route_wreckage(8_000_000, "BTC") == quote
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print(f"\n🍟 {len(tests)} liquidity rails tests passed")
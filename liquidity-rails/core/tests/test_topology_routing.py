@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Topology Routing Test
+=====================
+
+Deterministic checks of the topology router:
+1. k-best path index vs exhaustive path search, and incremental index
+   maintenance vs a full rebuild
+2. Route cache TTL, LRU eviction and topology version invalidation
+3. Streaming route metrics and the disk-spilling route history
+4. Batch topology features vs per-route features
+5. Config-loaded DEX graphs and in-place CSR edge updates
+6. Reproducible Monte Carlo route scoring
+
+Run with core/engines/routing on the path:
+    PYTHONPATH=core/engines/routing python core/tests/test_topology_routing.py
+"""
+
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from topology_routing_engine import (DEFAULT_DEX_NETWORK, DexGraph, PathIndex, RouteCache, RunningStats,
+                                     TopologyAwareAgentB, TopologyRouter)
+
+logging.getLogger('topology_routing_engine').setLevel(logging.ERROR)
+
+
+def path_cost(graph, path):
+    """PathIndex cost of a node id path (entry cost of every DEX after the first)"""
+    return float(graph.entry_costs()[list(path[1:])].sum())
+
+
+def mesh_network(num_dexes=7, seed=3):
+    """Random sparse DEX network, small enough to enumerate every path"""
+    rng = np.random.default_rng(seed)
+    names = [f"DEX{i}" for i in range(num_dexes)]
+    return {
+        name: {
+            'efficiency': float(rng.uniform(0.05, 0.5)),
+            'notional_capacity': int(rng.integers(10_000, 100_000)),
+            'funding_rate': float(rng.uniform(-0.002, 0.002)),
+            'connections': [other for other in names if other != name and rng.random() < 0.4],
+        }
+        for name in names
+    }
+
+
+def test_index_matches_exhaustive_search():
+    """With every path within k, the indexed best route is the exhaustive best"""
+    router = TopologyRouter()
+    names = list(DEFAULT_DEX_NETWORK)
+
+    for start in names:
+        for end in names:
+            if start == end:
+                continue
+            every_path = router._find_all_paths(start, end)
+            indexed = [[router.graph.names[node] for node in path]
+                       for path in router.path_index.paths(router.graph.ids[start], router.graph.ids[end])]
+            assert len(every_path) <= router.path_index.k
+            assert sorted(indexed) == sorted(every_path)
+
+            for trade_size in (1_000, 25_000, 77_777):
+                scored = [router.calculate_route_score(path, trade_size) for path in every_path]
+                for route_type, key in (('efficiency', 'fry_per_dollar'), ('funding', 'total_gradient')):
+                    best = router.find_optimal_route(start, end, trade_size, route_type)
+                    assert np.isclose(best[key], max(route[key] for route in scored))
+
+
+def test_index_incremental_updates_match_rebuild():
+    """connect / disconnect / update_dex keep every cached pair equal to a fresh rebuild"""
+    router = TopologyRouter()
+    router.dex_network = mesh_network()
+    router.path_index = PathIndex(router.graph, k=3)  # Small k so the k-th path boundary matters
+    names = list(router.graph.names)
+    rng = np.random.default_rng(5)
+
+    for step in range(60):
+        router.path_index.precompute()
+        u, v = rng.choice(names, size=2, replace=False)
+        action = step % 3
+        if action == 0:
+            router.connect(u, v)
+        elif action == 1:
+            connected = [router.graph.names[w] for w in router.graph.out_edges.row(router.graph.ids[u]).tolist()]
+            if connected:
+                router.disconnect(u, connected[int(rng.integers(len(connected)))])
+        else:
+            router.update_dex(u, efficiency=float(rng.uniform(0.05, 0.6)))
+
+        fresh = PathIndex(router.graph, k=3)
+        for s in range(len(router.graph)):
+            for t in range(len(router.graph)):
+                kept, rebuilt = router.path_index.paths(s, t), fresh.paths(s, t)
+                assert len(kept) == len(rebuilt)
+                assert np.allclose([path_cost(router.graph, path) for path in kept],
+                                   [path_cost(router.graph, path) for path in rebuilt])
+                for path in kept:
+                    assert all(router.graph.has_edge(a, b) for a, b in zip(path, path[1:]))
+
+    version = router.topology_version
+    router.refresh_topology()
+    assert router.topology_version > version and len(router.path_index) == 0
+
+
+def test_route_cache_ttl_and_lru():
+    """Expired entries miss; the least recently used entry is evicted first"""
+    expired = RouteCache(max_size=4, ttl_seconds=0.0)
+    expired.put(('a',), {'fry': 1})
+    assert expired.get(('a',)) == (False, None)
+    assert expired.stats()['expirations'] == 1 and len(expired) == 0
+
+    cache = RouteCache(max_size=2, ttl_seconds=3600)
+    cache.put(('a',), {'fry': 1})
+    cache.put(('b',), {'fry': 2})
+    assert cache.get(('a',)) == (True, {'fry': 1})  # 'b' is now least recently used
+    cache.put(('c',), None)                          # Unreachable routes are cached too
+    assert cache.get(('b',)) == (False, None)
+    assert cache.get(('a',))[0] and cache.get(('c',)) == (True, None)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_quote_route_invalidated_by_topology_version():
+    """Quotes come from the cache until a DEX change bumps the topology version"""
+    router = TopologyRouter()
+    first = router.quote_route('dYdX', 'GMX', 25_000)
+    assert router.quote_route('dYdX', 'GMX', 25_000.4) is first  # Same $1 bucket
+    assert router.route_cache.hits == 1
+
+    router.update_dex('Hyperliquid', efficiency=0.9)
+    updated = router.quote_route('dYdX', 'GMX', 25_000)
+    assert updated is not first
+    assert updated == router.find_optimal_route('dYdX', 'GMX', 25_000)
+    assert updated['fry_per_dollar'] != first['fry_per_dollar']
+
+
+def test_running_stats_match_numpy():
+    values = np.random.default_rng(9).normal(0.3, 0.1, size=1_000)
+    stats = RunningStats()
+    assert stats.variance == 0.0
+    for value in values.tolist():
+        stats.update(value)
+    assert stats.count == len(values)
+    assert np.isclose(stats.mean, np.mean(values))
+    assert np.isclose(stats.variance, np.var(values))
+
+
+def test_route_history_spill_round_trip():
+    """Routes pushed out of memory are spilled and read back in order, across restarts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        spill_path = os.path.join(tmp, "routes.ndjson")
+        agent = TopologyAwareAgentB(history_size=5, spill_path=spill_path)
+        recorded = [agent.optimize_cross_dex_trade(1_000 + 997 * i) for i in range(12)]
+
+        assert agent.spilled_routes == 7 and len(agent.route_history) == 5
+        assert list(agent.iter_route_history()) == recorded
+        gradients = [route['avg_gradient'] for route in recorded]
+        assert np.isclose(agent.performance_metrics['avg_gradient'], np.mean(gradients))
+        assert np.isclose(agent.performance_metrics['gradient_variance'], np.var(gradients))
+        agent.close()
+
+        # A restarted client appends to the same spill file
+        restarted = TopologyAwareAgentB(history_size=5, spill_path=spill_path)
+        more = [restarted.optimize_cross_dex_trade(50_000 + 13 * i) for i in range(8)]
+        assert list(restarted.iter_route_history()) == recorded[:7] + more
+        features, labels = restarted.get_topology_training_arrays()
+        assert features.shape == (15, 10) and np.allclose(labels, [r['fry_per_dollar'] for r in recorded[:7] + more])
+        restarted.close()
+
+
+def test_features_batch_matches_single():
+    """Batch rows equal get_topology_features, with zero rows for empty routes"""
+    router = TopologyRouter()
+    routes = [router.find_optimal_route(start, end, size)
+              for start in DEFAULT_DEX_NETWORK for end in DEFAULT_DEX_NETWORK if start != end
+              for size in (2_500, 40_000)]
+    routes[3:3] = [None, {}]
+
+    batch = router.get_topology_features_batch(routes)
+    assert batch.dtype == np.float32 and batch.flags['C_CONTIGUOUS']
+    assert np.allclose(batch, np.stack([router.get_topology_features(route) for route in routes]))
+    assert not batch[3].any() and not batch[4].any()
+    assert router.get_topology_features_batch([]).shape == (0, 10)
+    assert not router.get_topology_features_batch([None]).any()
+
+
+def test_dex_graph_from_config():
+    network = mesh_network(num_dexes=5)
+    network['DEX0']['connections'].append('Unlisted')  # Skipped with a warning
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, config in (('wrapped.json', {'dexes': network}), ('bare.json', network)):
+            path = os.path.join(tmp, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(config, f)
+
+            graph = DexGraph.from_config(path)
+            loaded = graph.to_network()
+            assert list(loaded) == list(network)
+            for dex, params in network.items():
+                assert loaded[dex]['connections'] == [c for c in params['connections'] if c != 'Unlisted']
+                assert np.isclose(loaded[dex]['efficiency'], params['efficiency'])
+                assert loaded[dex]['notional_capacity'] == params['notional_capacity']
+
+            router = TopologyRouter(config_path=path)
+            assert router.graph.names == graph.names
+
+
+def test_csr_edges_updated_in_place():
+    """Random add_edge / remove_edge against a list-of-lists reference"""
+    rng = np.random.default_rng(17)
+    graph = DexGraph.from_network(mesh_network(num_dexes=6))
+    reference = {u: graph.out_edges.row(u).tolist() for u in range(len(graph))}
+
+    for step in range(2_000):
+        if step % 250 == 0:
+            graph.add_node(f"NEW{step}", 0.2, 10_000, 0.0)
+            reference[len(graph) - 1] = []
+        u, v = rng.integers(len(graph), size=2).tolist()
+        if rng.random() < 0.6:
+            added = graph.add_edge(u, v)
+            assert added == (u != v and v not in reference[u])
+            if added:
+                reference[u].append(v)
+        else:
+            removed = graph.remove_edge(u, v)
+            assert removed == (v in reference[u])
+            if removed:
+                reference[u].remove(v)
+
+    for u in range(len(graph)):
+        assert graph.out_edges.row(u).tolist() == reference[u]  # Insertion order kept
+        assert sorted(graph.in_edges.row(u).tolist()) == sorted(w for w in reference if u in reference[w])
+    assert graph.out_edges.num_edges == sum(map(len, reference.values()))
+
+
+def test_robust_scoring_reproducible():
+    """A fixed seed with no latency budget gives identical scores"""
+    router = TopologyRouter()
+    score = lambda seed: router.score_routes_robust('dYdX', 'GMX', 25_000, num_scenarios=2_000,
+                                                    latency_budget_ms=None, seed=seed)
+    first, again, other = score(7), score(7), score(8)
+
+    assert first == again
+    assert all(route['scenarios'] == 2_000 for route in first)
+    assert [route['tail_fry'] for route in first] == sorted((route['tail_fry'] for route in first), reverse=True)
+    assert [route['expected_fry'] for route in first] != [route['expected_fry'] for route in other]
+    assert router.score_routes_robust('dYdX', 'Nowhere', 25_000) == []
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
+    print(f"\n🍟 {len(tests)} topology routing tests passed")